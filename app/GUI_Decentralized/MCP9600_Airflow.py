@@ -1,74 +1,82 @@
 # MCP9600_Airflow.py
 """
 @file MCP9600_Airflow.py
-@brief Liest Ambient- und Thermocouple-Temperatur vom MCP9600 und schätzt daraus eine Luftströmung.
+@brief Liest Cold-Junction- (Umgebung) und Thermocouple-Temperatur vom MCP9600 und schätzt daraus eine
+       Luftströmung. Die Differenz kommt direkt aus dem Register T_Δ (mcp9600.py liest Status und alle
+       Temperaturen in einem Zugriff). Mit --continuous wird im Takt der Wandlungen des Bausteins gemessen.
        Nutzt mux_helper für den Multiplexer und eine Lock-Mechanik.
 """
 
-import smbus2
-import time
+import argparse
 import math
+import time
 from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for
+from mcp9600 import get_mcp9600
+from config.settings import load_settings
 
-I2C_ADDRESS                = 0x67
-AMBIENT_TEMP_REGISTER      = 0x00
-THERMOCOUPLE_TEMP_REGISTER = 0x01
+SENSOR_NAME = "MCP9600_AIRFLOW"
 
 CALIBRATION_C = 2.5
 TEMP_OFFSET   = 0.2
 
-def main():
+def wind_speed(delta_temp):
     """
-    @fn main()
-    @brief Schaltet auf den MCP9600_AIRFLOW-Kanal, liest die Temperaturen aus und berechnet eine Strömungsgeschwindigkeit.
+    @fn wind_speed(delta_temp)
+    @brief Schätzt die Strömungsgeschwindigkeit aus der Temperaturdifferenz.
+    @param delta_temp: Thermocouple minus Umgebung in °C
+    @return Geschwindigkeit (kalibrierte Einheit)
+    """
+    if delta_temp <= TEMP_OFFSET:
+        return 0.0
+    return CALIBRATION_C * math.sqrt(delta_temp - TEMP_OFFSET)
+
+def read_airflow(wait=True):
+    """
+    @fn read_airflow(wait=True)
+    @brief Schaltet auf den MCP9600_AIRFLOW-Kanal und liest eine (neue) Wandlung.
+    @param wait: True => auf die nächste Wandlung warten (Lock wird so lange gehalten, daher erst kurz
+                 vor dem erwarteten Ende der Wandlung aufrufen)
+    @return Tupel (Umgebung, Thermocouple, Differenz) in °C oder None bei Fehler
     """
     lockfile = acquire_i2c_lock()
     try:
-        switch_mux_channel_for("MCP9600_AIRFLOW")
-
-        bus = smbus2.SMBus(1)
-        try:
-            ambient_temp      = read_temp(bus, AMBIENT_TEMP_REGISTER)
-            thermocouple_temp = read_temp(bus, THERMOCOUPLE_TEMP_REGISTER)
-        finally:
-            bus.close()
-
-        if (ambient_temp is None) or (thermocouple_temp is None):
-            return
-
-        delta_temp = thermocouple_temp - ambient_temp
-        print(f"Ambient: {ambient_temp:.2f} °C, "
-              f"Thermocouple: {thermocouple_temp:.2f} °C, "
-              f"Delta: {delta_temp:.2f} °C")
-
-        if delta_temp <= TEMP_OFFSET:
-            wind_speed = 0.0
-        else:
-            effective_delta = delta_temp - TEMP_OFFSET
-            wind_speed = CALIBRATION_C * math.sqrt(effective_delta)
-
-        print(f"{wind_speed:.2f}")
-
+        switch_mux_channel_for(SENSOR_NAME)
+        hot, delta, cold = get_mcp9600(SENSOR_NAME, **load_settings()["mcp9600"]).read(wait=wait)
+        return cold, hot, delta
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Lesen des MCP9600: {e}")
+        return None
     finally:
         release_i2c_lock(lockfile)
 
-def read_temp(bus, register):
+def main():
     """
-    @fn read_temp(bus, register)
-    @brief Liest ein MCP9600-Register (Ambient oder Thermocouple) und wandelt es in °C um.
-    @param bus: smbus2.SMBus Objekt
-    @param register: Zielregister (z.B. 0x00 für Ambient, 0x01 für Thermocouple)
-    @return Temperatur als float oder None
+    @fn main()
+    @brief Liest die Temperaturen aus und berechnet eine Strömungsgeschwindigkeit (einmalig oder fortlaufend).
     """
+    parser = argparse.ArgumentParser(description="Luftströmung aus MCP9600-Temperaturdifferenz")
+    parser.add_argument("--continuous", action="store_true",
+                        help="fortlaufend je neuer Wandlung ausgeben (Strg+C beendet)")
+    args = parser.parse_args()
+
+    periode = get_mcp9600(SENSOR_NAME, **load_settings()["mcp9600"]).conversion_time
+    naechste = time.monotonic()
     try:
-        data = bus.read_i2c_block_data(I2C_ADDRESS, register, 2)
-        raw = (data[0] << 8) | data[1]
-        if raw & (1 << 15):
-            raw -= (1 << 16)
-        return raw / 16.0
-    except Exception as e:
-        print(f"Fehler beim Lesen von Register 0x{register:02X}: {e}")
-        return None
+        while True:
+            # außerhalb des Locks bis zur erwarteten nächsten Wandlung schlafen
+            time.sleep(max(naechste - time.monotonic(), 0))
+            werte = read_airflow(wait=args.continuous)
+            naechste = time.monotonic() + periode
+            if werte is not None:
+                ambient_temp, thermocouple_temp, delta_temp = werte
+                print(f"Ambient: {ambient_temp:.2f} °C, "
+                      f"Thermocouple: {thermocouple_temp:.2f} °C, "
+                      f"Delta: {delta_temp:.2f} °C")
+                print(f"{wind_speed(delta_temp):.2f}", flush=True)
+            if not args.continuous:
+                break
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
     main()
@@ -1,36 +1,30 @@
 # MCP9600_Env.py
 """
 @file MCP9600_Env.py
-@brief Liest die Umgebungstemperatur (Ambient) vom MCP9600 aus (Register 0x00).
-       Nutzt mux_helper zum Umschalten des Multiplexers.
+@brief Liest die Temperatur des Umgebungs-MCP9600 (Hot-Junction, Register 0x00) über den Treiber mcp9600.py.
+       Nutzt mux_helper zum Umschalten des Multiplexers; der Bus bleibt über die Session geöffnet.
 """
 
-import smbus2
-import time
 from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for
+from mcp9600 import get_mcp9600
+from config.settings import load_settings
 
-I2C_ADDRESS           = 0x67
-AMBIENT_TEMP_REGISTER = 0x00
+SENSOR_NAME = "MCP9600_ENV"
 
 def read_ambient_temperature():
     """
     @fn read_ambient_temperature()
-    @brief Liest die Ambient-Temperatur in °C vom MCP9600.
+    @brief Liest die Temperatur in °C vom MCP9600 (ohne auf die nächste Wandlung zu warten).
     @return float oder None
     """
     lockfile = acquire_i2c_lock()
     try:
-        switch_mux_channel_for("MCP9600_ENV")
-
-        bus = smbus2.SMBus(1)
-        try:
-            data = bus.read_i2c_block_data(I2C_ADDRESS, AMBIENT_TEMP_REGISTER, 2)
-            raw_temp = (data[0] << 8) | data[1]
-            if raw_temp & (1 << 15):
-                raw_temp -= (1 << 16)
-            return raw_temp / 16.0
-        finally:
-            bus.close()
+        switch_mux_channel_for(SENSOR_NAME)
+        hot, _, _ = get_mcp9600(SENSOR_NAME, **load_settings()["mcp9600"]).read(wait=False)
+        return hot
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Lesen des MCP9600: {e}")
+        return None
     finally:
         release_i2c_lock(lockfile)
 
@@ -0,0 +1,400 @@
+# acquisition_daemon.py
+"""
+@file acquisition_daemon.py
+@brief Residenter Erfassungsdienst: importiert die Sensortreiber einmalig, hält den I2C-Bus offen
+       und tastet die Sensoren mit ihren eigenen Raten ab (settings["poll_rates"], siehe
+       poll_scheduler.py). Jede Abfrage wird als JSON-Zeile
+       ({"type": "sensors", "t": Zeitstempel, "values": {...}}, nur die gelesenen Sensoren) an alle
+       Clients eines Unix-Domain-Sockets verteilt. Soll- und Istraten stehen in /tmp/poll_stats.json.
+       Ein Client kann mit {"type": "subscribe", "sensors": [Name, ...]} festlegen, welche Sensoren er
+       braucht; gelesen wird die Vereinigung aller Anforderungen (ohne Anforderung: alle Sensoren).
+
+       Mit --stdio läuft der Dienst als Agent für den SSH-Modus: Die Datensätze gehen auf stdout,
+       zusätzlich werden neue Zeilen aus /tmp/bme_data.csv als {"type": "bme", "rows": [...]} gesendet.
+       Befehle der GUI ({"type": "command", "cmd": ...}) und Anforderungen ({"type": "subscribe", ...})
+       kommen über stdin; Befehle werden von einem eigenen Thread der Reihe nach an heating.py
+       (control/command_channel.py) weitergeleitet und als {"type": "ack", ...} quittiert. Der Thread wartet
+       wie die GUI im lokalen Betrieb bis zu STARTUP_TIMEOUT auf heating.py, ohne die Abtastung aufzuhalten.
+       So genügt ein einziger, dauerhaft offener SSH-Kanal.
+"""
+
+import argparse
+import errno
+import json
+import os
+import queue
+import selectors
+import socket
+import sys
+import threading
+import time
+
+from mux_helper import get_bus_session
+from aggregator import SENSOR_READERS, check_sensor_names, sensor_record
+from mcp9600 import max_rate as mcp9600_max_rate
+from poll_scheduler import PollScheduler
+from config.settings import load_settings, bme280_profile, bme280_timing
+from control.command_channel import CommandClient, STARTUP_TIMEOUT, claim_socket_path
+from logic.tail_reader import IncrementalTailReader
+
+SOCKET_PATH    = "/tmp/eiffel_acquisition.sock"
+DEFAULT_RATE   = 1.0
+STATS_FILE     = "/tmp/poll_stats.json"
+STATS_PERIOD   = 60.0
+BME_FILE       = "/tmp/bme_data.csv"
+FOLLOW_PERIOD  = 0.2
+
+class AcquisitionDaemon:
+    """
+    @class AcquisitionDaemon
+    @brief Tastet die Sensoren mit ihren Raten ab und verteilt die Datensätze an verbundene Clients.
+    """
+    def __init__(self, rates=None, socket_path=SOCKET_PATH, session=None):
+        """
+        @fn __init__(rates=None, socket_path=SOCKET_PATH, session=None)
+        @param rates: dict Sensorname -> Zielrate in Hz (fehlende Sensoren: DEFAULT_RATE)
+        @param socket_path: Pfad des Unix-Domain-Sockets
+        @param session: mux_helper.I2CBusSession; None => Standard-Session
+        """
+        rates = rates or {}
+        self.socket_path = socket_path
+        self.session = session if session is not None else get_bus_session()
+        self.poller = PollScheduler(self.session)
+        for name, reader in SENSOR_READERS:
+            self.poller.add(name, reader, rates.get(name, DEFAULT_RATE))
+        self.next_stats = time.monotonic() + STATS_PERIOD
+        self.selector = selectors.DefaultSelector()
+        self.clients = set()
+        self.subscriptions = {}   # Client -> Menge der Sensornamen oder None (alle)
+        self.partial = {}
+        self.server = None
+
+    def sample(self):
+        """
+        @fn sample()
+        @brief Liest alle fälligen Sensoren (gruppiert nach Multiplexer-Kanal).
+        @return dict {"type": "sensors", "t": Unix-Zeit, "values": {...}} oder None, wenn nichts gelesen wurde
+        """
+        values = self.poller.poll()
+        self.report_stats()
+        if not values:
+            return None
+        return sensor_record(values)
+
+    def parse_subscription(self, msg):
+        """
+        @fn parse_subscription(msg)
+        @brief Wertet eine Anforderung {"type": "subscribe", "sensors": [...] | null} aus.
+        @param msg: dict
+        @return Menge der Sensornamen oder None (alle)
+        @throws ValueError bei unbekannten Sensoren
+        """
+        sensors = msg.get("sensors")
+        return None if sensors is None else check_sensor_names(sensors)
+
+    def update_active(self):
+        """
+        @fn update_active()
+        @brief Aktiviert im Abfrageplaner die Vereinigung der Anforderungen aller Clients.
+        """
+        anforderungen = [self.subscriptions.get(conn) for conn in self.clients]
+        if not anforderungen or any(a is None for a in anforderungen):
+            self.poller.set_active(None)
+        else:
+            self.poller.set_active(set().union(*anforderungen))
+
+    def handle_client_data(self, conn, data):
+        """
+        @fn handle_client_data(conn, data)
+        @brief Wertet vollständige JSON-Zeilen eines Clients aus (derzeit nur Anforderungen).
+        @param conn: Client-Socket
+        @param data: neu gelesene Bytes
+        """
+        lines = (self.partial.get(conn, b"") + data).split(b"\n")
+        self.partial[conn] = lines.pop()
+        for line in lines:
+            try:
+                msg = json.loads(line)
+                if isinstance(msg, dict) and msg.get("type") == "subscribe":
+                    self.subscriptions[conn] = self.parse_subscription(msg)
+                    self.update_active()
+            except ValueError as e:
+                print(f"Ungültige Anforderung verworfen: {e}", file=sys.stderr)
+
+    def report_stats(self):
+        """
+        @fn report_stats()
+        @brief Schreibt alle STATS_PERIOD Sekunden die Soll-/Istraten nach STATS_FILE.
+        """
+        if time.monotonic() < self.next_stats:
+            return
+        self.next_stats += STATS_PERIOD
+        try:
+            self.poller.export(STATS_FILE)
+        except OSError as e:
+            print(f"Abfragestatistik konnte nicht geschrieben werden: {e}", file=sys.stderr)
+
+    def open_socket(self):
+        """
+        @fn open_socket()
+        @brief Legt den Server-Socket an (eine verwaiste Socket-Datei wird vorher entfernt).
+        @throws OSError (EADDRINUSE), wenn bereits ein Erfassungsdienst auf dem Socket läuft
+        """
+        claim_socket_path(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.selector.register(self.server, selectors.EVENT_READ)
+
+    def accept_clients(self, timeout):
+        """
+        @fn accept_clients(timeout)
+        @brief Nimmt bis zum Ablauf von timeout neue Verbindungen an; erkennt getrennte Clients.
+        @param timeout: maximale Wartezeit in Sekunden
+        """
+        for key, _ in self.selector.select(timeout=max(timeout, 0)):
+            if key.fileobj is self.server:
+                conn, _ = self.server.accept()
+                conn.setblocking(False)
+                self.clients.add(conn)
+                self.selector.register(conn, selectors.EVENT_READ)
+            else:
+                # Clients senden nur Anforderungen; leer heißt: Verbindung geschlossen
+                try:
+                    data = key.fileobj.recv(4096)
+                except OSError:
+                    data = b""
+                if data:
+                    self.handle_client_data(key.fileobj, data)
+                else:
+                    self.drop_client(key.fileobj)
+
+    def drop_client(self, conn):
+        """
+        @fn drop_client(conn)
+        @brief Entfernt einen Client aus dem Verteiler.
+        """
+        self.clients.discard(conn)
+        self.subscriptions.pop(conn, None)
+        self.partial.pop(conn, None)
+        self.update_active()
+        try:
+            self.selector.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
+
+    def broadcast(self, record):
+        """
+        @fn broadcast(record)
+        @brief Sendet einen Datensatz als JSON-Zeile an alle Clients.
+        @param record: dict
+        """
+        frame = (json.dumps(record) + "\n").encode()
+        for conn in list(self.clients):
+            try:
+                conn.sendall(frame)
+            except OSError:
+                self.drop_client(conn)
+
+    def serve_forever(self):
+        """
+        @fn serve_forever()
+        @brief Hauptschleife: wartet bis zum nächsten Termin des Abfrageplaners auf Clients.
+               Ohne Clients wird nicht gelesen (der Zeitplan beginnt mit dem ersten Client neu).
+        """
+        self.open_socket()
+        try:
+            while True:
+                if not self.clients:
+                    self.accept_clients(1.0)
+                    self.poller.rebase()
+                    continue
+                self.accept_clients(self.poller.next_due() - time.monotonic())
+                if time.monotonic() < self.poller.next_due():
+                    continue
+                record = self.sample()
+                if record:
+                    self.broadcast(record)
+        finally:
+            for conn in list(self.clients):
+                self.drop_client(conn)
+            self.server.close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def forward_commands(self, data):
+        """
+        @fn forward_commands(data)
+        @brief Stellt vollständige Befehlszeilen von stdin für command_worker in die Warteschlange;
+               Anforderungen ({"type": "subscribe"}) legen die gelesenen Sensoren fest.
+        @param data: neu gelesene Bytes
+        """
+        lines = (self.command_partial + data).split(b"\n")
+        self.command_partial = lines.pop()
+        for line in lines:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(msg, dict):
+                continue
+            if msg.get("type") == "subscribe":
+                try:
+                    self.poller.set_active(self.parse_subscription(msg))
+                except ValueError as e:
+                    print(f"Ungültige Anforderung verworfen: {e}", file=sys.stderr)
+                continue
+            if msg.get("type") != "command":
+                continue
+            msg.pop("type")
+            self.command_queue.put(msg)
+
+    def command_worker(self, out):
+        """
+        @fn command_worker(out)
+        @brief Hintergrundthread: sendet die Befehle der Reihe nach an heating.py und schreibt die Quittungen.
+               Startet heating.py gerade, wird bis zu STARTUP_TIMEOUT auf den Befehlskanal gewartet;
+               ein Befehl kann mit "timeout" kürzer warten (z.B. ein Ping vor dem Start von heating.py).
+        @param out: Ausgabestrom
+        """
+        while True:
+            msg = self.command_queue.get()
+            if msg is None:
+                self.command_client.close()
+                return
+            try:
+                timeout = float(msg.pop("timeout", STARTUP_TIMEOUT))
+            except (TypeError, ValueError):
+                timeout = STARTUP_TIMEOUT
+            ack = self.command_client.send(msg, timeout=timeout)
+            if ack is None:
+                ack = {"id": msg.get("id"), "ok": False, "error": "heating.py nicht erreichbar"}
+            try:
+                self.write_frame(out, {"type": "ack", **ack})
+            except (BrokenPipeError, ValueError):
+                return
+
+    def write_frame(self, out, obj):
+        """
+        @fn write_frame(out, obj)
+        @brief Schreibt ein Objekt als JSON-Zeile (Hauptschleife und Befehlsthread teilen sich out).
+        @param out: Ausgabestrom
+        @param obj: JSON-serialisierbares Objekt
+        """
+        with self.out_lock:
+            out.write(json.dumps(obj) + "\n")
+            out.flush()
+
+    def serve_stdio(self, follow_path=BME_FILE, out=None, commands_in=None):
+        """
+        @fn serve_stdio(follow_path=BME_FILE, out=None, commands_in=None)
+        @brief Agent-Modus: schreibt Sensor-Datensätze und neue BME-Zeilen als JSON-Zeilen auf stdout.
+               Zwischen zwei Takten wird auf Befehle von stdin gewartet (statt fest zu schlafen).
+               Endet, sobald der Leser den Kanal schließt (BrokenPipe).
+        @param follow_path: CSV-Datei, deren neue Zeilen weitergereicht werden (None => keine)
+        @param out: Ausgabestrom (Standard: sys.stdout)
+        @param commands_in: Eingabestrom für Befehle (Standard: sys.stdin)
+        """
+        out = out if out is not None else sys.stdout
+        commands_in = commands_in if commands_in is not None else sys.stdin
+        follower = IncrementalTailReader(follow_path) if follow_path else None
+        self.command_client = CommandClient()
+        self.command_partial = b""
+        self.command_queue = queue.Queue()
+        self.out_lock = threading.Lock()
+        threading.Thread(target=self.command_worker, args=(out,), daemon=True).start()
+        command_selector = selectors.DefaultSelector()
+        command_selector.register(commands_in.fileno(), selectors.EVENT_READ)
+        self.poller.rebase()
+        next_follow = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= self.poller.next_due():
+                    record = self.sample()
+                    if record:
+                        self.write_frame(out, record)
+                if follower and now >= next_follow:
+                    rows = follower.poll_local()
+                    if rows:
+                        self.write_frame(out, {"type": "bme", "rows": rows})
+                    next_follow += FOLLOW_PERIOD
+                    if next_follow < now:
+                        next_follow = now + FOLLOW_PERIOD
+
+                deadline = min(self.poller.next_due(), next_follow) if follower else self.poller.next_due()
+                delay = max(deadline - time.monotonic(), 0)
+                for key, _ in command_selector.select(timeout=delay):
+                    data = os.read(key.fd, 4096)
+                    if data:
+                        self.forward_commands(data)
+                    else:
+                        command_selector.unregister(key.fd)  # stdin geschlossen
+        except BrokenPipeError:
+            pass
+        finally:
+            command_selector.close()
+            self.command_queue.put(None)
+            if follower:
+                follower.close()
+
+def main():
+    """
+    @fn main()
+    @brief Startet den Dienst mit Parametern von der Kommandozeile.
+    """
+    parser = argparse.ArgumentParser(description="Residenter Sensor-Erfassungsdienst")
+    parser.add_argument("--rate", action="append", default=[], metavar="SENSOR=HZ",
+                        help="Zielrate eines Sensors (überschreibt settings[\"poll_rates\"], mehrfach möglich)")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Pfad des Unix-Domain-Sockets")
+    parser.add_argument("--stdio", action="store_true", help="Agent-Modus: Datensätze auf stdout statt Socket")
+    parser.add_argument("--follow", default=BME_FILE, help="Im Agent-Modus weitergereichte CSV-Datei ('' => keine)")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    rates = dict(settings["poll_rates"])
+    for eintrag in args.rate:
+        name, sep, hz = eintrag.partition("=")
+        try:
+            if not sep:
+                raise ValueError("erwartet SENSOR=HZ")
+            check_sensor_names([name])
+            rates[name] = float(hz)
+            if not rates[name] > 0:
+                raise ValueError("Rate muss positiv sein")
+        except ValueError as e:
+            parser.error(f"--rate {eintrag}: {e}")
+
+    # Schneller als der BME280 wandelt, kämen nur dieselben Registerwerte erneut
+    bme_max = bme280_timing(bme280_profile(settings))["max_rate"]
+    if rates.get("BME280", DEFAULT_RATE) > bme_max:
+        print(f"BME280-Rate auf {bme_max:.2f} Hz begrenzt (Profil {settings['bme280_profile']}).", file=sys.stderr)
+        rates["BME280"] = bme_max
+    mcp_max = mcp9600_max_rate(settings["mcp9600"]["adc_resolution"])
+    if rates.get("MCP9600_AIRFLOW", DEFAULT_RATE) > mcp_max:
+        print(f"MCP9600-Rate auf {mcp_max:.2f} Hz begrenzt (ADC-Auflösung).", file=sys.stderr)
+        rates["MCP9600_AIRFLOW"] = mcp_max
+
+    daemon = AcquisitionDaemon(rates=rates, socket_path=args.socket)
+    try:
+        if args.stdio:
+            daemon.serve_stdio(follow_path=args.follow or None)
+        else:
+            print(f"Erfassungsdienst gestartet ({args.socket}, Raten {rates}).", file=sys.stderr)
+            daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        print(f"Erfassungsdienst läuft bereits: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        print(daemon.poller.summary(), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -2,97 +2,149 @@
 """
 @file aggregator.py
 @brief Aggregiert Messwerte verschiedener Sensoren über den TCA9548A-Multiplexer und gibt sie als JSON aus.
+       Ein Aufruf liest alle angeforderten Sensoren (--sensors, Standard: alle) unter einem Lock und
+       liefert einen einzigen Datensatz {"type": "sensors", "t": Unix-Zeit, "values": {feld: float}},
+       dasselbe Format, das acquisition_daemon.py verteilt (siehe sensor_record()).
 """
 
-import smbus2
-import time
+import argparse
 import json
 import sys
-
-MUX_ADDRESS       = 0x70
-CHANNEL_0_BITMASK = 0x01
-CHANNEL_1_BITMASK = 0x02
-CHANNEL_2_BITMASK = 0x04
-
-def select_channel(bus, channel_mask):
-    """
-    @fn select_channel(bus, channel_mask)
-    @brief Aktiviert bestimmte Kanäle am Multiplexer.
-    @param bus: smbus2.SMBus Objekt
-    @param channel_mask: Bitmaske (z.B. 0x01 für Kanal 0)
-    """
-    bus.write_byte_data(MUX_ADDRESS, 0x00, channel_mask)
-    time.sleep(0.01)
+import time
+from mux_helper import acquire_i2c_lock, release_i2c_lock, get_bus_session
+from sdp810 import SDP810
+from control.bme280 import BME280
+from mcp9600 import MCP9600
+from config.settings import load_settings, bme280_profile
 
 BME280_ADDR = 0x77
+_bme280 = None
 def read_bme280(bus):
     """
     @fn read_bme280(bus)
-    @brief Beispielhaftes Auslesen eines BME280 (liest hier nur die Chip-ID und verwendet Platzhalterwerte).
-    @param bus: smbus2.SMBus Objekt
-    @return dict mit Beispielwerten und Chip-ID
+    @brief Liest Temperatur, Feuchte und Druck des BME280 über den Treiber aus control/bme280.py
+           (Kalibrierung wird nur beim ersten Aufruf gelesen, danach ein Blocklesezugriff je Messung).
+           Konfiguriert wird das Erfassungsprofil aus settings["bme280_profile"].
+    @param bus: geöffneter SMBus
+    @return dict mit Keys 'bme_temp' (°C), 'bme_hum' (%) und 'bme_pres' (hPa)
     """
-    chip_id = bus.read_byte_data(BME280_ADDR, 0xD0)
-    temperature = 25.0
-    humidity    = 45.0
-    pressure    = 1000.0
+    global _bme280
+    if _bme280 is None or _bme280.bus is not bus:
+        _bme280 = BME280(bus, address=BME280_ADDR, **bme280_profile(load_settings()))
+    temperature, humidity, pressure = _bme280.read()
     return {
         "bme_temp": temperature,
         "bme_hum":  humidity,
-        "bme_pres": pressure,
-        "bme_chip": chip_id
+        "bme_pres": pressure
     }
 
 MCP9600_ADDR = 0x67
+_mcp9600 = None
 def read_mcp9600(bus):
     """
     @fn read_mcp9600(bus)
-    @brief Liest ein Registerpaar für die Ambient-Temperatur des MCP9600.
-    @param bus: smbus2.SMBus Objekt
-    @return dict mit Key 'mcp_temp'
+    @brief Liest Hot-Junction, Differenz und Cold-Junction des MCP9600 über den Treiber aus mcp9600.py
+           (ein kombinierter Lesezugriff, ohne auf die nächste Wandlung zu warten).
+    @param bus: geöffneter SMBus
+    @return dict mit Keys 'mcp_temp' (T_H), 'mcp_delta' (T_Δ) und 'mcp_cold' (T_C) in °C
     """
-    data = bus.read_i2c_block_data(MCP9600_ADDR, 0x00, 2)
-    raw_temp = (data[0] << 8) | data[1]
-    temperature = raw_temp / 16.0
-    return {"mcp_temp": temperature}
+    global _mcp9600
+    if _mcp9600 is None or _mcp9600.bus is not bus:
+        _mcp9600 = MCP9600(bus, address=MCP9600_ADDR, **load_settings()["mcp9600"])
+    hot, delta, cold = _mcp9600.read(wait=False)
+    return {"mcp_temp": hot, "mcp_delta": delta, "mcp_cold": cold}
 
 SDP810_ADDR = 0x25
+_sdp810 = None
 def read_sdp810(bus):
     """
     @fn read_sdp810(bus)
-    @brief Minimales Beispiel zum Auslesen des SDP810 (2 Bytes + Umrechnung).
-    @param bus: smbus2.SMBus Objekt
-    @return dict mit Key 'sdp_pressure'
+    @brief Liest Differenzdruck und Temperatur über den Continuous-Treiber aus sdp810.py.
+    @param bus: geöffneter SMBus
+    @return dict mit Keys 'sdp_pressure' und 'sdp_temp'
     """
-    data = bus.read_i2c_block_data(SDP810_ADDR, 0, 2)
-    raw_val = (data[0] << 8) | data[1]
-    pressure_pa = raw_val * 2.0
-    return {"sdp_pressure": pressure_pa}
+    global _sdp810
+    if _sdp810 is None or _sdp810.bus is not bus:
+        _sdp810 = SDP810(bus, address=SDP810_ADDR)
+    pressure, temperature = _sdp810.read_measurement()
+    return {"sdp_pressure": pressure, "sdp_temp": temperature}
 
-def main():
-    """
-    @fn main()
-    @brief Liest nacheinander BME280, MCP9600 und SDP810 aus, fasst die Werte in einem JSON-Objekt zusammen.
-    """
-    bus = smbus2.SMBus(1)
-    try:
-        result = {}
+# Reihenfolge der Abfrage: (Name in mux_helper.SENSOR_CHANNEL_MAP, Lesefunktion)
+SENSOR_READERS = [
+    ("BME280", read_bme280),
+    ("MCP9600_AIRFLOW", read_mcp9600),
+    ("SDP810", read_sdp810),
+]
 
-        select_channel(bus, CHANNEL_0_BITMASK)
-        result.update(read_bme280(bus))
+SENSOR_NAMES = [name for name, _ in SENSOR_READERS]
 
-        select_channel(bus, CHANNEL_1_BITMASK)
-        result.update(read_mcp9600(bus))
+def check_sensor_names(names):
+    """
+    @fn check_sensor_names(names)
+    @brief Prüft angeforderte Sensornamen gegen SENSOR_READERS.
+    @param names: Liste von Sensornamen (str)
+    @return Menge der Namen
+    @throws ValueError bei unbekannten Namen oder wenn names keine Liste von Strings ist
+    """
+    if not isinstance(names, (list, tuple, set)) or not all(isinstance(n, str) for n in names):
+        raise ValueError(f"Sensorliste erwartet, erhalten: {names!r}")
+    names = set(names)
+    unbekannt = names - set(SENSOR_NAMES)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Sensoren: {', '.join(sorted(unbekannt))}")
+    return names
 
-        select_channel(bus, CHANNEL_2_BITMASK)
-        result.update(read_sdp810(bus))
+def sensor_record(values):
+    """
+    @fn sensor_record(values)
+    @brief Verpackt Messwerte als Datensatz mit Typ und Zeitstempel.
+    @param values: dict {feld: wert}
+    @return dict {"type": "sensors", "t": Unix-Zeit, "values": {feld: float}}
+    """
+    return {"type": "sensors", "t": time.time(),
+            "values": {feld: float(wert) for feld, wert in values.items() if wert is not None}}
 
-        print(json.dumps(result))
+def read_all(session=None, names=None):
+    """
+    @fn read_all(session=None, names=None)
+    @brief Liest die Sensoren aus SENSOR_READERS unter einem einzigen I2C-Lock.
+           Fehler einzelner Sensoren werden gemeldet, die übrigen Werte bleiben erhalten.
+    @param session: mux_helper.I2CBusSession; None => Standard-Session
+    @param names: Sensornamen, die gelesen werden sollen (None => alle)
+    @return dict mit allen gelesenen Werten
+    """
+    session = session if session is not None else get_bus_session()
+    names = check_sensor_names(names) if names is not None else None
+    result = {}
+    lockfile = acquire_i2c_lock()
+    try:
+        session.invalidate()
+        for sensor_name, reader in SENSOR_READERS:
+            if names is not None and sensor_name not in names:
+                continue
+            try:
+                session.select_for(sensor_name)
+                result.update(reader(session.bus))
+            except (OSError, ValueError) as e:
+                print(f"Aggregator: Fehler bei {sensor_name}: {e}", file=sys.stderr)
+    finally:
+        release_i2c_lock(lockfile)
+    return result
 
+def main():
+    """
+    @fn main()
+    @brief Liest die angeforderten Sensoren einmal aus und gibt den Datensatz als eine JSON-Zeile aus.
+    """
+    parser = argparse.ArgumentParser(description="Alle angeforderten Sensoren in einem Datensatz auslesen")
+    parser.add_argument("--sensors", default=None, metavar="NAME,...",
+                        help=f"Kommagetrennte Sensoren aus {', '.join(SENSOR_NAMES)} (Standard: alle)")
+    args = parser.parse_args()
+    try:
+        names = args.sensors.split(",") if args.sensors else None
+        print(json.dumps(sensor_record(read_all(names=names))))
     except Exception as e:
         print(f"Aggregator error: {e}", file=sys.stderr)
-    finally:
-        bus.close()
 
 if __name__ == "__main__":
     main()
@@ -1,139 +1,194 @@
 # heating.py
 """
 @file heating.py
-@brief Steuert die Heizung via PWM und loggt Daten des BME280-Sensors in /tmp/bme_data.csv.
+@brief Steuert die Heizung via PWM und loggt Daten des BME280-Sensors in /tmp/bme_data.csv
+       sowie in den Shared-Memory-Kanal (control/sample_channel.py).
+       Sollwert, Lüfter-Duty und Stopp kommen über den Befehlskanal (control/command_channel.py).
+       Die Regelzyklen laufen gegen feste Termine (control/scheduler.py); Zeitstatistik per Befehl
+       "stats" bzw. in /tmp/heating_timing.json.
+       "python heating.py --autotune SOLLWERT" führt ohne GUI einen Relais-Versuch durch
+       (logic/autotune.py), speichert die PID-Parameter in settings.json und beendet sich.
+       Der BME280 wird über den schlanken SMBus-Treiber control/bme280.py gelesen (ein Blocklesezugriff je Zyklus).
+       Oversampling, Filter und Standby kommen aus settings["bme280_profile"]; der Regelzyklus läuft
+       im Takt der Wandlungen des Sensors und richtet sich neu aus, wenn er in eine Wandlung fällt.
        Nutzt mux_helper für Multiplexer und Lock-Mechanik.
 """
 
+import argparse
 import time
-import os
 import pigpio
-import board
-import busio
-import smbus
-from adafruit_bme280.advanced import Adafruit_BME280_I2C
 from config.settings import (
     HEATER_PIN, FAN_PIN,
-    load_settings
+    INVERT_PWM, load_settings, bme280_profile
 )
-from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for
+from control.bme_logger import RotatingCsvLogger
+from control.sample_channel import SampleChannelWriter
+from control.command_channel import CommandServer, HeaterCommands
+from control.scheduler import DeadlineScheduler
+from logic.temperature_controller import create_controller
+from logic.autotune import AutotuneSession, save_tuned_gains
+from control.bme280 import BME280
+from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for, get_bus_session
 
-SETPOINT_FILE    = "/tmp/heater_setpoint.txt"
 BME_FILE         = "/tmp/bme_data.csv"
 BME_SENSOR_NAME  = "BME280"
+BME_ADDRESS      = 0x76
+TIMING_FILE      = "/tmp/heating_timing.json"
+STATS_PERIOD     = 60.0  # Sekunden zwischen zwei Exporten der Zeitstatistik
 
-def read_setpoint():
+def main(autotune=None):
     """
-    @fn read_setpoint()
-    @brief Liest die Solltemperatur aus /tmp/heater_setpoint.txt (falls vorhanden).
-    @return float oder None
-    """
-    if not os.path.exists(SETPOINT_FILE):
-        return None
-    with open(SETPOINT_FILE, "r") as f:
-        line = f.read().strip()
-        if not line:
-            return None
-        try:
-            return float(line)
-        except ValueError:
-            return None
-
-def main():
-    """
-    @fn main()
+    @fn main(autotune=None)
     @brief Hauptfunktion: Initialisiert pigpio, setzt PWM-Frequenz, liest BME280 aus und regelt die Heizung.
+    @param autotune: Sollwert für einen Relais-Versuch ohne GUI (das Skript endet danach) oder None
     """
     settings = load_settings()
     pwm_frequency = settings.get("pwm_frequency", 5000)
 
+    # Befehlskanal und Shared Memory zuerst belegen: Läuft bereits ein heating.py, darf diese Instanz
+    # weder Pins noch Sensor anfassen
+    try:
+        server = CommandServer()
+    except OSError as e:
+        print(f"heating.py läuft bereits, Abbruch: {e}")
+        return
+    try:
+        channel = SampleChannelWriter()  # Shared Memory für eine GUI auf demselben Rechner
+    except OSError as e:
+        server.close()
+        print(f"heating.py läuft bereits, Abbruch: {e}")
+        return
+
     pi = pigpio.pi()
     if not pi.connected:
         print("Cannot connect to pigpio daemon!")
+        channel.close()
+        server.close()
         return
 
     pi.set_PWM_frequency(HEATER_PIN, pwm_frequency)
     pi.set_PWM_frequency(FAN_PIN, pwm_frequency)
 
-    lockfile = acquire_i2c_lock()
-    try:
-        switch_mux_channel_for(BME_SENSOR_NAME)
-        i2c = busio.I2C(board.SCL, board.SDA)
-
-        bme280 = None
-        for _ in range(3):
-            try:
-                bme280 = Adafruit_BME280_I2C(i2c, address=0x76)
-                break
-            except Exception as e:
-                print(f"Fehler bei der BME280-Initialisierung (0x76): {e}")
-                time.sleep(1)
-
-        if bme280 is None:
-            print("BME280 konnte nicht initialisiert werden.")
+    bme280 = BME280(get_bus_session().bus, address=BME_ADDRESS, **bme280_profile(settings))
+    for _ in range(3):
+        lockfile = acquire_i2c_lock()
+        try:
+            switch_mux_channel_for(BME_SENSOR_NAME)
+            bme280.begin()
+            break
+        except (OSError, ValueError) as e:
+            print(f"Fehler bei der BME280-Initialisierung (0x{BME_ADDRESS:02X}): {e}")
+        finally:
             release_i2c_lock(lockfile)
-            return
-    finally:
-        release_i2c_lock(lockfile)
-
-    heater_on = False
-    hysteresis = 1.0
+        time.sleep(1)
 
-    if not os.path.exists(BME_FILE):
-        with open(BME_FILE, "w") as f:
-            f.write("timestamp,temperature,humidity,pressure\n")
+    if bme280.calibration is None:
+        print("BME280 konnte nicht initialisiert werden.")
+        pi.stop()
+        channel.close()
+        server.close()
+        return
 
-    print("Heizungs-Skript gestartet. Loggt BME280-Daten (~5 Hz). Wenn kein Sollwert vorhanden ist, wird 20°C angenommen (nur Messung).")
-    try:
-        while True:
-            # I2C-Lock holen und BME280 auslesen
-            lockfile = acquire_i2c_lock()
-            try:
-                switch_mux_channel_for(BME_SENSOR_NAME)
-                temp = bme280.temperature
-                hum  = bme280.humidity
-                pres = bme280.pressure
-            except Exception as e:
-                print(f"Fehler beim Lesen des BME280: {e}")
-                temp, hum, pres = None, None, None
-            finally:
-                release_i2c_lock(lockfile)
-
-            if temp is not None:
-                with open(BME_FILE, "a") as f:
-                    f.write(f"{time.time()},{temp},{hum},{pres}\n")
-
-            raw_setpoint = read_setpoint()
-            if raw_setpoint is None:
-                setpoint = 20.0
-                control_active = False
-            else:
-                setpoint = raw_setpoint
-                control_active = True
-
-            if control_active and (temp is not None):
-                upper = setpoint + hysteresis
-                lower = setpoint - hysteresis
-                if heater_on and (temp >= upper):
-                    pi.set_PWM_dutycycle(HEATER_PIN, 0)
-                    heater_on = False
-                elif not heater_on and (temp <= lower):
-                    pi.set_PWM_dutycycle(HEATER_PIN, 255)
-                    heater_on = True
+    controller = create_controller(pi.set_PWM_dutycycle, HEATER_PIN, settings["heater_control"], INVERT_PWM)
+
+    logger = RotatingCsvLogger(BME_FILE, "timestamp,temperature,humidity,pressure", **settings["bme_log"])
+    commands = HeaterCommands()
+    fan_duty = 0
+    session = None
+    if autotune is not None:
+        reply = commands.handle({"cmd": "autotune", "value": autotune})
+        if not reply["ok"]:
+            print(f"Selbsteinstellung nicht möglich: {reply['error']}")
+            commands.stop_requested = True
+
+    print(f"Heizungs-Skript gestartet. Loggt BME280-Daten (Profil {settings['bme280_profile']}, "
+          f"{1 / bme280.sample_period:.1f} Hz). Ohne Sollwert bleibt die Heizung aus (nur Messung).")
+
+    def control_cycle():
+        """
+        @brief Ein Regelzyklus: Befehle übernehmen, BME280 lesen, protokollieren und regeln.
+        """
+        nonlocal fan_duty, session
+        if commands.fan_duty != fan_duty:
+            fan_duty = commands.fan_duty
+            pi.set_PWM_dutycycle(FAN_PIN, fan_duty)
+
+        # I2C-Lock holen und BME280 auslesen
+        lockfile = acquire_i2c_lock()
+        try:
+            switch_mux_channel_for(BME_SENSOR_NAME)
+            waited = bme280.wait_until_idle()
+            temp, hum, pres = bme280.read()
+        except (OSError, ValueError) as e:
+            print(f"Fehler beim Lesen des BME280: {e}")
+            temp, hum, pres = None, None, None
+            waited = 0.0
+        finally:
+            release_i2c_lock(lockfile)
+        if waited > 0:
+            # Termin lag in einer Wandlung: Raster auf das Ende der Wandlung verschieben
+            control_task.delay_next(control_task.period + waited)
+
+        if temp is not None:
+            timestamp = time.time()
+            channel.write(timestamp, temp, hum, pres)
+            logger.write(timestamp, temp, hum, pres)
+
+        if commands.autotune_request is not None:
+            print(f"Selbsteinstellung (Relais-Versuch) um {commands.autotune_request} °C gestartet.")
+            session = AutotuneSession(controller, commands.autotune_request, settings["autotune"])
+            commands.setpoint = commands.autotune_request
+            commands.autotune_request = None
+            commands.autotune_status = {"status": "running"}
+        elif session is not None and commands.setpoint != controller.target_temp:
+            print("Selbsteinstellung durch neuen Sollwert abgebrochen.")
+            session.abort()
+            session = None
+            commands.autotune_status = {"status": "aborted"}
+
+        if commands.setpoint != controller.target_temp:
+            controller.set_target_temperature(commands.setpoint)
+        if temp is not None:
+            controller.update_control(temp)
+
+        result = session.poll() if session is not None else None
+        if result is not None:
+            session = None
+            if "gains" in result:
+                save_tuned_gains(result["gains"])
+                commands.autotune_status = {"status": "done", **result}
+                print(f"Selbsteinstellung abgeschlossen: Ku={result['ku']:.3f}, Tu={result['tu']:.1f} s "
+                      f"=> {result['gains']} (in settings.json gespeichert)")
             else:
-                if heater_on:
-                    pi.set_PWM_dutycycle(HEATER_PIN, 0)
-                    heater_on = False
+                commands.autotune_status = {"status": "failed", **result}
+                print(f"Selbsteinstellung fehlgeschlagen: {result['error']}")
+            if autotune is not None:
+                commands.stop_requested = True
 
-            time.sleep(0.2)
+    # Feste Termine statt sleep; bis zum nächsten Termin werden Befehle bedient
+    scheduler = DeadlineScheduler(wait=lambda deadline: server.serve_until(deadline, commands))
+    control_task = scheduler.add_task("control", bme280.sample_period, control_cycle)
+    scheduler.add_task("stats", STATS_PERIOD, lambda: scheduler.export(TIMING_FILE), phase=STATS_PERIOD)
+    commands.stats_provider = scheduler.stats
+
+    try:
+        scheduler.run(lambda: commands.stop_requested)
 
     except KeyboardInterrupt:
         pass
     finally:
-        pi.set_PWM_dutycycle(HEATER_PIN, 0)
+        controller.off()
         pi.set_PWM_dutycycle(FAN_PIN, 0)
         pi.stop()
+        logger.close()
+        channel.close()
+        server.close()
+        scheduler.export(TIMING_FILE)
+        print(scheduler.summary())
         print("Heizungs-Skript beendet => Heizung und Lüfter AUS.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Heizungsregelung und BME280-Protokoll")
+    parser.add_argument("--autotune", type=float, metavar="SOLLWERT",
+                        help="Relais-Versuch um SOLLWERT °C durchführen, PID-Parameter speichern und beenden")
+    main(parser.parse_args().autotune)
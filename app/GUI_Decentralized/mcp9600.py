@@ -0,0 +1,235 @@
+# mcp9600.py
+"""
+@file mcp9600.py
+@brief Treiber für den Thermoelement-Wandler MCP9600 auf dem offenen SMBus der mux_helper-Session.
+       Register laut Datenblatt: 0x00 Hot-Junction T_H (kompensierte Thermoelementtemperatur),
+       0x01 Differenz T_Δ (= T_H - T_C, unkompensiert), 0x02 Cold-Junction T_C (Umgebung des Chips),
+       0x04 Status, 0x05 Thermoelement-Konfiguration, 0x06 Geräte-Konfiguration, 0x20 Geräte-ID.
+       Status und die drei Temperaturregister werden mit smbus2 in einem einzigen i2c_rdwr-Aufruf
+       (Zeiger schreiben + Repeated Start je Register) gelesen. read() wartet auf das
+       "T_H Update"- bzw. im Burst-Modus auf das "Burst Complete"-Flag und setzt es vor dem Lesen der
+       Register zurück, sodass keine Wandlung übergangen wird.
+       Multiplexer-Umschaltung und I2C-Lock übernimmt der Aufrufer.
+"""
+
+import time
+
+from mux_helper import get_bus_session
+
+try:
+    from smbus2 import i2c_msg
+except ImportError:
+    i2c_msg = None
+
+MCP9600_ADDRESS   = 0x67
+MCP9600_DEVICE_ID = 0x40
+
+REG_HOT_JUNCTION  = 0x00
+REG_DELTA         = 0x01
+REG_COLD_JUNCTION = 0x02
+REG_STATUS        = 0x04
+REG_SENSOR_CONFIG = 0x05
+REG_DEVICE_CONFIG = 0x06
+REG_DEVICE_ID     = 0x20
+
+STATUS_BURST_COMPLETE = 0x80
+STATUS_TH_UPDATE      = 0x40
+
+TEMPERATURE_LSB = 0.0625
+
+THERMOCOUPLE_TYPES = {"K": 0, "J": 1, "T": 2, "N": 3, "S": 4, "E": 5, "B": 6, "R": 7}
+# ADC-Auflösung in Bit -> (Registerwert, Wandlungszeit in Sekunden laut Datenblatt)
+ADC_RESOLUTIONS = {18: (0, 0.320), 16: (1, 0.080), 14: (2, 0.020), 12: (3, 0.005)}
+# Auflösung der Cold-Junction in °C -> Registerwert
+COLD_JUNCTION_RESOLUTIONS = {0.0625: 0, 0.25: 1}
+# Anzahl Messungen im Burst-Modus -> Registerwert
+BURST_SAMPLES = {1: 0, 2: 1, 4: 2, 8: 3, 16: 4, 32: 5, 64: 6, 128: 7}
+
+MODE_NORMAL   = 0
+MODE_SHUTDOWN = 1
+MODE_BURST    = 2
+
+def decode_temperature(msb, lsb):
+    """
+    @fn decode_temperature(msb, lsb)
+    @brief Wandelt ein 16-Bit-Temperaturregister (Zweierkomplement, 0.0625 °C/LSB) in °C um.
+    @return float
+    """
+    raw = (msb << 8) | lsb
+    if raw & 0x8000:
+        raw -= 0x10000
+    return raw * TEMPERATURE_LSB
+
+def max_rate(adc_resolution):
+    """
+    @fn max_rate(adc_resolution)
+    @brief Höchste Rate neuer Messwerte im Normalmodus.
+    @param adc_resolution: 18, 16, 14 oder 12
+    @return Hz
+    """
+    return 1.0 / ADC_RESOLUTIONS[adc_resolution][1]
+
+class MCP9600:
+    """
+    @class MCP9600
+    @brief Zustandsbehafteter Treiber: begin() prüft die Geräte-ID und schreibt die Konfiguration,
+           read() liefert danach (T_H, T_Δ, T_C) der jeweils neuesten Wandlung.
+           Die Standardwerte entsprechen dem Einschaltzustand (Typ K, 18 Bit, ohne Filter).
+    """
+    def __init__(self, bus=None, address=MCP9600_ADDRESS, thermocouple="K", adc_resolution=18,
+                 filter_coefficient=0, cold_junction_resolution=0.0625, burst_samples=None):
+        """
+        @fn __init__(bus=None, address=MCP9600_ADDRESS, thermocouple="K", adc_resolution=18, filter_coefficient=0, cold_junction_resolution=0.0625, burst_samples=None)
+        @param bus: geöffneter SMBus; None => Bus der Standard-Session aus mux_helper
+        @param address: I2C-Adresse
+        @param thermocouple: Thermoelementtyp (siehe THERMOCOUPLE_TYPES)
+        @param adc_resolution: ADC-Auflösung in Bit (siehe ADC_RESOLUTIONS)
+        @param filter_coefficient: digitaler Filter 0 (aus) .. 7 (stärkste Glättung)
+        @param cold_junction_resolution: 0.0625 oder 0.25 °C
+        @param burst_samples: None => kontinuierliche Wandlung; sonst Anzahl Messungen je Burst
+               (siehe BURST_SAMPLES), danach geht der Baustein in Shutdown
+        """
+        if thermocouple not in THERMOCOUPLE_TYPES:
+            raise ValueError(f"Unbekannter Thermoelementtyp: {thermocouple}")
+        if adc_resolution not in ADC_RESOLUTIONS:
+            raise ValueError(f"Ungültige ADC-Auflösung: {adc_resolution}")
+        if not 0 <= filter_coefficient <= 7:
+            raise ValueError(f"Ungültiger Filterkoeffizient: {filter_coefficient}")
+        if cold_junction_resolution not in COLD_JUNCTION_RESOLUTIONS:
+            raise ValueError(f"Ungültige Cold-Junction-Auflösung: {cold_junction_resolution}")
+        if burst_samples is not None and burst_samples not in BURST_SAMPLES:
+            raise ValueError(f"Ungültige Burst-Länge: {burst_samples}")
+        self.bus = bus if bus is not None else get_bus_session().bus
+        self.address = address
+        self.thermocouple = thermocouple
+        self.adc_resolution = adc_resolution
+        self.filter_coefficient = filter_coefficient
+        self.cold_junction_resolution = cold_junction_resolution
+        self.burst_samples = burst_samples
+        self.configured = False
+
+    @property
+    def conversion_time(self):
+        """
+        @property conversion_time
+        @return Sekunden bis zu einem neuen Messwert (im Burst-Modus für den ganzen Burst)
+        """
+        zeit = ADC_RESOLUTIONS[self.adc_resolution][1]
+        return zeit * (self.burst_samples or 1)
+
+    def begin(self):
+        """
+        @fn begin()
+        @brief Prüft die Geräte-ID und schreibt Thermoelement- und Geräte-Konfiguration.
+        @throws ValueError, wenn unter der Adresse kein MCP9600 antwortet
+        """
+        device_id = self.bus.read_i2c_block_data(self.address, REG_DEVICE_ID, 2)[0]
+        if device_id != MCP9600_DEVICE_ID:
+            raise ValueError(f"Kein MCP9600 an 0x{self.address:02X} (Geräte-ID 0x{device_id:02X})")
+        self.bus.write_byte_data(self.address, REG_SENSOR_CONFIG,
+                                 (THERMOCOUPLE_TYPES[self.thermocouple] << 4) | self.filter_coefficient)
+        mode = MODE_NORMAL if self.burst_samples is None else MODE_SHUTDOWN
+        self.bus.write_byte_data(self.address, REG_DEVICE_CONFIG, self.device_config(mode))
+        self.clear_status()
+        self.configured = True
+
+    def device_config(self, mode):
+        """
+        @fn device_config(mode)
+        @return Wert des Geräte-Konfigurationsregisters für den angegebenen Betriebsmodus
+        """
+        burst = BURST_SAMPLES[self.burst_samples] if self.burst_samples is not None else 0
+        return ((COLD_JUNCTION_RESOLUTIONS[self.cold_junction_resolution] << 7)
+                | (ADC_RESOLUTIONS[self.adc_resolution][0] << 5) | (burst << 2) | mode)
+
+    def clear_status(self):
+        """
+        @fn clear_status()
+        @brief Setzt die Flags "Burst Complete" und "T_H Update" zurück.
+        """
+        self.bus.write_byte_data(self.address, REG_STATUS, 0)
+
+    def read_status(self):
+        """
+        @fn read_status()
+        @return Statusregister
+        """
+        return self.bus.read_byte_data(self.address, REG_STATUS)
+
+    def start_burst(self):
+        """
+        @fn start_burst()
+        @brief Startet im Burst-Modus eine neue Folge von burst_samples Messungen.
+        """
+        if not self.configured:
+            self.begin()
+        self.clear_status()
+        self.bus.write_byte_data(self.address, REG_DEVICE_CONFIG, self.device_config(MODE_BURST))
+
+    def read_registers(self):
+        """
+        @fn read_registers()
+        @brief Liest Status und die drei Temperaturregister; mit smbus2 als ein einziger i2c_rdwr-Aufruf.
+        @return Tupel (Status, T_H, T_Δ, T_C)
+        """
+        if not self.configured:
+            self.begin()
+        register = (REG_STATUS, REG_HOT_JUNCTION, REG_DELTA, REG_COLD_JUNCTION)
+        if i2c_msg is not None and hasattr(self.bus, "i2c_rdwr"):
+            msgs = []
+            for reg in register:
+                msgs.append(i2c_msg.write(self.address, [reg]))
+                msgs.append(i2c_msg.read(self.address, 1 if reg == REG_STATUS else 2))
+            self.bus.i2c_rdwr(*msgs)
+            daten = [list(msgs[i]) for i in range(1, len(msgs), 2)]
+        else:
+            daten = [self.bus.read_i2c_block_data(self.address, reg, 1 if reg == REG_STATUS else 2)
+                     for reg in register]
+        status = daten[0][0]
+        return (status,) + tuple(decode_temperature(*d) for d in daten[1:])
+
+    def read(self, wait=True, timeout=None):
+        """
+        @fn read(wait=True, timeout=None)
+        @brief Liefert die Temperaturen einer neuen Wandlung. Das Fertig-Flag wird vor dem Lesen der
+               Register quittiert: eine Wandlung, die danach fertig wird, setzt es erneut und wird beim
+               nächsten Aufruf geliefert, statt verloren zu gehen.
+        @param wait: True => auf eine neue Wandlung warten; False => sofort die aktuellen Register
+               (das Flag bleibt dabei unverändert)
+        @param timeout: maximale Wartezeit in Sekunden (Standard: 1.5 * conversion_time)
+        @return Tupel (T_H, T_Δ, T_C) in °C
+        @throws ValueError, wenn innerhalb von timeout keine neue Wandlung fertig wurde
+        """
+        if not wait:
+            _, hot, delta, cold = self.read_registers()
+            return hot, delta, cold
+
+        if not self.configured:
+            self.begin()
+        flag = STATUS_TH_UPDATE if self.burst_samples is None else STATUS_BURST_COMPLETE
+        if not self.read_status() & flag:
+            timeout = 1.5 * self.conversion_time if timeout is None else timeout
+            ende = time.monotonic() + timeout
+            pause = max(ADC_RESOLUTIONS[self.adc_resolution][1] / 10, 0.001)
+            while not self.read_status() & flag:
+                if time.monotonic() >= ende:
+                    raise ValueError("MCP9600: keine neue Wandlung innerhalb der Wartezeit")
+                time.sleep(pause)
+        self.clear_status()
+        _, hot, delta, cold = self.read_registers()
+        return hot, delta, cold
+
+_drivers = {}
+
+def get_mcp9600(sensor_name, **conf):
+    """
+    @fn get_mcp9600(sensor_name, **conf)
+    @brief Liefert die prozessweite Treiberinstanz für einen Sensor aus mux_helper.SENSOR_CHANNEL_MAP
+           (mehrere MCP9600 teilen sich die Adresse auf verschiedenen Multiplexer-Kanälen).
+    @param sensor_name: z.B. "MCP9600_AIRFLOW" oder "MCP9600_ENV"
+    @param conf: Parameter für MCP9600 beim ersten Aufruf (z.B. settings["mcp9600"])
+    @return MCP9600
+    """
+    if sensor_name not in _drivers:
+        _drivers[sensor_name] = MCP9600(**conf)
+    return _drivers[sensor_name]
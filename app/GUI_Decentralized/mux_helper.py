@@ -2,13 +2,21 @@
 """
 @file mux_helper.py
 @brief Stellt Funktionen zum Umschalten des TCA9548A-Multiplexers bereit sowie eine Lock-Mechanik für I2C.
+       Die Klasse I2CBusSession hält den Bus dauerhaft offen, merkt sich das zuletzt geschriebene
+       Control-Byte und schreibt nur, wenn sich der Kanal tatsächlich ändert.
+       Kanäle, deren Geräte-Adressen mit keinem anderen Kanal kollidieren, bleiben dauerhaft
+       gleichzeitig aktiv; nur kollidierende Kanäle werden einzeln umgeschaltet.
 """
 
 import fcntl
-import smbus
 import time
 import os
 
+try:
+    from smbus2 import SMBus  # unterstützt i2c_rdwr (kombinierte Transfers, reine Lesezugriffe)
+except ImportError:
+    from smbus import SMBus
+
 LOCKFILE_PATH = "/tmp/mux_i2c.lock"
 MUX_ADDRESS   = 0x70
 I2C_BUS       = 1
@@ -20,14 +28,36 @@ SENSOR_CHANNEL_MAP = {
     "BME280": 0
 }
 
+# I2C-Adressen der Sensoren (Tupel, falls ein Sensor je nach Beschaltung mehrere Adressen nutzen kann)
+SENSOR_ADDRESS_MAP = {
+    "SDP810": (0x25,),
+    "MCP9600_ENV": (0x67,),
+    "MCP9600_AIRFLOW": (0x67,),
+    "BME280": (0x76, 0x77)
+}
+
+# True => nicht kollidierende Kanäle gleichzeitig aktivieren (siehe compute_channel_plan)
+MULTI_CHANNEL_MODE = True
+
+# Wartezeit nach einem Kanalwechsel (Sekunden). Der TCA9548A schaltet mit dem
+# STOP-Bit um, längere Wartezeiten sind nur bei langen Leitungen/Kapazitäten nötig.
+DEFAULT_SETTLE_DELAY = 0.0005
+CHANNEL_SETTLE_DELAYS = {}
+
+_default_session = None
+
 def acquire_i2c_lock():
     """
     @fn acquire_i2c_lock()
     @brief Erstellt/öffnet eine Lock-Datei und belegt einen exklusiven Lock.
+           Da andere Prozesse den Multiplexer zwischenzeitlich umgeschaltet haben können,
+           wird der gecachte Kanalzustand der Standard-Session verworfen.
     @return Dateiobjekt, das den Lock repräsentiert
     """
     lockfile = open(LOCKFILE_PATH, "w")
     fcntl.flock(lockfile, fcntl.LOCK_EX)
+    if _default_session is not None:
+        _default_session.invalidate()
     return lockfile
 
 def release_i2c_lock(lockfile):
@@ -39,17 +69,257 @@ def release_i2c_lock(lockfile):
     fcntl.flock(lockfile, fcntl.LOCK_UN)
     lockfile.close()
 
+class ChannelPlan:
+    """
+    @class ChannelPlan
+    @brief Ergebnis von compute_channel_plan(): dauerhaft aktive Kanäle und Maske je Sensor.
+    """
+    def __init__(self, static_mask, sensor_masks, static_sensors):
+        """
+        @fn __init__(static_mask, sensor_masks, static_sensors)
+        @param static_mask: Kanäle ohne Adresskonflikt, die immer aktiv bleiben
+        @param sensor_masks: dict Sensorname -> Control-Byte, das für diesen Sensor geschrieben wird
+        @param static_sensors: Menge der Sensoren, die auf einem konfliktfreien Kanal liegen
+        """
+        self.static_mask = static_mask
+        self.sensor_masks = sensor_masks
+        self.static_sensors = static_sensors
+
+    def mask_for(self, sensor_name):
+        """
+        @fn mask_for(sensor_name)
+        @brief Liefert das Control-Byte für einen Sensor.
+        @param sensor_name: Name des Sensors
+        @return Control-Byte
+        """
+        mask = self.sensor_masks.get(sensor_name)
+        if mask is None:
+            raise ValueError(f"Sensor '{sensor_name}' nicht im Mapping definiert.")
+        return mask
+
+    def is_selected(self, sensor_name, current_mask):
+        """
+        @fn is_selected(sensor_name, current_mask)
+        @brief Prüft, ob der Sensor mit dem aktuellen Control-Byte bereits erreichbar ist.
+        @param sensor_name: Name des Sensors
+        @param current_mask: aktuelles Control-Byte oder None (unbekannt)
+        @return bool
+        """
+        if current_mask is None:
+            return False
+        mask = self.mask_for(sensor_name)
+        if sensor_name in self.static_sensors:
+            # Konfliktfreie Adresse: jede Maske, die den Kanal enthält, genügt
+            return (current_mask & mask) == mask
+        return current_mask == mask
+
+def compute_channel_plan(channel_map=None, address_map=None):
+    """
+    @fn compute_channel_plan(channel_map=None, address_map=None)
+    @brief Berechnet aus Kanal- und Adresszuordnung, welche Kanäle gleichzeitig aktiv sein dürfen.
+           Ein Kanal gilt als konfliktfrei, wenn keine seiner Adressen auf einem anderen Kanal vorkommt.
+           Sensoren ohne Eintrag in address_map werden vorsichtshalber als kollidierend behandelt.
+    @param channel_map: dict Sensorname -> Kanal (Standard: SENSOR_CHANNEL_MAP)
+    @param address_map: dict Sensorname -> Tupel von Adressen (Standard: SENSOR_ADDRESS_MAP)
+    @return ChannelPlan
+    """
+    channel_map = channel_map if channel_map is not None else SENSOR_CHANNEL_MAP
+    address_map = address_map if address_map is not None else SENSOR_ADDRESS_MAP
+
+    channel_addresses = {}
+    unknown_channels = set()
+    for sensor, channel in channel_map.items():
+        addresses = address_map.get(sensor)
+        if addresses is None:
+            unknown_channels.add(channel)
+            continue
+        channel_addresses.setdefault(channel, set()).update(addresses)
+
+    conflicting = set(unknown_channels)
+    channels = sorted(channel_addresses)
+    for i, ch_a in enumerate(channels):
+        for ch_b in channels[i + 1:]:
+            if channel_addresses[ch_a] & channel_addresses[ch_b]:
+                conflicting.update((ch_a, ch_b))
+
+    static_mask = 0
+    for channel in channels:
+        if channel not in conflicting:
+            static_mask |= 1 << channel
+
+    sensor_masks = {}
+    static_sensors = set()
+    for sensor, channel in channel_map.items():
+        if channel in conflicting:
+            sensor_masks[sensor] = static_mask | (1 << channel)
+        else:
+            sensor_masks[sensor] = static_mask
+            static_sensors.add(sensor)
+    return ChannelPlan(static_mask, sensor_masks, static_sensors)
+
+class I2CBusSession:
+    """
+    @class I2CBusSession
+    @brief Langlebige I2C-Sitzung: hält den Dateideskriptor offen und cached das
+           Control-Byte des TCA9548A, sodass redundante Umschaltungen entfallen.
+    """
+    def __init__(self, bus=None, bus_number=I2C_BUS, mux_address=MUX_ADDRESS,
+                 channel_map=None, settle_delays=None, default_settle_delay=DEFAULT_SETTLE_DELAY,
+                 address_map=None, multi_channel=MULTI_CHANNEL_MODE):
+        """
+        @fn __init__(...)
+        @param bus: bereits geöffneter Bus; None => SMBus(bus_number) (smbus2, sonst smbus)
+        @param bus_number: I2C-Busnummer
+        @param mux_address: Adresse des Multiplexers
+        @param channel_map: dict Sensorname -> Kanal (Standard: SENSOR_CHANNEL_MAP)
+        @param settle_delays: dict Kanal -> Wartezeit in Sekunden nach dem Umschalten
+        @param default_settle_delay: Wartezeit für Kanäle ohne eigenen Eintrag
+        @param address_map: dict Sensorname -> Adressen (Standard: SENSOR_ADDRESS_MAP)
+        @param multi_channel: True => konfliktfreie Kanäle dauerhaft gemeinsam aktivieren
+        """
+        self.bus = bus if bus is not None else SMBus(bus_number)
+        self.mux_address = mux_address
+        self.channel_map = channel_map if channel_map is not None else SENSOR_CHANNEL_MAP
+        self.settle_delays = dict(CHANNEL_SETTLE_DELAYS)
+        if settle_delays:
+            self.settle_delays.update(settle_delays)
+        self.default_settle_delay = default_settle_delay
+        self.plan = compute_channel_plan(self.channel_map, address_map) if multi_channel else None
+        self.current_mask = None
+        self.switch_count = 0
+
+    def invalidate(self):
+        """
+        @fn invalidate()
+        @brief Verwirft den gecachten Kanalzustand (z.B. nach einem Lock-Wechsel zwischen Prozessen).
+        """
+        self.current_mask = None
+
+    def read_control(self):
+        """
+        @fn read_control()
+        @brief Liest das Control-Register des Multiplexers und aktualisiert den Cache.
+        @return Aktuelles Control-Byte
+        """
+        self.current_mask = self.bus.read_byte(self.mux_address)
+        return self.current_mask
+
+    def settle_delay_for(self, mask):
+        """
+        @fn settle_delay_for(mask)
+        @brief Ermittelt die größte Wartezeit aller in der Maske aktivierten Kanäle.
+        @param mask: Control-Byte
+        @return Wartezeit in Sekunden
+        """
+        delays = [self.settle_delays.get(ch, self.default_settle_delay)
+                  for ch in range(8) if mask & (1 << ch)]
+        return max(delays) if delays else 0.0
+
+    def select_mask(self, mask):
+        """
+        @fn select_mask(mask)
+        @brief Schreibt das Control-Byte nur, wenn es vom zuletzt bekannten Zustand abweicht.
+        @param mask: Bitmaske der zu aktivierenden Kanäle
+        @return True, wenn tatsächlich umgeschaltet wurde
+        """
+        if self.current_mask is None:
+            try:
+                self.read_control()
+            except OSError:
+                self.current_mask = None
+        if self.current_mask == mask:
+            return False
+
+        self.bus.write_byte(self.mux_address, mask)
+        self.current_mask = mask
+        self.switch_count += 1
+        delay = self.settle_delay_for(mask)
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def select_channel(self, channel):
+        """
+        @fn select_channel(channel)
+        @brief Aktiviert genau einen Kanal.
+        @param channel: Kanalnummer 0..7
+        @return True, wenn umgeschaltet wurde
+        """
+        return self.select_mask(1 << channel)
+
+    def select_for(self, sensor_name):
+        """
+        @fn select_for(sensor_name)
+        @brief Aktiviert den Kanal, der für den Sensor im Mapping hinterlegt ist.
+               Im Mehrkanalmodus wird nur geschrieben, wenn der Sensor mit der aktuellen
+               Maske nicht erreichbar ist.
+        @param sensor_name: Name des Sensors, z.B. "SDP810"
+        @return True, wenn umgeschaltet wurde
+        """
+        if self.plan is not None:
+            if self.current_mask is None:
+                try:
+                    self.read_control()
+                except OSError:
+                    self.current_mask = None
+            if self.plan.is_selected(sensor_name, self.current_mask):
+                return False
+            return self.select_mask(self.plan.mask_for(sensor_name))
+
+        channel = self.channel_map.get(sensor_name)
+        if channel is None:
+            raise ValueError(f"Sensor '{sensor_name}' nicht im Mapping definiert.")
+        return self.select_channel(channel)
+
+    def measure_settle_delay(self, channel, probe_address, timeout=0.1):
+        """
+        @fn measure_settle_delay(channel, probe_address, timeout=0.1)
+        @brief Misst, wie lange ein Gerät nach dem Umschalten braucht, bis es antwortet,
+               und speichert den Wert als Wartezeit für diesen Kanal.
+        @param channel: Kanalnummer
+        @param probe_address: I2C-Adresse eines Geräts auf diesem Kanal
+        @param timeout: maximale Wartezeit in Sekunden
+        @return Gemessene Wartezeit in Sekunden
+        """
+        self.bus.write_byte(self.mux_address, 0x00)
+        self.bus.write_byte(self.mux_address, 1 << channel)
+        self.current_mask = 1 << channel
+        start = time.perf_counter()
+        while True:
+            try:
+                self.bus.read_byte(probe_address)
+                break
+            except OSError:
+                if time.perf_counter() - start > timeout:
+                    raise
+                time.sleep(0.0001)
+        delay = time.perf_counter() - start
+        self.settle_delays[channel] = delay
+        return delay
+
+    def close(self):
+        """
+        @fn close()
+        @brief Schließt den Bus.
+        """
+        self.bus.close()
+        self.current_mask = None
+
+def get_bus_session():
+    """
+    @fn get_bus_session()
+    @brief Liefert die prozessweite Standard-Session (wird beim ersten Aufruf geöffnet).
+    @return I2CBusSession
+    """
+    global _default_session
+    if _default_session is None:
+        _default_session = I2CBusSession()
+    return _default_session
+
 def switch_mux_channel_for(sensor_name: str):
     """
     @fn switch_mux_channel_for(sensor_name: str)
     @brief Aktiviert den Multiplexer-Kanal, der in SENSOR_CHANNEL_MAP hinterlegt ist.
     @param sensor_name: Name des Sensors, z.B. "SDP810" oder "BME280"
     """
-    channel = SENSOR_CHANNEL_MAP.get(sensor_name)
-    if channel is None:
-        raise ValueError(f"Sensor '{sensor_name}' nicht im Mapping definiert.")
-
-    bus = smbus.SMBus(I2C_BUS)
-    bus.write_byte(MUX_ADDRESS, 1 << channel)
-    time.sleep(0.05)
-    bus.close()
+    get_bus_session().select_for(sensor_name)
@@ -0,0 +1,250 @@
+# poll_scheduler.py
+"""
+@file poll_scheduler.py
+@brief Zentraler Abfrageplaner für die Sensoren hinter dem TCA9548A-Multiplexer.
+       Jeder Sensor hat eine eigene Zielrate. Fällige Sensoren werden nach der Multiplexer-Maske
+       gruppiert (siehe mux_helper.compute_channel_plan); jede Gruppe wird unter einer einzigen
+       Belegung von /tmp/mux_i2c.lock und mit höchstens einer Umschaltung gelesen. Sensoren derselben
+       Gruppe, die innerhalb von batch_window fällig werden, werden gleich mitgelesen.
+       Zwischen den Gruppen wird der Lock freigegeben, damit heating.py (BME280) nicht warten muss.
+       Ist der Bus ausgelastet, kommen die am längsten überfälligen Sensoren zuerst an die Reihe;
+       verpasste Termine werden übersprungen statt nachgeholt. stats() vergleicht Soll- und Istrate.
+       Mit set_active() werden nur die Sensoren gelesen, die ein Abnehmer tatsächlich angefordert hat.
+"""
+
+import json
+import math
+import os
+import sys
+import time
+
+from mux_helper import acquire_i2c_lock, release_i2c_lock, get_bus_session
+
+DEFAULT_BATCH_WINDOW = 0.02
+IDLE_RECHECK         = 1.0   # Sekunden bis zur nächsten Prüfung, wenn kein Sensor aktiv ist
+
+class SensorPoll:
+    """
+    @class SensorPoll
+    @brief Zeitplan und Zähler eines Sensors.
+    """
+    def __init__(self, name, reader, rate, first_due):
+        """
+        @fn __init__(name, reader, rate, first_due)
+        @param name: Sensorname in mux_helper.SENSOR_CHANNEL_MAP
+        @param reader: Funktion(bus) -> dict mit Messwerten
+        @param rate: Zielrate in Hz
+        @param first_due: erster Termin (monotone Zeit)
+        """
+        self.name = name
+        self.reader = reader
+        self.rate = float(rate)
+        self.period = 1.0 / self.rate
+        self.next_due = first_due
+        self.reads = 0
+        self.errors = 0
+        self.skipped = 0
+        self.max_late = 0.0
+
+    def advance(self, now):
+        """
+        @fn advance(now)
+        @brief Setzt den nächsten Termin im festen Raster; verpasste Termine werden übersprungen.
+        @param now: aktuelle monotone Zeit
+        """
+        self.max_late = max(self.max_late, now - self.next_due)
+        self.next_due += self.period
+        if self.next_due <= now:
+            verpasst = math.ceil((now - self.next_due) / self.period)
+            self.skipped += verpasst
+            self.next_due += verpasst * self.period
+            if self.next_due <= now:
+                self.next_due += self.period
+                self.skipped += 1
+
+class PollScheduler:
+    """
+    @class PollScheduler
+    @brief Liest fällige Sensoren gruppiert nach Multiplexer-Maske.
+    """
+    def __init__(self, session=None, batch_window=DEFAULT_BATCH_WINDOW, clock=time.monotonic):
+        """
+        @fn __init__(session=None, batch_window=DEFAULT_BATCH_WINDOW, clock=time.monotonic)
+        @param session: mux_helper.I2CBusSession; None => Standard-Session
+        @param batch_window: Sekunden, um die ein Sensor einer ohnehin gelesenen Gruppe vorgezogen wird
+        @param clock: monotone Uhr
+        """
+        self.session = session if session is not None else get_bus_session()
+        self.batch_window = batch_window
+        self.clock = clock
+        self.polls = []
+        self.active = None
+        self.started = clock()
+        self.lock_acquisitions = 0
+
+    def add(self, name, reader, rate):
+        """
+        @fn add(name, reader, rate)
+        @brief Registriert einen Sensor.
+        @param name: Sensorname in mux_helper.SENSOR_CHANNEL_MAP
+        @param reader: Funktion(bus) -> dict
+        @param rate: Zielrate in Hz
+        """
+        self.polls.append(SensorPoll(name, reader, rate, self.clock()))
+
+    def group_key(self, name):
+        """
+        @fn group_key(name)
+        @brief Multiplexer-Maske, unter der ein Sensor erreichbar ist (gleiche Maske => gleiche Gruppe).
+        @param name: Sensorname
+        @return Control-Byte
+        """
+        plan = self.session.plan
+        if plan is not None:
+            return plan.mask_for(name)
+        channel = self.session.channel_map.get(name)
+        if channel is None:
+            raise ValueError(f"Sensor '{name}' nicht im Mapping definiert.")
+        return 1 << channel
+
+    def set_active(self, names):
+        """
+        @fn set_active(names)
+        @brief Legt fest, welche Sensoren gelesen werden. Neu aktivierte Sensoren sind sofort fällig.
+        @param names: iterierbar mit Sensornamen oder None (=> alle)
+        """
+        neu = None if names is None else set(names)
+        now = self.clock()
+        for p in self.polls:
+            war_aktiv = self.active is None or p.name in self.active
+            if not war_aktiv and (neu is None or p.name in neu):
+                p.next_due = now
+        self.active = neu
+
+    def active_polls(self):
+        """
+        @fn active_polls()
+        @return Liste der aktiven SensorPoll
+        """
+        return [p for p in self.polls if self.active is None or p.name in self.active]
+
+    def rebase(self):
+        """
+        @fn rebase()
+        @brief Beginnt den Zeitplan und die Statistik neu (z.B. nach einer Pause ohne Abnehmer).
+        """
+        now = self.clock()
+        self.started = now
+        self.lock_acquisitions = 0
+        for p in self.polls:
+            p.next_due = now
+            p.reads = p.errors = p.skipped = 0
+            p.max_late = 0.0
+
+    def next_due(self):
+        """
+        @fn next_due()
+        @return nächster Termin der aktiven Sensoren (monotone Zeit)
+        """
+        polls = self.active_polls()
+        if not polls:
+            return self.clock() + IDLE_RECHECK
+        return min(p.next_due for p in polls)
+
+    def due_groups(self, now):
+        """
+        @fn due_groups(now)
+        @brief Ermittelt die fälligen Gruppen, die am längsten überfällige zuerst.
+        @param now: aktuelle monotone Zeit
+        @return Liste von Listen von SensorPoll
+        """
+        gruppen = {}
+        for p in self.active_polls():
+            gruppen.setdefault(self.group_key(p.name), []).append(p)
+        faellig = []
+        for mitglieder in gruppen.values():
+            if not any(p.next_due <= now for p in mitglieder):
+                continue
+            batch = [p for p in mitglieder if p.next_due <= now + self.batch_window]
+            faellig.append(sorted(batch, key=lambda p: p.next_due))
+        faellig.sort(key=lambda batch: batch[0].next_due)
+        return faellig
+
+    def read_group(self, batch):
+        """
+        @fn read_group(batch)
+        @brief Liest eine Gruppe unter einer einzigen Lock-Belegung.
+        @param batch: Liste von SensorPoll (gleiche Maske)
+        @return dict mit den Messwerten
+        """
+        values = {}
+        lockfile = acquire_i2c_lock()
+        self.lock_acquisitions += 1
+        try:
+            self.session.invalidate()
+            for p in batch:
+                try:
+                    self.session.select_for(p.name)
+                    values.update(p.reader(self.session.bus))
+                    p.reads += 1
+                except (OSError, ValueError) as e:
+                    p.errors += 1
+                    print(f"Abfrageplaner: Fehler bei {p.name}: {e}", file=sys.stderr)
+        finally:
+            release_i2c_lock(lockfile)
+        now = self.clock()
+        for p in batch:
+            p.advance(now)
+        return values
+
+    def poll(self):
+        """
+        @fn poll()
+        @brief Liest alle fälligen Gruppen (nicht blockierend, wenn nichts fällig ist).
+        @return dict mit den Messwerten aller gelesenen Sensoren (leer, wenn nichts fällig war)
+        """
+        values = {}
+        for batch in self.due_groups(self.clock()):
+            values.update(self.read_group(batch))
+        return values
+
+    def stats(self):
+        """
+        @fn stats()
+        @return dict {Sensor: {"active", "requested", "achieved" (Hz), "reads", "errors", "skipped", "max_late" (s)}}
+        """
+        laufzeit = max(self.clock() - self.started, 1e-9)
+        return {
+            p.name: {
+                "active": self.active is None or p.name in self.active,
+                "requested": p.rate,
+                "achieved": p.reads / laufzeit,
+                "reads": p.reads,
+                "errors": p.errors,
+                "skipped": p.skipped,
+                "max_late": p.max_late,
+            }
+            for p in self.polls
+        }
+
+    def summary(self):
+        """
+        @fn summary()
+        @return einzeilige Zusammenfassung je Sensor (Ist-/Sollrate)
+        """
+        zeilen = [f"{name}: {s['achieved']:.2f}/{s['requested']:.2f} Hz, Fehler {s['errors']}, "
+                  f"übersprungen {s['skipped']}" for name, s in self.stats().items()]
+        zeilen.append(f"Lock-Belegungen: {self.lock_acquisitions}")
+        return "\n".join(zeilen)
+
+    def export(self, path):
+        """
+        @fn export(path)
+        @brief Schreibt stats() atomar als JSON-Datei.
+        @param path: Zieldatei
+        """
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"uptime": self.clock() - self.started, "lock_acquisitions": self.lock_acquisitions,
+                       "sensors": self.stats()}, f, indent=1)
+        os.replace(tmp, path)
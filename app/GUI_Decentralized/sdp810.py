@@ -2,17 +2,166 @@
 """
 @file sdp810.py
 @brief Bietet Zugriff auf den SDP810-Sensor (lokal via mux_helper oder per SSH).
+       Der Sensor läuft im Continuous-Modus; ein Messwert kostet nur noch einen Lesezugriff.
 """
 
-import smbus
 import time
 import paramiko
 import sys
-import fcntl
-from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for
+from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for, get_bus_session
+
+try:
+    from smbus2 import i2c_msg
+except ImportError:
+    i2c_msg = None
 
 SDP810_ADDRESS = 0x25
 
+# Befehle laut Datenblatt (Continuous Measurement)
+CMD_START_DP_AVERAGE = (0x36, 0x15)  # Differenzdruck, Mittelung bis zum Auslesen
+CMD_START_DP_NONE    = (0x36, 0x1E)  # Differenzdruck, ohne Mittelung
+CMD_STOP_CONTINUOUS  = (0x3F, 0xF9)
+
+TEMPERATURE_SCALE = 200.0   # LSB pro °C
+STARTUP_DELAY     = 0.02    # erste gültige Messung nach dem Start (Datenblatt: 8 ms, volle Genauigkeit 20 ms)
+STOP_DELAY        = 0.0005  # Sensor braucht 500 µs, bis er nach dem Stopp wieder Befehle annimmt
+
+def crc8(data):
+    """
+    @fn crc8(data)
+    @brief CRC-8 nach Sensirion (Polynom 0x31, Startwert 0xFF).
+    @param data: Bytefolge (z.B. zwei Datenbytes)
+    @return CRC als int
+    """
+    crc = 0xFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ 0x31) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+    return crc
+
+def decode_frame(frame):
+    """
+    @fn decode_frame(frame)
+    @brief Dekodiert einen 9-Byte-Messrahmen (Druck, Temperatur, Skalierungsfaktor je 2 Byte + CRC).
+    @param frame: Liste/Bytes mit 9 Werten
+    @return Tupel (Differenzdruck in Pa, Temperatur in °C, Skalierungsfaktor)
+    @throws ValueError bei CRC-Fehler oder ungültigem Skalierungsfaktor
+    """
+    words = []
+    for i in range(0, 9, 3):
+        msb, lsb, crc = frame[i], frame[i + 1], frame[i + 2]
+        if crc8((msb, lsb)) != crc:
+            raise ValueError(f"CRC-Fehler im SDP810-Rahmen (Wort {i // 3})")
+        words.append((msb << 8) | lsb)
+
+    dp_raw, temp_raw, scale = words
+    if dp_raw & 0x8000:
+        dp_raw -= 0x10000
+    if temp_raw & 0x8000:
+        temp_raw -= 0x10000
+    if scale == 0:
+        raise ValueError("Ungültiger Skalierungsfaktor 0 vom SDP810")
+    return dp_raw / scale, temp_raw / TEMPERATURE_SCALE, scale
+
+class SDP810:
+    """
+    @class SDP810
+    @brief Zustandsbehafteter Treiber: startet einmalig die kontinuierliche Messung mit Mittelung
+           und liest danach nur noch Messrahmen (wenige Millisekunden pro Wert).
+           Multiplexer-Umschaltung und I2C-Lock übernimmt der Aufrufer.
+    """
+    def __init__(self, bus=None, address=SDP810_ADDRESS, averaging=True):
+        """
+        @fn __init__(bus=None, address=SDP810_ADDRESS, averaging=True)
+        @param bus: geöffneter SMBus; None => Bus der Standard-Session aus mux_helper
+        @param address: I2C-Adresse
+        @param averaging: True => Sensor mittelt alle internen Messungen bis zum nächsten Auslesen
+        """
+        self.bus = bus if bus is not None else get_bus_session().bus
+        self.address = address
+        self.averaging = averaging
+        self.running = False
+        self.scale_factor = None
+
+    def start(self):
+        """
+        @fn start()
+        @brief Startet die kontinuierliche Differenzdruckmessung.
+        """
+        cmd = CMD_START_DP_AVERAGE if self.averaging else CMD_START_DP_NONE
+        self.bus.write_i2c_block_data(self.address, cmd[0], [cmd[1]])
+        time.sleep(STARTUP_DELAY)
+        self.running = True
+
+    def stop(self):
+        """
+        @fn stop()
+        @brief Beendet die kontinuierliche Messung.
+        """
+        self.bus.write_i2c_block_data(self.address, CMD_STOP_CONTINUOUS[0], [CMD_STOP_CONTINUOUS[1]])
+        time.sleep(STOP_DELAY)
+        self.running = False
+
+    def restart(self):
+        """
+        @fn restart()
+        @brief Stoppt eine evtl. laufende Messung und startet sie im eigenen Modus (Mittelung ja/nein) neu.
+        """
+        try:
+            self.stop()
+        except OSError:
+            pass
+        self.start()
+
+    def read_frame(self):
+        """
+        @fn read_frame()
+        @brief Liest einen rohen 9-Byte-Rahmen. Mit smbus2 als reiner Lesezugriff (ohne Befehlsbyte).
+        @return Liste mit 9 Bytes
+        """
+        if i2c_msg is not None and hasattr(self.bus, "i2c_rdwr"):
+            msg = i2c_msg.read(self.address, 9)
+            self.bus.i2c_rdwr(msg)
+            return list(msg)
+        return self.bus.read_i2c_block_data(self.address, 0, 9)
+
+    def read_measurement(self):
+        """
+        @fn read_measurement()
+        @brief Liefert die aktuelle Messung. Schlägt das Lesen fehl (CRC-Fehler, NACK), wird die Messung
+               mit restart() neu gestartet: Ein noch laufender Continuous-Modus nimmt außer Stopp keine
+               Befehle an, ein Sensor nach einem Neustart ignoriert den Stopp-Befehl.
+        @return Tupel (Differenzdruck in Pa, Temperatur in °C)
+        """
+        # Ist self.running False, hat evtl. ein anderer Prozess die Messung schon gestartet
+        try:
+            pressure, temperature, self.scale_factor = decode_frame(self.read_frame())
+            self.running = True
+            return pressure, temperature
+        except (OSError, ValueError):
+            self.running = False
+
+        self.restart()
+        pressure, temperature, self.scale_factor = decode_frame(self.read_frame())
+        return pressure, temperature
+
+_driver = None
+
+def get_sdp810():
+    """
+    @fn get_sdp810()
+    @brief Liefert die prozessweite SDP810-Treiberinstanz.
+    @return SDP810
+    """
+    global _driver
+    if _driver is None:
+        _driver = SDP810()
+    return _driver
+
 def read_sdp810_local(measure_type='pressure'):
     """
     @fn read_sdp810_local(measure_type='pressure')
@@ -23,34 +172,10 @@ def read_sdp810_local(measure_type='pressure'):
     lockfile = acquire_i2c_lock()
     try:
         switch_mux_channel_for("SDP810")
-
-        bus = smbus.SMBus(1)
-        bus.write_i2c_block_data(SDP810_ADDRESS, 0x3F, [0xF9])
-        time.sleep(0.8)
-
-        if measure_type == 'pressure':
-            bus.write_i2c_block_data(SDP810_ADDRESS, 0x36, [0x15])
-        else:
-            bus.write_i2c_block_data(SDP810_ADDRESS, 0x36, [0x1E])
-        time.sleep(0.5)
-
-        reading = bus.read_i2c_block_data(SDP810_ADDRESS, 0, 9)
-        bus.close()
-
-        if measure_type == 'pressure':
-            val = reading[0] + float(reading[1]) / 255
-            if 0 <= val < 128:
-                return val * 240 / 256
-            elif 128 < val <= 256:
-                return -(256 - val) * 240 / 256
-            elif val == 128:
-                return 99999999
-        else:
-            val = reading[3] + float(reading[4]) / 255
-            if 0 <= val <= 100:
-                return val * 255 / 200
-            elif 200 <= val <= 256:
-                return -(256 - val) * 255 / 200
+        pressure, temperature = get_sdp810().read_measurement()
+        return pressure if measure_type == 'pressure' else temperature
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Lesen des SDP810: {e}")
         return None
     finally:
         release_i2c_lock(lockfile)
@@ -0,0 +1,171 @@
+# sdp810_burst.py
+"""
+@file sdp810_burst.py
+@brief Hochratige Burst-Erfassung des SDP810-Differenzdrucks in vorallokierte NumPy-Puffer.
+       Der I2C-Lock wird für die gesamte Burst-Dauer gehalten; Zeitstempel stammen aus
+       time.perf_counter_ns(). Ergebnis und Statistik (erreichte Rate, Jitter) werden als .npz gespeichert.
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for
+from sdp810 import SDP810, get_sdp810
+
+BURST_DTYPE = np.dtype([
+    ("t_ns", np.int64),
+    ("pressure_pa", np.float32),
+    ("temperature_c", np.float32),
+])
+
+DEFAULT_OUTPUT = "/tmp/sdp810_burst.npz"
+
+# Unterhalb dieser Restzeit bis zur nächsten Deadline wird aktiv gewartet statt geschlafen
+SPIN_THRESHOLD_NS = 200_000
+
+def capture_burst(duration, rate, driver=None):
+    """
+    @fn capture_burst(duration, rate, driver=None)
+    @brief Erfasst für duration Sekunden Messwerte mit der Zielrate rate (Hz).
+           Fehlgeschlagene Lesezugriffe werden als NaN gespeichert und gezählt.
+    @param duration: Burst-Dauer in Sekunden
+    @param rate: Zielrate in Hz
+    @param driver: SDP810-Instanz; None => prozessweiter Treiber
+    @return Tupel (strukturiertes NumPy-Array mit BURST_DTYPE, dict mit Statistik)
+    """
+    if duration <= 0 or rate <= 0:
+        raise ValueError("Dauer und Rate müssen positiv sein.")
+
+    n_samples = int(math.ceil(duration * rate))
+    samples = np.empty(n_samples, dtype=BURST_DTYPE)
+    period_ns = int(round(1e9 / rate))
+    errors = 0
+
+    lockfile = acquire_i2c_lock()
+    try:
+        switch_mux_channel_for("SDP810")
+        if driver is None:
+            driver = get_sdp810()
+        if not driver.running:
+            driver.restart()
+
+        wall_start = time.time()
+        deadline = time.perf_counter_ns()
+        for i in range(n_samples):
+            remaining = deadline - time.perf_counter_ns()
+            if remaining > SPIN_THRESHOLD_NS:
+                time.sleep((remaining - SPIN_THRESHOLD_NS) / 1e9)
+            while time.perf_counter_ns() < deadline:
+                pass
+
+            t_ns = time.perf_counter_ns()
+            try:
+                pressure, temperature = driver.read_measurement()
+            except (OSError, ValueError):
+                pressure, temperature = math.nan, math.nan
+                errors += 1
+            samples[i] = (t_ns, pressure, temperature)
+            deadline += period_ns
+    finally:
+        release_i2c_lock(lockfile)
+
+    stats = compute_burst_stats(samples["t_ns"], rate)
+    stats["errors"] = errors
+    stats["wall_start"] = wall_start
+    return samples, stats
+
+def compute_burst_stats(t_ns, target_rate):
+    """
+    @fn compute_burst_stats(t_ns, target_rate)
+    @brief Berechnet erreichte Abtastrate und Jitter-Kennwerte aus den Zeitstempeln.
+    @param t_ns: Array der Zeitstempel in Nanosekunden
+    @param target_rate: angeforderte Rate in Hz
+    @return dict mit Kennwerten (Intervalle in Mikrosekunden)
+    """
+    stats = {"target_rate_hz": float(target_rate), "samples": int(len(t_ns))}
+    if len(t_ns) < 2:
+        stats["achieved_rate_hz"] = 0.0
+        return stats
+
+    intervals_us = np.diff(t_ns).astype(np.float64) / 1e3
+    target_us = 1e6 / target_rate
+    span_s = (t_ns[-1] - t_ns[0]) / 1e9
+    stats.update({
+        "achieved_rate_hz": float((len(t_ns) - 1) / span_s) if span_s > 0 else 0.0,
+        "interval_mean_us": float(intervals_us.mean()),
+        "interval_std_us": float(intervals_us.std()),
+        "interval_min_us": float(intervals_us.min()),
+        "interval_max_us": float(intervals_us.max()),
+        "jitter_p99_us": float(np.percentile(np.abs(intervals_us - target_us), 99)),
+        "overruns": int(np.count_nonzero(intervals_us > 1.5 * target_us)),
+    })
+    return stats
+
+def save_burst(path, samples, stats):
+    """
+    @fn save_burst(path, samples, stats)
+    @brief Speichert Messwerte und Statistik gemeinsam in einer unkomprimierten .npz-Datei.
+    @param path: Zieldatei
+    @param samples: Array mit BURST_DTYPE
+    @param stats: dict aus capture_burst()
+    """
+    np.savez(path, samples=samples, stats=np.array(json.dumps(stats)))
+
+def load_burst(path):
+    """
+    @fn load_burst(path)
+    @brief Lädt eine mit save_burst() gespeicherte Datei.
+    @param path: Pfad zur .npz-Datei
+    @return Tupel (samples, stats)
+    """
+    with np.load(path) as data:
+        return data["samples"], json.loads(str(data["stats"]))
+
+def restore_averaging():
+    """
+    @fn restore_averaging()
+    @brief Versetzt den Sensor nach einem Burst ohne Mittelung wieder in den Standardmodus.
+    """
+    lockfile = acquire_i2c_lock()
+    try:
+        switch_mux_channel_for("SDP810")
+        get_sdp810().restart()
+    except OSError as e:
+        print(f"SDP810 konnte nicht zurückgesetzt werden: {e}", file=sys.stderr)
+    finally:
+        release_i2c_lock(lockfile)
+
+def main():
+    """
+    @fn main()
+    @brief Kommandozeile: Burst aufnehmen, speichern und Statistik ausgeben.
+    """
+    parser = argparse.ArgumentParser(description="SDP810 Burst-Erfassung")
+    parser.add_argument("--duration", type=float, default=2.0, help="Dauer in Sekunden")
+    parser.add_argument("--rate", type=float, default=500.0, help="Zielrate in Hz")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Zieldatei (.npz)")
+    parser.add_argument("--no-averaging", action="store_true",
+                        help="Sensorinterne Mittelung abschalten (Einzelmessungen)")
+    args = parser.parse_args()
+
+    driver = SDP810(averaging=False) if args.no_averaging else None
+    try:
+        samples, stats = capture_burst(args.duration, args.rate, driver)
+    except (OSError, ValueError) as e:
+        print(f"Burst fehlgeschlagen: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.no_averaging:
+            restore_averaging()
+
+    save_burst(args.output, samples, stats)
+    print(json.dumps(stats, indent=2))
+    print(f"Gespeichert: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,12 @@
 """
 @file sdp810_reader.py
 @brief Liest den SDP810-Sensor lokal über I2C aus und verwendet mux_helper zur Multiplexer-Umschaltung.
+       Nutzt den Continuous-Treiber aus sdp810.py; läuft der Sensor bereits, kostet ein Aufruf nur einen Lesezugriff.
 """
 
 import sys
-import time
-import smbus
 from mux_helper import acquire_i2c_lock, release_i2c_lock, switch_mux_channel_for
-
-SDP810_ADDRESS = 0x25
+from sdp810 import get_sdp810
 
 def read_sdp810(measure_type='pressure'):
     """
@@ -21,37 +19,13 @@ def read_sdp810(measure_type='pressure'):
     lockfile = acquire_i2c_lock()
     try:
         switch_mux_channel_for("SDP810")
-        bus = smbus.SMBus(1)
-
-        bus.write_i2c_block_data(SDP810_ADDRESS, 0x3F, [0xF9])
-        time.sleep(0.8)
-
-        if measure_type == 'pressure':
-            bus.write_i2c_block_data(SDP810_ADDRESS, 0x36, [0x15])
-        else:
-            bus.write_i2c_block_data(SDP810_ADDRESS, 0x36, [0x1E])
-
-        time.sleep(0.5)
-        reading = bus.read_i2c_block_data(SDP810_ADDRESS, 0, 9)
-        bus.close()
-
-        if measure_type == 'pressure':
-            val = reading[0] + float(reading[1]) / 255
-            if 0 <= val < 128:
-                return val * 240 / 256
-            elif 128 < val <= 256:
-                return -(256 - val) * 240 / 256
-            elif val == 128:
-                return 99999999
-        else:
-            val = reading[3] + float(reading[4]) / 255
-            if 0 <= val <= 100:
-                return val * 255 / 200
-            elif 200 <= val <= 256:
-                return -(256 - val) * 255 / 200
+        pressure, temperature = get_sdp810().read_measurement()
+        return pressure if measure_type == 'pressure' else temperature
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Lesen des SDP810: {e}", file=sys.stderr)
+        return None
     finally:
         release_i2c_lock(lockfile)
-    return None
 
 def main():
     """
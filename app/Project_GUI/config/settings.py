@@ -4,6 +4,7 @@
 @brief Enthält Funktionen und Einstellungen für die GUI (z.B. Farben, GPIO-Pins, Pfade).
 """
 
+import copy
 import os
 import json
 
@@ -38,6 +39,98 @@ RESET_PIN = 14
 
 INVERT_PWM = False
 DEFAULT_PWM_FREQUENCY = 5
+DEFAULT_PLOT_REFRESH_MS = 100
+DEFAULT_HISTORY_CAPACITY = 10000
+
+# Protokoll der Messwerte von heating.py (siehe control/bme_logger.py)
+DEFAULT_BME_LOG = {
+    "flush_interval": 1.0,
+    "max_bytes": 4 * 1024 * 1024,
+    "max_age": 3600.0,
+    "compress": True,
+    "keep_segments": 24
+}
+
+# Heizungsregelung (siehe logic/temperature_controller.py)
+DEFAULT_HEATER_CONTROL = {
+    "law": "pid",
+    "output": "pwm",
+    "window": 5.0,
+    "min_switch": 0.5,
+    "hysteresis": {"band": 1.0},
+    "pid": {"kp": 0.25, "ki": 0.002, "kd": 3.0, "d_filter": 5.0, "setpoint_weight": 1.0}
+}
+
+# Relais-Versuch zur Selbsteinstellung (siehe logic/autotune.py)
+DEFAULT_AUTOTUNE = {
+    "amplitude": 0.5,
+    "bias": 0.5,
+    "hysteresis": 0.2,
+    "cycles": 3,
+    "max_duration": 3600.0,
+    "rule": "ziegler_nichols"
+}
+
+# Zielraten der Sensorabfrage in Hz (siehe GUI_Decentralized/poll_scheduler.py)
+DEFAULT_POLL_RATES = {
+    "BME280": 1.0,
+    "MCP9600_AIRFLOW": 2.0,
+    "SDP810": 10.0
+}
+
+# Erfassungsprofile des BME280: Oversampling je Messgröße (0 = aus), IIR-Filter und Standby-Zeit
+# im Normalmodus (ms). Mehr Oversampling bzw. Filter => weniger Rauschen, aber längere Wandlung bzw.
+# trägere Werte. Die erreichbare Rate liefert bme280_timing().
+BME280_PROFILES = {
+    "fast":      {"osrs_t": 1,  "osrs_p": 1,  "osrs_h": 1,  "iir_filter": 0,  "standby_ms": 62.5},
+    "balanced":  {"osrs_t": 2,  "osrs_p": 4,  "osrs_h": 2,  "iir_filter": 4,  "standby_ms": 125},
+    "low_noise": {"osrs_t": 16, "osrs_p": 16, "osrs_h": 16, "iir_filter": 16, "standby_ms": 250}
+}
+DEFAULT_BME280_PROFILE = "balanced"
+
+# Konfiguration der MCP9600 (siehe GUI_Decentralized/mcp9600.py), Standard = Einschaltzustand.
+# Die Wandlungszeit hängt von der ADC-Auflösung ab: 18 Bit 320 ms, 16 Bit 80 ms, 14 Bit 20 ms, 12 Bit 5 ms.
+DEFAULT_MCP9600 = {
+    "thermocouple": "K",
+    "adc_resolution": 18,
+    "filter_coefficient": 0,
+    "cold_junction_resolution": 0.0625
+}
+
+# Strömungsgeschwindigkeit aus dem SDP810-Differenzdruck (siehe logic/airflow.py):
+# probe_factor = Sondenbeiwert k der Pitot-/Prandtl-Sonde, deadband = Totband in Pa gegen Nullpunktrauschen.
+DEFAULT_AIRFLOW = {
+    "probe_factor": 1.0,
+    "deadband": 0.1
+}
+
+def bme280_timing(profile):
+    """
+    @fn bme280_timing(profile)
+    @brief Berechnet die maximale Wandlungszeit (Datenblatt Kap. 9.1) und daraus Periode und
+           höchste sinnvolle Abfragerate im Normalmodus (Wandlung + Standby).
+    @param profile: dict mit osrs_t, osrs_p, osrs_h und standby_ms
+    @return dict {"measurement_ms", "period_ms", "max_rate"}
+    """
+    zeit = 1.25 + 2.3 * profile["osrs_t"]
+    if profile["osrs_p"]:
+        zeit += 2.3 * profile["osrs_p"] + 0.575
+    if profile["osrs_h"]:
+        zeit += 2.3 * profile["osrs_h"] + 0.575
+    periode = zeit + profile["standby_ms"]
+    return {"measurement_ms": zeit, "period_ms": periode, "max_rate": 1000.0 / periode}
+
+def bme280_profile(settings):
+    """
+    @fn bme280_profile(settings)
+    @brief Liefert das in settings["bme280_profile"] gewählte Erfassungsprofil.
+    @param settings: dict aus load_settings()
+    @return dict mit osrs_t, osrs_p, osrs_h, iir_filter, standby_ms
+    """
+    name = settings.get("bme280_profile", DEFAULT_BME280_PROFILE)
+    if name not in BME280_PROFILES:
+        raise ValueError(f"Unbekanntes BME280-Profil: {name}")
+    return dict(BME280_PROFILES[name])
 
 def load_settings():
     """
@@ -55,6 +148,15 @@ def load_settings():
             data.setdefault("save_directory", SAVE_DEFAULT_FOLDER)
             data.setdefault("save_filename", "sensor_data.md")
             data.setdefault("pwm_frequency", DEFAULT_PWM_FREQUENCY)
+            data.setdefault("plot_refresh_ms", DEFAULT_PLOT_REFRESH_MS)
+            data.setdefault("history_capacity", DEFAULT_HISTORY_CAPACITY)
+            data.setdefault("bme_log", dict(DEFAULT_BME_LOG))
+            data.setdefault("heater_control", copy.deepcopy(DEFAULT_HEATER_CONTROL))
+            data.setdefault("autotune", dict(DEFAULT_AUTOTUNE))
+            data.setdefault("poll_rates", dict(DEFAULT_POLL_RATES))
+            data.setdefault("bme280_profile", DEFAULT_BME280_PROFILE)
+            data.setdefault("mcp9600", dict(DEFAULT_MCP9600))
+            data.setdefault("airflow", dict(DEFAULT_AIRFLOW))
             return data
 
     return {
@@ -64,7 +166,16 @@ def load_settings():
         "password": "",
         "save_directory": SAVE_DEFAULT_FOLDER,
         "save_filename": "sensor_data.md",
-        "pwm_frequency": DEFAULT_PWM_FREQUENCY
+        "pwm_frequency": DEFAULT_PWM_FREQUENCY,
+        "plot_refresh_ms": DEFAULT_PLOT_REFRESH_MS,
+        "history_capacity": DEFAULT_HISTORY_CAPACITY,
+        "bme_log": dict(DEFAULT_BME_LOG),
+        "heater_control": copy.deepcopy(DEFAULT_HEATER_CONTROL),
+        "autotune": dict(DEFAULT_AUTOTUNE),
+        "poll_rates": dict(DEFAULT_POLL_RATES),
+        "bme280_profile": DEFAULT_BME280_PROFILE,
+        "mcp9600": dict(DEFAULT_MCP9600),
+        "airflow": dict(DEFAULT_AIRFLOW)
     }
 
 def save_settings(settings_dict):
@@ -0,0 +1,272 @@
+# control/bme280.py
+"""
+@file bme280.py
+@brief Schlanker BME280-Treiber direkt auf dem SMBus (ohne Blinka/adafruit_bme280).
+       Die Kalibrierdaten werden einmalig gelesen und als Kompensationskoeffizienten zwischengespeichert;
+       danach kostet eine Messung genau einen 8-Byte-Blocklesezugriff ab Register 0xF7
+       (Druck, Temperatur, Feuchte). Die Kompensation folgt den Gleitkommaformeln des Datenblatts
+       (Abschnitt 8.1); compensate_blocks() rechnet viele Rohblöcke (z.B. einen Rückstau) mit NumPy.
+       Oversampling, IIR-Filter und Standby-Zeit kommen aus einem Erfassungsprofil
+       (config.settings.BME280_PROFILES); sample_period gibt den Takt frischer Wandlungen an.
+       Der geöffnete SMBus wird übergeben; Multiplexer-Umschaltung und I2C-Lock übernimmt der Aufrufer.
+       Genutzt von beiden heating.py (control/ und GUI_Decentralized/) sowie vom Aggregator.
+"""
+
+import struct
+import time
+
+import numpy as np
+
+from config.settings import bme280_timing
+
+BME280_ADDRESS = 0x76
+BME280_CHIP_ID = 0x60
+
+REG_CALIB_TP  = 0x88   # 0x88..0xA1: Temperatur/Druck + H1
+REG_CHIP_ID   = 0xD0
+REG_CALIB_H   = 0xE1   # 0xE1..0xE7: Feuchte
+REG_CTRL_HUM  = 0xF2
+REG_STATUS    = 0xF3
+REG_CTRL_MEAS = 0xF4
+REG_CONFIG    = 0xF5
+REG_DATA      = 0xF7   # 0xF7..0xFE: press_msb .. hum_lsb
+
+DATA_LENGTH = 8
+
+MODE_SLEEP  = 0
+MODE_FORCED = 1
+MODE_NORMAL = 3
+
+# Oversampling-Faktor -> Registerwert (0 => Messgröße abgeschaltet)
+OVERSAMPLING = {0: 0, 1: 1, 2: 2, 4: 3, 8: 4, 16: 5}
+# Standby-Zeit im Normalmodus (ms) -> Registerwert
+STANDBY_MS = {0.5: 0, 62.5: 1, 125: 2, 250: 3, 500: 4, 1000: 5, 10: 6, 20: 7}
+# IIR-Filterkoeffizient -> Registerwert
+IIR_FILTER = {0: 0, 2: 1, 4: 2, 8: 3, 16: 4}
+
+STATUS_MEASURING = 0x08
+
+# Rohwerte einer abgeschalteten bzw. noch nicht durchgeführten Messung
+SKIPPED_TP = 0x80000
+SKIPPED_H  = 0x8000
+
+class BME280Calibration:
+    """
+    @class BME280Calibration
+    @brief Kompensationskoeffizienten aus dem Kalibrierspeicher (dig_T1 .. dig_H6).
+    """
+    def __init__(self, block_tp, block_h):
+        """
+        @fn __init__(block_tp, block_h)
+        @param block_tp: 26 Bytes ab 0x88
+        @param block_h: 7 Bytes ab 0xE1
+        """
+        tp = struct.unpack("<HhhHhhhhhhhh", bytes(block_tp[:24]))
+        self.t1, self.t2, self.t3 = tp[0:3]
+        self.p1, self.p2, self.p3, self.p4, self.p5, self.p6, self.p7, self.p8, self.p9 = tp[3:12]
+        self.h1 = block_tp[25]
+
+        e1, e2, e3, e4, e5, e6, e7 = block_h[:7]
+        self.h2 = struct.unpack("<h", bytes((e1, e2)))[0]
+        self.h3 = e3
+        h4 = (e4 << 4) | (e5 & 0x0F)
+        h5 = (e6 << 4) | (e5 >> 4)
+        self.h4 = h4 - 0x1000 if h4 & 0x800 else h4
+        self.h5 = h5 - 0x1000 if h5 & 0x800 else h5
+        self.h6 = e7 - 0x100 if e7 & 0x80 else e7
+
+    def t_fine(self, adc_t):
+        """
+        @fn t_fine(adc_t)
+        @brief Temperaturzwischenwert, den auch Druck- und Feuchtekompensation benötigen.
+        @param adc_t: 20-Bit-Rohwert (Skalar oder NumPy-Array)
+        """
+        var1 = (adc_t / 16384.0 - self.t1 / 1024.0) * self.t2
+        var2 = (adc_t / 131072.0 - self.t1 / 8192.0)
+        return var1 + var2 * var2 * self.t3
+
+    def pressure(self, adc_p, t_fine):
+        """
+        @fn pressure(adc_p, t_fine)
+        @return Druck in Pa (Skalar oder NumPy-Array)
+        """
+        var1 = t_fine / 2.0 - 64000.0
+        var2 = var1 * var1 * self.p6 / 32768.0
+        var2 = var2 + var1 * self.p5 * 2.0
+        var2 = var2 / 4.0 + self.p4 * 65536.0
+        var1 = (self.p3 * var1 * var1 / 524288.0 + self.p2 * var1) / 524288.0
+        var1 = (1.0 + var1 / 32768.0) * self.p1
+        p = (1048576.0 - adc_p - var2 / 4096.0) * 6250.0 / var1
+        var1 = self.p9 * p * p / 2147483648.0
+        var2 = p * self.p8 / 32768.0
+        return p + (var1 + var2 + self.p7) / 16.0
+
+    def humidity(self, adc_h, t_fine):
+        """
+        @fn humidity(adc_h, t_fine)
+        @return relative Feuchte in % (auf 0..100 begrenzt; Skalar oder NumPy-Array)
+        """
+        h = t_fine - 76800.0
+        h = (adc_h - (self.h4 * 64.0 + self.h5 / 16384.0 * h)) * \
+            (self.h2 / 65536.0 * (1.0 + self.h6 / 67108864.0 * h * (1.0 + self.h3 / 67108864.0 * h)))
+        h = h * (1.0 - self.h1 * h / 524288.0)
+        return np.clip(h, 0.0, 100.0) if isinstance(h, np.ndarray) else min(max(h, 0.0), 100.0)
+
+    def compensate(self, adc_p, adc_t, adc_h):
+        """
+        @fn compensate(adc_p, adc_t, adc_h)
+        @brief Rechnet Rohwerte in physikalische Größen um.
+        @return Tupel (Temperatur in °C, Feuchte in %, Druck in hPa); abgeschaltete Größen => None
+        """
+        t_fine = self.t_fine(adc_t)
+        humidity = None if adc_h == SKIPPED_H else self.humidity(adc_h, t_fine)
+        pressure = None if adc_p == SKIPPED_TP else self.pressure(adc_p, t_fine) / 100.0
+        return t_fine / 5120.0, humidity, pressure
+
+def decode_data(data):
+    """
+    @fn decode_data(data)
+    @brief Zerlegt den 8-Byte-Datenblock ab 0xF7 in die Rohwerte.
+    @param data: 8 Bytes
+    @return Tupel (adc_p, adc_t, adc_h)
+    """
+    adc_p = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
+    adc_t = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
+    adc_h = (data[6] << 8) | data[7]
+    return adc_p, adc_t, adc_h
+
+def compensate_blocks(calibration, blocks):
+    """
+    @fn compensate_blocks(calibration, blocks)
+    @brief Vektorisierte Kompensation vieler Rohblöcke auf einmal (z.B. gepufferte Messungen).
+    @param calibration: BME280Calibration
+    @param blocks: Array-artig der Form (N, 8) mit Datenblöcken ab 0xF7
+    @return Tupel von float64-Arrays (Temperatur in °C, Feuchte in %, Druck in hPa);
+            abgeschaltete oder fehlende Messungen sind NaN
+    """
+    d = np.asarray(blocks, dtype=np.int64).reshape(-1, DATA_LENGTH)
+    adc_p = (d[:, 0] << 12) | (d[:, 1] << 4) | (d[:, 2] >> 4)
+    adc_t = (d[:, 3] << 12) | (d[:, 4] << 4) | (d[:, 5] >> 4)
+    adc_h = (d[:, 6] << 8) | d[:, 7]
+
+    t_fine = calibration.t_fine(adc_t.astype(np.float64))
+    temperature = t_fine / 5120.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pressure = calibration.pressure(adc_p.astype(np.float64), t_fine) / 100.0
+    humidity = calibration.humidity(adc_h.astype(np.float64), t_fine)
+    temperature[adc_t == SKIPPED_TP] = np.nan
+    pressure[adc_p == SKIPPED_TP] = np.nan
+    humidity[adc_h == SKIPPED_H] = np.nan
+    return temperature, humidity, pressure
+
+class BME280:
+    """
+    @class BME280
+    @brief Zustandsbehafteter Treiber: begin() prüft die Chip-ID, liest die Kalibrierung und
+           konfiguriert den Sensor im Normalmodus; read() liest danach nur noch den Datenblock.
+           Die Standardwerte entsprechen denen von adafruit_bme280 (16-fach, ohne Filter).
+    """
+    def __init__(self, bus, address=BME280_ADDRESS, osrs_t=16, osrs_p=16, osrs_h=16,
+                 iir_filter=0, standby_ms=0.5):
+        """
+        @fn __init__(bus, address=BME280_ADDRESS, osrs_t=16, osrs_p=16, osrs_h=16, iir_filter=0, standby_ms=0.5)
+        @brief Die Parameter ab osrs_t entsprechen den Feldern eines Profils, also BME280(bus, **profil).
+        @param bus: geöffneter SMBus (smbus2 oder smbus)
+        @param address: I2C-Adresse (0x76 oder 0x77)
+        @param osrs_t: Oversampling Temperatur (1, 2, 4, 8, 16)
+        @param osrs_p: Oversampling Druck (0 = aus)
+        @param osrs_h: Oversampling Feuchte (0 = aus)
+        @param iir_filter: IIR-Filterkoeffizient (siehe IIR_FILTER)
+        @param standby_ms: Standby-Zeit im Normalmodus (siehe STANDBY_MS)
+        """
+        if osrs_t not in OVERSAMPLING or osrs_t == 0 or osrs_p not in OVERSAMPLING or osrs_h not in OVERSAMPLING:
+            raise ValueError(f"Ungültiges Oversampling: t={osrs_t}, p={osrs_p}, h={osrs_h}")
+        if iir_filter not in IIR_FILTER:
+            raise ValueError(f"Ungültiger IIR-Filterkoeffizient: {iir_filter}")
+        if standby_ms not in STANDBY_MS:
+            raise ValueError(f"Ungültige Standby-Zeit: {standby_ms} ms")
+        self.bus = bus
+        self.address = address
+        self.oversampling = (osrs_t, osrs_p, osrs_h)
+        self.standby_ms = standby_ms
+        self.iir_filter = iir_filter
+        self.timing = bme280_timing({"osrs_t": osrs_t, "osrs_p": osrs_p, "osrs_h": osrs_h,
+                                     "standby_ms": standby_ms})
+        self.calibration = None
+
+    @property
+    def sample_period(self):
+        """
+        @property sample_period
+        @return Sekunden zwischen zwei Wandlungen im Normalmodus (höchstens; Wandlung + Standby)
+        """
+        return self.timing["period_ms"] / 1000.0
+
+    def begin(self):
+        """
+        @fn begin()
+        @brief Prüft die Chip-ID, liest und speichert die Kalibrierung und schreibt die Konfiguration.
+        @throws ValueError, wenn unter der Adresse kein BME280 antwortet
+        """
+        chip_id = self.bus.read_byte_data(self.address, REG_CHIP_ID)
+        if chip_id != BME280_CHIP_ID:
+            raise ValueError(f"Kein BME280 an 0x{self.address:02X} (Chip-ID 0x{chip_id:02X})")
+        block_tp = self.bus.read_i2c_block_data(self.address, REG_CALIB_TP, 26)
+        block_h = self.bus.read_i2c_block_data(self.address, REG_CALIB_H, 7)
+        self.calibration = BME280Calibration(block_tp, block_h)
+        self.configure()
+
+    def configure(self):
+        """
+        @fn configure()
+        @brief Schreibt Oversampling, Standby-Zeit und Filter und startet den Normalmodus. ctrl_hum wird erst mit dem
+               folgenden Schreiben von ctrl_meas wirksam; config nur im Sleep-Modus zuverlässig.
+        """
+        osrs_t, osrs_p, osrs_h = (OVERSAMPLING[o] for o in self.oversampling)
+        self.bus.write_byte_data(self.address, REG_CTRL_MEAS, MODE_SLEEP)
+        self.bus.write_byte_data(self.address, REG_CONFIG,
+                                 (STANDBY_MS[self.standby_ms] << 5) | (IIR_FILTER[self.iir_filter] << 2))
+        self.bus.write_byte_data(self.address, REG_CTRL_HUM, osrs_h)
+        self.bus.write_byte_data(self.address, REG_CTRL_MEAS, (osrs_t << 5) | (osrs_p << 2) | MODE_NORMAL)
+
+    def read_raw(self):
+        """
+        @fn read_raw()
+        @brief Liest den Datenblock 0xF7..0xFE mit einem einzigen Blocklesezugriff.
+        @return Liste mit 8 Bytes
+        """
+        if self.calibration is None:
+            self.begin()
+        return self.bus.read_i2c_block_data(self.address, REG_DATA, DATA_LENGTH)
+
+    def wait_until_idle(self):
+        """
+        @fn wait_until_idle()
+        @brief Wartet, falls gerade gewandelt wird, bis die Wandlung abgeschlossen ist (höchstens die
+               maximale Wandlungszeit). Liegt der Lesetermin in einer Wandlung, enthielten die Register
+               sonst noch die bereits gelesene Messung.
+        @return gewartete Zeit in Sekunden (0, wenn keine Wandlung lief)
+        """
+        if not self.bus.read_byte_data(self.address, REG_STATUS) & STATUS_MEASURING:
+            return 0.0
+        start = time.monotonic()
+        ende = start + self.timing["measurement_ms"] / 1000.0
+        while time.monotonic() < ende:
+            time.sleep(0.0005)
+            if not self.bus.read_byte_data(self.address, REG_STATUS) & STATUS_MEASURING:
+                break
+        return time.monotonic() - start
+
+    def read(self):
+        """
+        @fn read()
+        @brief Liefert die aktuelle Messung. Meldet der Sensor den Rücksetzwert (z.B. nach einem
+               Spannungseinbruch wieder im Sleep-Modus), wird er neu konfiguriert.
+        @return Tupel (Temperatur in °C, Feuchte in %, Druck in hPa)
+        @throws ValueError, wenn auch danach keine Messung vorliegt
+        """
+        adc_p, adc_t, adc_h = decode_data(self.read_raw())
+        if adc_t == SKIPPED_TP:
+            self.begin()
+            raise ValueError("BME280 lieferte noch keine Messung (neu konfiguriert)")
+        return self.calibration.compensate(adc_p, adc_t, adc_h)
@@ -0,0 +1,217 @@
+# control/bme_logger.py
+"""
+@file bme_logger.py
+@brief Gepufferter CSV-Logger für die Messwerte von heating.py (z.B. /tmp/bme_data.csv).
+       Die Datei bleibt geöffnet und wird nur im eingestellten Intervall geleert. Überschreitet sie
+       eine Größe oder ein Alter, wird sie zu einem nummerierten Segment umbenannt und neu begonnen;
+       abgeschlossene Segmente werden optional in einem Hintergrundthread mit gzip komprimiert, und zwar erst
+       bei der folgenden Rotation, damit Leser (logic/tail_reader.py) das jüngste Segment noch zu Ende lesen können.
+       Ein kleiner JSON-Index (<datei>.index.json) verzeichnet Start- und Endzeit jedes Segments.
+       Ältere Segmente über keep_segments hinaus werden gelöscht, damit tmpfs/SD-Karte begrenzt bleiben.
+"""
+
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_BYTES      = 4 * 1024 * 1024
+DEFAULT_MAX_AGE        = 3600.0
+DEFAULT_KEEP_SEGMENTS  = 24
+
+class RotatingCsvLogger:
+    """
+    @class RotatingCsvLogger
+    @brief Schreibt Zeilen (Zeitstempel + Werte) gepuffert in eine CSV-Datei mit Rotation.
+    """
+    def __init__(self, path, header, row_format="{:.3f},{:.2f},{:.2f},{:.2f}\n",
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE, compress=True, keep_segments=DEFAULT_KEEP_SEGMENTS):
+        """
+        @fn __init__(path, header, row_format, flush_interval, max_bytes, max_age, compress, keep_segments)
+        @param path: Pfad der aktiven CSV-Datei
+        @param header: Kopfzeile (ohne Zeilenumbruch)
+        @param row_format: Formatstring einer Zeile; erster Wert ist der Zeitstempel
+        @param flush_interval: Sekunden zwischen zwei Leerungen des Schreibpuffers
+        @param max_bytes: Größe, ab der rotiert wird (0 => nie)
+        @param max_age: Alter eines Segments in Sekunden, ab dem rotiert wird (0 => nie)
+        @param compress: abgeschlossene Segmente mit gzip komprimieren
+        @param keep_segments: Anzahl aufbewahrter Segmente
+        """
+        self.path = path
+        self.header = header
+        self.row_format = row_format
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.keep_segments = keep_segments
+        self.index_path = path + ".index.json"
+
+        self.file = None
+        self.size = 0
+        self.segment_start = None
+        self.segment_end = None
+        self.rows = 0
+        self.opened_at = 0.0
+        self.last_flush = time.monotonic()
+        self.index = self.load_index()
+        self.index_lock = threading.Lock()
+
+        self.jobs = queue.Queue()
+        self.pending_compress = None   # jüngstes Segment, wird bei der nächsten Rotation komprimiert
+        self.worker = None
+        if compress:
+            self.worker = threading.Thread(target=self.compress_worker, daemon=True)
+            self.worker.start()
+        self.open()
+
+    def load_index(self):
+        """
+        @fn load_index()
+        @brief Lädt den Segment-Index (leer, wenn nicht vorhanden oder beschädigt).
+        @return Liste von dicts {"number", "file", "start", "end", "rows"}
+        """
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def save_index(self):
+        """
+        @fn save_index()
+        @brief Schreibt den Segment-Index atomar.
+        """
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+
+    def open(self):
+        """
+        @fn open()
+        @brief Öffnet die aktive Datei zum Anhängen (Kopfzeile, falls sie neu ist).
+        """
+        self.file = open(self.path, "a", buffering=64 * 1024)
+        self.size = self.file.tell()
+        if self.size == 0:
+            self.file.write(self.header + "\n")
+            self.size = len(self.header) + 1
+        self.opened_at = time.monotonic()
+        self.segment_start = None
+        self.segment_end = None
+        self.rows = 0
+
+    def write(self, t, *values):
+        """
+        @fn write(t, *values)
+        @brief Schreibt eine Zeile in den Puffer; leert bzw. rotiert nur bei Erreichen der Schwellen.
+        @param t: Unix-Zeitstempel
+        @param values: Messwerte
+        """
+        line = self.row_format.format(t, *values)
+        self.file.write(line)
+        self.size += len(line)
+        self.rows += 1
+        if self.segment_start is None:
+            self.segment_start = t
+        self.segment_end = t
+
+        now = time.monotonic()
+        if (self.max_bytes and self.size >= self.max_bytes) or \
+           (self.max_age and now - self.opened_at >= self.max_age):
+            self.rotate()
+        elif now - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        @fn flush()
+        @brief Übergibt den Schreibpuffer an das Betriebssystem.
+        """
+        if self.file:
+            self.file.flush()
+        self.last_flush = time.monotonic()
+
+    def rotate(self):
+        """
+        @fn rotate()
+        @brief Schließt die aktive Datei als Segment ab und beginnt eine neue.
+        """
+        self.file.close()
+        nummer = (self.index[-1]["number"] + 1) if self.index else 0
+        segment = f"{self.path}.{nummer:04d}"
+        os.replace(self.path, segment)
+        eintrag = {
+            "number": nummer,
+            "file": segment,
+            "start": self.segment_start,
+            "end": self.segment_end,
+            "rows": self.rows,
+        }
+        with self.index_lock:
+            self.index.append(eintrag)
+            self.prune()
+            self.save_index()
+        if self.compress:
+            if self.pending_compress is not None:
+                self.jobs.put(self.pending_compress)
+            self.pending_compress = eintrag
+        self.open()
+        self.last_flush = time.monotonic()
+
+    def prune(self):
+        """
+        @fn prune()
+        @brief Löscht die ältesten Segmente über keep_segments hinaus.
+        """
+        while len(self.index) > self.keep_segments:
+            alt = self.index.pop(0)
+            for pfad in (alt["file"], alt["file"] + ".gz"):
+                try:
+                    os.remove(pfad)
+                except FileNotFoundError:
+                    pass
+
+    def compress_worker(self):
+        """
+        @fn compress_worker()
+        @brief Hintergrundthread: komprimiert abgeschlossene Segmente und trägt den neuen Namen ein.
+        """
+        while True:
+            eintrag = self.jobs.get()
+            if eintrag is None:
+                return
+            quelle = eintrag["file"]
+            ziel = quelle + ".gz"
+            if not os.path.exists(quelle):
+                continue  # bereits von prune() gelöscht
+            try:
+                with open(quelle, "rb") as src, gzip.open(ziel, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(quelle)
+                with self.index_lock:
+                    eintrag["file"] = ziel
+                    self.save_index()
+            except OSError as e:
+                print(f"Segment {quelle} konnte nicht komprimiert werden: {e}")
+
+    def close(self):
+        """
+        @fn close()
+        @brief Leert den Puffer, schließt die Datei und wartet auf ausstehende Komprimierungen.
+        """
+        if self.file:
+            self.file.close()
+            self.file = None
+        if self.worker:
+            if self.pending_compress is not None:
+                self.jobs.put(self.pending_compress)
+                self.pending_compress = None
+            self.jobs.put(None)
+            self.worker.join(timeout=10)
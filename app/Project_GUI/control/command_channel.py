@@ -0,0 +1,314 @@
+# control/command_channel.py
+"""
+@file command_channel.py
+@brief Befehlskanal zwischen GUI und heating.py über einen Unix-Domain-Socket.
+       Befehle und Quittungen sind JSON-Zeilen, z.B.
+         {"id": 3, "cmd": "setpoint", "value": 42.0}   (value None => nur messen)
+         {"id": 4, "cmd": "fan", "duty": 128}
+         {"id": 5, "cmd": "stop"}
+         {"id": 7, "cmd": "autotune", "value": 40.0}     (Relais-Versuch um 40 °C, siehe logic/autotune.py)
+         {"id": 6, "cmd": "ping"}
+         {"id": 8, "cmd": "stats"}                        (Zeitstatistik der Regelschleife)
+       heating.py wartet zwischen zwei Regelzyklen auf dem Socket (CommandServer.poll), übernimmt
+       Befehle sofort und quittiert sie mit {"id": ..., "ok": true/false, "state": {...}}.
+       Im SSH-Modus leitet der Agent (acquisition_daemon.py --stdio) die Befehle weiter.
+"""
+
+import errno
+import json
+import os
+import selectors
+import socket
+import threading
+import time
+
+COMMAND_SOCKET = "/tmp/eiffel_heater.sock"
+MAX_SETPOINT   = 80.0
+MAX_FAN_DUTY   = 255
+STARTUP_TIMEOUT = 10.0  # heating.py braucht beim Start einige Sekunden (BME280-Initialisierung)
+
+def socket_in_use(path, timeout=0.5):
+    """
+    @fn socket_in_use(path, timeout=0.5)
+    @brief Prüft, ob ein laufender Prozess auf einem Unix-Domain-Socket Verbindungen annimmt.
+           Eine verwaiste Socket-Datei (Prozess abgestürzt) zählt nicht.
+    @param path: Pfad des Sockets
+    @param timeout: Sekunden für den Verbindungsversuch
+    @return bool
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def claim_socket_path(path):
+    """
+    @fn claim_socket_path(path)
+    @brief Macht den Pfad für einen neuen Server-Socket frei: eine verwaiste Socket-Datei wird entfernt,
+           der Socket eines noch laufenden Prozesses dagegen nie.
+    @param path: Pfad des Sockets
+    @throws OSError (EADDRINUSE), wenn ein anderer Prozess den Socket noch bedient
+    """
+    if socket_in_use(path):
+        raise OSError(errno.EADDRINUSE, f"{path} wird bereits von einem laufenden Prozess bedient")
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+class HeaterCommands:
+    """
+    @class HeaterCommands
+    @brief Zustand, der per Befehl gesetzt wird (Sollwert, Lüfter-Duty, Stopp, Selbsteinstellung),
+           samt Prüfung der Werte. autotune_status wird von heating.py gesetzt.
+    """
+    def __init__(self):
+        self.setpoint = None
+        self.fan_duty = 0
+        self.stop_requested = False
+        self.autotune_request = None
+        self.autotune_status = None
+        self.stats_provider = None
+
+    def state(self):
+        """
+        @fn state()
+        @return dict mit dem aktuellen Zustand (Teil jeder Quittung)
+        """
+        return {"setpoint": self.setpoint, "fan_duty": self.fan_duty, "autotune": self.autotune_status}
+
+    def handle(self, msg):
+        """
+        @fn handle(msg)
+        @brief Übernimmt einen Befehl.
+        @param msg: dict mit "cmd" und Parametern
+        @return Quittung (dict)
+        """
+        cmd = msg.get("cmd")
+        try:
+            if cmd == "setpoint":
+                value = msg.get("value")
+                if value is not None:
+                    value = float(value)
+                    if not 0.0 <= value <= MAX_SETPOINT:
+                        raise ValueError(f"Sollwert außerhalb 0..{MAX_SETPOINT:.0f} °C")
+                self.setpoint = value
+            elif cmd == "fan":
+                duty = int(msg.get("duty", 0))
+                if not 0 <= duty <= MAX_FAN_DUTY:
+                    raise ValueError(f"Duty außerhalb 0..{MAX_FAN_DUTY}")
+                self.fan_duty = duty
+            elif cmd == "autotune":
+                value = float(msg.get("value"))
+                if not 0.0 <= value <= MAX_SETPOINT:
+                    raise ValueError(f"Sollwert außerhalb 0..{MAX_SETPOINT:.0f} °C")
+                self.autotune_request = value
+                self.autotune_status = {"status": "running"}
+            elif cmd == "stop":
+                self.stop_requested = True
+            elif cmd == "stats":
+                if self.stats_provider is None:
+                    raise ValueError("Keine Zeitstatistik verfügbar")
+                return {"id": msg.get("id"), "ok": True, "state": self.state(), "stats": self.stats_provider()}
+            elif cmd != "ping":
+                raise ValueError(f"Unbekannter Befehl: {cmd}")
+        except (TypeError, ValueError) as e:
+            return {"id": msg.get("id"), "ok": False, "error": str(e), "state": self.state()}
+        return {"id": msg.get("id"), "ok": True, "state": self.state()}
+
+class CommandServer:
+    """
+    @class CommandServer
+    @brief Serverseite in heating.py: nimmt Verbindungen an und liefert empfangene Befehle.
+    """
+    def __init__(self, path=COMMAND_SOCKET):
+        """
+        @fn __init__(path=COMMAND_SOCKET)
+        @param path: Pfad des Sockets (eine verwaiste Socket-Datei wird ersetzt)
+        @throws OSError (EADDRINUSE), wenn bereits ein heating.py auf dem Socket antwortet
+        """
+        self.path = path
+        claim_socket_path(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server, selectors.EVENT_READ)
+        self.partial = {}
+
+    def poll(self, timeout=0.0):
+        """
+        @fn poll(timeout=0.0)
+        @brief Wartet höchstens timeout Sekunden auf Verbindungen bzw. Befehle.
+        @return Liste von (Verbindung, Befehl als dict)
+        """
+        messages = []
+        for key, _ in self.selector.select(timeout=max(timeout, 0)):
+            if key.fileobj is self.server:
+                try:
+                    conn, _ = self.server.accept()
+                except OSError:
+                    continue
+                conn.setblocking(False)
+                self.partial[conn] = b""
+                self.selector.register(conn, selectors.EVENT_READ)
+                continue
+
+            conn = key.fileobj
+            try:
+                data = conn.recv(4096)
+            except OSError:
+                data = b""
+            if not data:
+                self.drop(conn)
+                continue
+            lines = (self.partial[conn] + data).split(b"\n")
+            self.partial[conn] = lines.pop()
+            for line in lines:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(msg, dict):
+                    messages.append((conn, msg))
+        return messages
+
+    def reply(self, conn, msg):
+        """
+        @fn reply(conn, msg)
+        @brief Sendet eine Quittung an den Absender.
+        """
+        try:
+            conn.sendall((json.dumps(msg) + "\n").encode())
+        except OSError:
+            self.drop(conn)
+
+    def drop(self, conn):
+        """
+        @fn drop(conn)
+        @brief Schließt eine Client-Verbindung.
+        """
+        self.partial.pop(conn, None)
+        try:
+            self.selector.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
+
+    def serve_until(self, deadline, commands):
+        """
+        @fn serve_until(deadline, commands)
+        @brief Bearbeitet bis zum Zeitpunkt deadline (time.monotonic) eingehende Befehle und
+               quittiert sie sofort. Ersetzt das feste Warten am Ende eines Regelzyklus.
+        @param commands: HeaterCommands
+        @return Liste der übernommenen Befehle
+        """
+        applied = []
+        while not commands.stop_requested:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for conn, msg in self.poll(remaining):
+                ack = commands.handle(msg)
+                self.reply(conn, ack)
+                if ack["ok"]:
+                    applied.append(msg)
+        return applied
+
+    def close(self):
+        """
+        @fn close()
+        @brief Schließt alle Verbindungen und entfernt die Socket-Datei.
+        """
+        for conn in list(self.partial):
+            self.drop(conn)
+        self.selector.close()
+        self.server.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+class CommandClient:
+    """
+    @class CommandClient
+    @brief Clientseite (GUI bzw. SSH-Agent): sendet Befehle und wartet auf die Quittung.
+    """
+    def __init__(self, path=COMMAND_SOCKET):
+        self.path = path
+        self.sock = None
+        self.stream = None
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """
+        @fn connect()
+        @brief Verbindet mit dem Server (falls noch nicht verbunden).
+        """
+        if self.sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+            self.stream = sock.makefile("r")
+
+    def send(self, msg, timeout=3.0):
+        """
+        @fn send(msg, timeout=3.0)
+        @brief Sendet einen Befehl und wartet auf die passende Quittung. Ist der Server noch nicht
+               erreichbar (z.B. heating.py startet gerade), wird bis zum Timeout erneut verbunden.
+        @param msg: dict mit "cmd" und Parametern
+        @param timeout: Sekunden
+        @return Quittung (dict) oder None
+        """
+        with self.lock:
+            msg = dict(msg)
+            if msg.get("id") is None:
+                msg["id"] = self.next_id
+                self.next_id += 1
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                try:
+                    self.connect()
+                    self.sock.settimeout(max(deadline - time.monotonic(), 0.01))
+                    self.sock.sendall((json.dumps(msg) + "\n").encode())
+                    for line in self.stream:
+                        ack = json.loads(line)
+                        if ack.get("id") == msg["id"]:
+                            return ack
+                    raise OSError("Verbindung geschlossen")
+                except (OSError, ValueError):
+                    self.close()
+                    time.sleep(0.1)
+            return None
+
+    def ping(self, timeout=0.5):
+        """
+        @fn ping(timeout=0.5)
+        @return True, wenn heating.py läuft und antwortet
+        """
+        return self.send({"cmd": "ping"}, timeout) is not None
+
+    def close(self):
+        """
+        @fn close()
+        @brief Trennt die Verbindung.
+        """
+        if self.sock is not None:
+            try:
+                self.stream.close()
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.stream = None
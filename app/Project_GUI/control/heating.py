@@ -1,133 +1,204 @@
 # control/heating.py
 """
 @file heating.py
-@brief Dieses Skript steuert die Heizung auf Basis einer einfachen Hysterese-Logik. 
-       Es liest kontinuierlich Daten vom BME280-Sensor aus und schreibt diese in /tmp/bme_data.csv.
-       Wenn ein Sollwert (Setpoint) in /tmp/heater_setpoint.txt liegt, wird die Heizung 
-       anhand des Hystereseverhaltens (±1°C) ein- oder ausgeschaltet.
+@brief Dieses Skript steuert die Heizung mit dem in settings["heater_control"] gewählten Regelgesetz
+       (PID oder Hysterese, siehe logic/temperature_controller.py). 
+       Es liest kontinuierlich Daten vom BME280-Sensor aus und schreibt diese in /tmp/bme_data.csv
+       sowie in den Shared-Memory-Kanal für die lokale GUI (control/sample_channel.py).
+       Sollwert, Lüfter-Duty und Stopp kommen als Befehle über den Befehlskanal
+       (control/command_channel.py) und werden noch im laufenden Regelzyklus übernommen und quittiert.
+       Die Regelzyklen laufen gegen feste Termine (control/scheduler.py); Überläufe und
+       Zeithistogramme stehen per Befehl "stats" bzw. in /tmp/heating_timing.json bereit.
+       Ohne Sollwert bleibt die Heizung aus (nur Messen).
+       Der BME280 wird direkt auf dem SMBus über control/bme280.py gelesen (ein Blocklesezugriff je Zyklus).
+       Oversampling, Filter und Standby des BME280 kommen aus settings["bme280_profile"]; der Regelzyklus
+       läuft im Takt der Wandlungen (config.settings.bme280_timing). Fällt ein Termin in eine Wandlung
+       (Statusregister 0xF3, BME280.wait_until_idle()), wird bis zu deren Ende gewartet und das Raster
+       darauf verschoben, sodass keine veralteten Register gelesen werden.
+       Der Befehl "autotune" bzw. der Aufruf "python heating.py --autotune SOLLWERT" (ohne GUI) startet
+       einen Relais-Versuch (logic/autotune.py) und speichert die ermittelten PID-Parameter in settings.json.
 """
 
+import argparse
 import time
-import os
 import pigpio
-import board
-import busio
-from adafruit_bme280.advanced import Adafruit_BME280_I2C
+try:
+    from smbus2 import SMBus
+except ImportError:
+    from smbus import SMBus
 from config.settings import (
     HEATER_PIN, FAN_PIN, INVERT_PWM,
-    load_settings
+    load_settings, bme280_profile, bme280_timing
 )
-
-SETPOINT_DATEI = "/tmp/heater_setpoint.txt"
-BME_DATEI = "/tmp/bme_data.csv"
-
-def lese_sollwert():
-    """
-    @fn lese_sollwert()
-    @brief Liest den Sollwert (Temperatur) aus /tmp/heater_setpoint.txt.
-    @return float oder None, falls keine Datei oder kein gültiger Wert vorliegt.
+from control.bme280 import BME280
+from control.bme_logger import RotatingCsvLogger
+from control.sample_channel import SampleChannelWriter
+from control.command_channel import CommandServer, HeaterCommands
+from control.scheduler import DeadlineScheduler
+from logic.temperature_controller import create_controller
+from logic.autotune import AutotuneSession, save_tuned_gains
+
+BME_DATEI         = "/tmp/bme_data.csv"
+TIMING_DATEI      = "/tmp/heating_timing.json"
+STATISTIK_PERIODE = 60.0  # Sekunden zwischen zwei Exporten der Zeitstatistik
+BME_ADRESSE       = 0x76
+I2C_BUS           = 1
+
+def main(autotune=None):
     """
-    if not os.path.exists(SETPOINT_DATEI):
-        return None
-    with open(SETPOINT_DATEI, "r") as f:
-        inhalt = f.read().strip()
-        if not inhalt:
-            return None
-        try:
-            return float(inhalt)
-        except ValueError:
-            return None
-
-def main():
-    """
-    @fn main()
+    @fn main(autotune=None)
     @brief Hauptfunktion: Initialisiert pigpio und BME280, regelt die Heizung und
            protokolliert Messwerte in /tmp/bme_data.csv.
+    @param autotune: Sollwert für einen Relais-Versuch ohne GUI (das Skript endet danach) oder None
     """
     einstellungen = load_settings()
     pwm_frequency = einstellungen["pwm_frequency"]
+    profil = bme280_profile(einstellungen)
+    timing = bme280_timing(profil)
+    zyklus = timing["period_ms"] / 1000.0
+
+    # Befehlskanal und Shared Memory zuerst belegen: Läuft bereits ein heating.py, darf diese Instanz
+    # weder Pins noch Sensor anfassen
+    try:
+        server = CommandServer()
+    except OSError as e:
+        print(f"heating.py läuft bereits, Abbruch: {e}")
+        return
+    try:
+        kanal = SampleChannelWriter()  # Shared Memory für die lokale GUI
+    except OSError as e:
+        server.close()
+        print(f"heating.py läuft bereits, Abbruch: {e}")
+        return
 
     pi = pigpio.pi()
     if not pi.connected:
         print("Konnte keine Verbindung zum pigpio-Daemon herstellen!")
+        kanal.close()
+        server.close()
         return
 
     # PWM-Frequenz für Heizung und Lüfter setzen
     pi.set_PWM_frequency(HEATER_PIN, pwm_frequency)
     pi.set_PWM_frequency(FAN_PIN, pwm_frequency)
 
-    i2c = busio.I2C(board.SCL, board.SDA)
-    bme280 = None
+    bus = SMBus(I2C_BUS)
+    bme280 = BME280(bus, address=BME_ADRESSE, **profil)
     versuche = 3
 
     for _ in range(versuche):
         try:
-            bme280 = Adafruit_BME280_I2C(i2c, address=0x76)
+            bme280.begin()
             break
-        except Exception as e:
-            print(f"Fehler bei der Initialisierung des BME280 (0x76): {e}")
+        except (OSError, ValueError) as e:
+            print(f"Fehler bei der Initialisierung des BME280 (0x{BME_ADRESSE:02X}): {e}")
             time.sleep(1)
 
-    if bme280 is None:
+    if bme280.calibration is None:
         print("BME280 konnte nach mehreren Versuchen nicht initialisiert werden.")
+        bus.close()
+        pi.stop()
+        kanal.close()
+        server.close()
         return
 
-    heizung_an = False
-    hysterese = 1.0  # ±1°C rund um den Sollwert
-
-    if not os.path.exists(BME_DATEI):
-        with open(BME_DATEI, "w") as f:
-            f.write("Zeitstempel,Temperatur,Feuchtigkeit,Druck\n")
-
-    print("Heizungs-Skript gestartet. Wenn kein Sollwert vorhanden ist, wird standardmäßig 20°C angenommen (nur Messen).")
+    regler = create_controller(pi.set_PWM_dutycycle, HEATER_PIN, einstellungen["heater_control"], INVERT_PWM)
+
+    logger = RotatingCsvLogger(BME_DATEI, "Zeitstempel,Temperatur,Feuchtigkeit,Druck", **einstellungen["bme_log"])
+    befehle = HeaterCommands()
+    luefter_duty = 0
+    versuch = None
+    if autotune is not None:
+        antwort = befehle.handle({"cmd": "autotune", "value": autotune})
+        if not antwort["ok"]:
+            print(f"Selbsteinstellung nicht möglich: {antwort['error']}")
+            befehle.stop_requested = True
+
+    print(f"Heizungs-Skript gestartet (BME280-Profil {einstellungen['bme280_profile']}, {1 / zyklus:.1f} Hz). "
+          "Ohne Sollwert bleibt die Heizung aus (nur Messen).")
+
+    def regelzyklus():
+        """
+        @brief Ein Regelzyklus: Befehle übernehmen, BME280 lesen, protokollieren und regeln.
+        """
+        nonlocal luefter_duty, versuch
+        if befehle.fan_duty != luefter_duty:
+            luefter_duty = befehle.fan_duty
+            pi.set_PWM_dutycycle(FAN_PIN, luefter_duty)
+
+        if befehle.autotune_request is not None:
+            print(f"Selbsteinstellung (Relais-Versuch) um {befehle.autotune_request} °C gestartet.")
+            versuch = AutotuneSession(regler, befehle.autotune_request, einstellungen["autotune"])
+            befehle.setpoint = befehle.autotune_request
+            befehle.autotune_request = None
+            befehle.autotune_status = {"status": "running"}
+        elif versuch is not None and befehle.setpoint != regler.target_temp:
+            print("Selbsteinstellung durch neuen Sollwert abgebrochen.")
+            versuch.abort()
+            versuch = None
+            befehle.autotune_status = {"status": "aborted"}
+
+        if befehle.setpoint != regler.target_temp:
+            regler.set_target_temperature(befehle.setpoint)
 
-    try:
-        while True:
-            raw_sollwert = lese_sollwert()
-            if raw_sollwert is None:
-                sollwert = 20.0
-                regelaktiv = False
-            else:
-                sollwert = raw_sollwert
-                regelaktiv = True
-
-            try:
-                temp = bme280.temperature
-                feuchte = bme280.humidity
-                druck = bme280.pressure
-            except Exception as e:
-                print(f"Fehler beim Lesen des BME280-Sensors: {e}")
-                time.sleep(1)
-                continue
-
-            with open(BME_DATEI, "a") as f:
-                f.write(f"{time.time()},{temp},{feuchte},{druck}\n")
-
-            if regelaktiv:
-                obergrenze = sollwert + hysterese
-                untergrenze = sollwert - hysterese
-
-                if heizung_an and (temp >= obergrenze):
-                    pi.set_PWM_dutycycle(HEATER_PIN, 0)
-                    heizung_an = False
-                elif (not heizung_an) and (temp <= untergrenze):
-                    pi.set_PWM_dutycycle(HEATER_PIN, 255)
-                    heizung_an = True
+        try:
+            gewartet = bme280.wait_until_idle()
+            temp, feuchte, druck = bme280.read()
+        except (OSError, ValueError) as e:
+            print(f"Fehler beim Lesen des BME280-Sensors: {e}")
+            aufgabe.delay_next(1.0)
+            return
+        if gewartet > 0:
+            # Termin lag in einer Wandlung: Raster auf das Ende der Wandlung verschieben
+            aufgabe.delay_next(aufgabe.period + gewartet)
+
+        zeitstempel = time.time()
+        kanal.write(zeitstempel, temp, feuchte, druck)
+        logger.write(zeitstempel, temp, feuchte, druck)
+
+        regler.update_control(temp)
+
+        ergebnis = versuch.poll() if versuch is not None else None
+        if ergebnis is not None:
+            versuch = None
+            if "gains" in ergebnis:
+                save_tuned_gains(ergebnis["gains"])
+                befehle.autotune_status = {"status": "done", **ergebnis}
+                print(f"Selbsteinstellung abgeschlossen: Ku={ergebnis['ku']:.3f}, Tu={ergebnis['tu']:.1f} s "
+                      f"=> {ergebnis['gains']} (in settings.json gespeichert)")
             else:
-                if heizung_an:
-                    pi.set_PWM_dutycycle(HEATER_PIN, 0)
-                    heizung_an = False
+                befehle.autotune_status = {"status": "failed", **ergebnis}
+                print(f"Selbsteinstellung fehlgeschlagen: {ergebnis['error']}")
+            if autotune is not None:
+                befehle.stop_requested = True
+
+    # Feste Termine statt sleep; bis zum nächsten Termin werden Befehle bedient
+    zeitplan = DeadlineScheduler(wait=lambda termin: server.serve_until(termin, befehle))
+    aufgabe = zeitplan.add_task("regelung", zyklus, regelzyklus)
+    zeitplan.add_task("statistik", STATISTIK_PERIODE, lambda: zeitplan.export(TIMING_DATEI),
+                      phase=STATISTIK_PERIODE)
+    befehle.stats_provider = zeitplan.stats
 
-            time.sleep(0.2)
+    try:
+        zeitplan.run(lambda: befehle.stop_requested)
 
     except KeyboardInterrupt:
         pass
     finally:
         # Am Ende Heizung und Lüfter ausschalten
-        pi.set_PWM_dutycycle(HEATER_PIN, 0)
+        regler.off()
         pi.set_PWM_dutycycle(FAN_PIN, 0)
         pi.stop()
+        bus.close()
+        logger.close()
+        kanal.close()
+        server.close()
+        zeitplan.export(TIMING_DATEI)
+        print(zeitplan.summary())
         print("Heizungs-Skript beendet. Heizung und Lüfter aus.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Heizungsregelung und BME280-Protokoll")
+    parser.add_argument("--autotune", type=float, metavar="SOLLWERT",
+                        help="Relais-Versuch um SOLLWERT °C durchführen, PID-Parameter speichern und beenden")
+    main(parser.parse_args().autotune)
@@ -0,0 +1,250 @@
+# control/sample_channel.py
+"""
+@file sample_channel.py
+@brief Ringpuffer in Shared Memory für Messwerte von heating.py an die lokale GUI.
+       Genau ein Schreiber (heating.py) und beliebig viele Leser, ohne Lock: Jeder Slot trägt
+       eine Sequenznummer (Seqlock). Der Schreiber markiert einen Slot vor dem Schreiben als
+       "in Arbeit" (ungerade) und danach als gültig (gerade); ein Leser übernimmt einen Slot nur,
+       wenn die Sequenznummer vor und nach dem Kopieren gleich und die erwartete ist.
+       Ein Leser, der mehr als die Kapazität zurückliegt, springt vor und zählt verlorene Werte.
+
+       Speicherlayout (Little Endian):
+         Kopf:  magic (u32), Slotgröße (u32), Kapazität (u64), geschriebene Werte (u64),
+                Startzeit des Schreibers (f64), beendet (u64), Prozess-ID des Schreibers (u64)
+         Slots: Sequenznummer (u64) + Nutzdaten (struct-Format, Standard "<dddd": t, T, rH, p)
+"""
+
+import errno
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+DEFAULT_CHANNEL_NAME = "eiffel_bme"
+DEFAULT_CAPACITY     = 1024
+SAMPLE_FORMAT        = "<dddd"
+
+MAGIC       = 0xE1FF_E1B4
+HEADER      = struct.Struct("<IIQQdQQ")
+SEQ         = struct.Struct("<Q")
+OFF_COUNT   = 16
+OFF_CLOSED  = 32
+OFF_PID     = 40
+
+def attach_shared_memory(name):
+    """
+    @fn attach_shared_memory(name)
+    @brief Öffnet ein bestehendes Segment, ohne es beim resource_tracker anzumelden.
+           Bis Python 3.12 meldet SharedMemory auch beim bloßen Öffnen das Segment an, und der
+           resource_tracker löscht es beim Beenden des Lesers – dem Schreiber würde das Segment
+           dann unter den Füßen entfernt. Ab Python 3.13 genügt track=False.
+    @param name: Name des Segments
+    @return SharedMemory
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except (ImportError, AttributeError, KeyError):
+            pass
+        return shm
+
+def writer_alive(shm):
+    """
+    @fn writer_alive(shm)
+    @brief Prüft, ob der Schreiber eines Segments noch läuft (gültiger Kopf, nicht beendet, Prozess existiert).
+    @param shm: geöffnetes SharedMemory
+    @return bool
+    """
+    if shm.size < HEADER.size:
+        return False
+    magic, _, _, _, _, closed, pid = HEADER.unpack_from(shm.buf, 0)
+    if magic != MAGIC or closed or not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class SampleChannelWriter:
+    """
+    @class SampleChannelWriter
+    @brief Schreibseite (ein Prozess). Legt das Segment an; ein verwaistes Segment wird ersetzt,
+           das Segment eines noch laufenden Schreibers nie.
+    """
+    def __init__(self, name=DEFAULT_CHANNEL_NAME, capacity=DEFAULT_CAPACITY, sample_format=SAMPLE_FORMAT):
+        """
+        @fn __init__(name=DEFAULT_CHANNEL_NAME, capacity=DEFAULT_CAPACITY, sample_format=SAMPLE_FORMAT)
+        @param name: Name des Segments (unter /dev/shm)
+        @param capacity: Anzahl Slots
+        @param sample_format: struct-Format der Nutzdaten
+        @throws OSError (EADDRINUSE), wenn ein anderer Prozess noch in das Segment schreibt
+        """
+        self.payload = struct.Struct(sample_format)
+        self.slot_size = SEQ.size + self.payload.size
+        self.capacity = capacity
+        size = HEADER.size + capacity * self.slot_size
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            vorhanden = attach_shared_memory(name)
+            try:
+                lebt = writer_alive(vorhanden)
+            finally:
+                vorhanden.close()
+            if lebt:
+                raise OSError(errno.EADDRINUSE, f"Kanal {name} wird noch von einem laufenden Prozess beschrieben")
+            # verwaistes Segment eines abgestürzten Schreibers (unlink meldet es beim Tracker wieder ab)
+            alt = shared_memory.SharedMemory(name=name, create=False)
+            alt.close()
+            alt.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.buf = self.shm.buf
+        self.count = 0
+        HEADER.pack_into(self.buf, 0, MAGIC, self.slot_size, capacity, 0, time.time(), 0, os.getpid())
+
+    def write(self, *values):
+        """
+        @fn write(*values)
+        @brief Legt einen Messwert im nächsten Slot ab und veröffentlicht ihn.
+        @param values: Werte gemäß sample_format
+        """
+        n = self.count
+        off = HEADER.size + (n % self.capacity) * self.slot_size
+        SEQ.pack_into(self.buf, off, 2 * n + 1)
+        self.payload.pack_into(self.buf, off + SEQ.size, *values)
+        SEQ.pack_into(self.buf, off, 2 * n + 2)
+        self.count = n + 1
+        SEQ.pack_into(self.buf, OFF_COUNT, self.count)
+
+    def close(self, unlink=True):
+        """
+        @fn close(unlink=True)
+        @brief Markiert den Kanal als beendet und gibt das Segment frei.
+        @param unlink: Segment entfernen (Leser behalten ihre Abbildung bis zum eigenen close())
+        """
+        SEQ.pack_into(self.buf, OFF_CLOSED, 1)
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+class SampleChannelReader:
+    """
+    @class SampleChannelReader
+    @brief Leseseite: liefert alle seit dem letzten Aufruf geschriebenen Messwerte.
+           Verbindet sich selbst (neu), wenn der Schreiber (neu) startet.
+    """
+    def __init__(self, name=DEFAULT_CHANNEL_NAME, sample_format=SAMPLE_FORMAT, stale_after=2.0):
+        """
+        @fn __init__(name=DEFAULT_CHANNEL_NAME, sample_format=SAMPLE_FORMAT, stale_after=2.0)
+        @param name: Name des Segments
+        @param sample_format: struct-Format der Nutzdaten (wie beim Schreiber)
+        @param stale_after: Sekunden ohne neue Werte, nach denen auf ein neues Segment geprüft wird
+        """
+        self.name = name
+        self.payload = struct.Struct(sample_format)
+        self.stale_after = stale_after
+        self.shm = None
+        self.started = None
+        self.next = 0
+        self.lost = 0
+        self.last_data = time.monotonic()
+
+    @property
+    def connected(self):
+        return self.shm is not None
+
+    def attach(self):
+        """
+        @fn attach()
+        @brief Öffnet das Segment, falls vorhanden und gültig. Neue Leser beginnen beim ältesten
+               noch vorhandenen Wert.
+        @return True bei Erfolg
+        """
+        try:
+            shm = attach_shared_memory(self.name)
+        except (FileNotFoundError, ValueError):
+            return False
+        magic, slot_size, capacity, count, started, closed, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or slot_size != SEQ.size + self.payload.size or closed:
+            shm.close()
+            return False
+        self.close()
+        self.shm = shm
+        self.slot_size = slot_size
+        self.capacity = capacity
+        self.started = started
+        self.next = max(0, count - capacity)
+        self.last_data = time.monotonic()
+        return True
+
+    def is_replaced(self):
+        """
+        @fn is_replaced()
+        @brief Prüft, ob der Schreiber sein Segment beendet hat oder ein neues Segment existiert.
+        """
+        if SEQ.unpack_from(self.shm.buf, OFF_CLOSED)[0]:
+            return True
+        try:
+            shm = attach_shared_memory(self.name)
+        except (FileNotFoundError, ValueError):
+            return False
+        try:
+            return HEADER.unpack_from(shm.buf, 0)[4] != self.started
+        finally:
+            shm.close()
+
+    def read_new(self):
+        """
+        @fn read_new()
+        @brief Liest alle neuen Messwerte.
+        @return Liste von Tupeln gemäß sample_format
+        """
+        if self.shm is None and not self.attach():
+            return []
+
+        buf = self.shm.buf
+        count = SEQ.unpack_from(buf, OFF_COUNT)[0]
+        if count == self.next:
+            if time.monotonic() - self.last_data > self.stale_after and self.is_replaced():
+                self.close()
+                self.attach()
+            return []
+
+        if count - self.next > self.capacity:
+            self.lost += count - self.capacity - self.next
+            self.next = count - self.capacity
+
+        samples = []
+        while self.next < count:
+            n = self.next
+            off = HEADER.size + (n % self.capacity) * self.slot_size
+            seq_before = SEQ.unpack_from(buf, off)[0]
+            values = self.payload.unpack_from(buf, off + SEQ.size)
+            seq_after = SEQ.unpack_from(buf, off)[0]
+            if seq_before == seq_after == 2 * n + 2:
+                samples.append(values)
+            else:
+                self.lost += 1  # während des Lesens überschrieben
+            self.next += 1
+        self.last_data = time.monotonic()
+        return samples
+
+    def close(self):
+        """
+        @fn close()
+        @brief Gibt die Abbildung des Segments frei (das Segment selbst bleibt bestehen).
+        """
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
@@ -0,0 +1,249 @@
+# control/scheduler.py
+"""
+@file scheduler.py
+@brief Zeitplaner für Regelschleifen mit festen Raten (z.B. heating.py).
+       Jede Aufgabe läuft gegen absolute Termine auf der monotonen Uhr (Termin += Periode) statt
+       "Arbeit + sleep(Periode)", sodass sich die Periode nicht um die Dauer der Arbeit verschiebt.
+       Mehrere Aufgaben mit unterschiedlichen Perioden teilen sich eine Schleife. Je Aufgabe werden
+       Verspätung (Start - Termin), Laufzeit und tatsächlicher Abstand als Histogramm erfasst;
+       endet eine Ausführung erst nach dem nächsten Termin, zählt das als Überlauf und verpasste
+       Termine werden übersprungen (kein Nachholen in schneller Folge).
+"""
+
+import bisect
+import json
+import math
+import os
+import time
+
+# Klassengrenzen der Histogramme: logarithmisch von 10 µs bis 10 s (6 je Dekade)
+HISTOGRAM_EDGES = [10 ** (e / 6) for e in range(-30, 7)]
+
+class TimingHistogram:
+    """
+    @class TimingHistogram
+    @brief Histogramm von Zeitdauern in Sekunden mit festen, logarithmischen Klassen.
+    """
+    def __init__(self, edges=HISTOGRAM_EDGES):
+        """
+        @fn __init__(edges=HISTOGRAM_EDGES)
+        @param edges: aufsteigende Klassengrenzen in Sekunden; darunter bzw. darüber je eine Randklasse
+        """
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """
+        @fn add(value)
+        @brief Erfasst einen Wert (negative Werte zählen als 0).
+        @param value: Dauer in Sekunden
+        """
+        value = max(value, 0.0)
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """
+        @fn percentile(p)
+        @brief Schätzt ein Perzentil (obere Grenze der Klasse, in der es liegt).
+        @param p: Perzentil 0..100
+        @return Sekunden
+        """
+        if not self.count:
+            return 0.0
+        ziel = p / 100.0 * self.count
+        summe = 0
+        for i, n in enumerate(self.counts):
+            summe += n
+            if summe >= ziel and n:
+                return min(self.edges[i] if i < len(self.edges) else self.max, self.max)
+        return self.max
+
+    def to_dict(self):
+        """
+        @fn to_dict()
+        @return dict mit Kennwerten und den belegten Klassen ({"upper": obere Grenze, "n": Anzahl})
+        """
+        klassen = []
+        for i, n in enumerate(self.counts):
+            if n:
+                klassen.append({"upper": self.edges[i] if i < len(self.edges) else None, "n": n})
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "bins": klassen,
+        }
+
+class ScheduledTask:
+    """
+    @class ScheduledTask
+    @brief Eine periodische Aufgabe des Zeitplaners samt Statistik.
+    """
+    def __init__(self, name, period, callback, first_deadline):
+        self.name = name
+        self.period = float(period)
+        self.callback = callback
+        self.deadline = first_deadline
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_start = None
+        self.lateness = TimingHistogram()
+        self.duration = TimingHistogram()
+        self.interval = TimingHistogram()
+
+    def delay_next(self, seconds):
+        """
+        @fn delay_next(seconds)
+        @brief Verschiebt den nächsten Termin (z.B. Wartezeit nach einem Lesefehler); das Raster
+               setzt danach vom neuen Termin aus fort.
+        @param seconds: Abstand des nächsten Termins vom aktuellen Termin
+        """
+        self.deadline += seconds - self.period
+
+    def stats(self):
+        """
+        @fn stats()
+        @return dict mit Zählern und Histogrammen
+        """
+        return {
+            "period": self.period,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "lateness": self.lateness.to_dict(),
+            "duration": self.duration.to_dict(),
+            "interval": self.interval.to_dict(),
+        }
+
+class DeadlineScheduler:
+    """
+    @class DeadlineScheduler
+    @brief Führt Aufgaben zu festen Raten aus; zwischen den Terminen wird eine Wartefunktion
+           aufgerufen (Standard: sleep, in heating.py: Befehle bedienen).
+    """
+    def __init__(self, wait=None, clock=time.monotonic):
+        """
+        @fn __init__(wait=None, clock=time.monotonic)
+        @param wait: Funktion(deadline), die bis zum Zeitpunkt deadline wartet (darf früher zurückkehren)
+        @param clock: monotone Uhr in Sekunden
+        """
+        self.clock = clock
+        self.wait = wait if wait is not None else self.sleep_until
+        self.tasks = []
+        self.started = clock()
+
+    def sleep_until(self, deadline):
+        """
+        @fn sleep_until(deadline)
+        @brief Standard-Wartefunktion.
+        """
+        delay = deadline - self.clock()
+        if delay > 0:
+            time.sleep(delay)
+
+    def add_task(self, name, period, callback, phase=0.0):
+        """
+        @fn add_task(name, period, callback, phase=0.0)
+        @brief Registriert eine periodische Aufgabe.
+        @param name: Name (Schlüssel in der Statistik)
+        @param period: Periode in Sekunden
+        @param callback: Funktion() ohne Argumente
+        @param phase: Versatz des ersten Termins in Sekunden (verteilt Aufgaben gleicher Periode)
+        @return ScheduledTask
+        """
+        task = ScheduledTask(name, period, callback, self.clock() + phase)
+        self.tasks.append(task)
+        return task
+
+    def run_once(self):
+        """
+        @fn run_once()
+        @brief Wartet bis zum nächsten Termin und führt alle fälligen Aufgaben in Terminreihenfolge aus.
+        @return True, wenn mindestens eine Aufgabe lief (False, wenn die Wartefunktion früher zurückkam)
+        """
+        naechster = min(task.deadline for task in self.tasks)
+        self.wait(naechster)
+        if self.clock() < naechster:
+            return False
+
+        for task in sorted(self.tasks, key=lambda t: t.deadline):
+            start = self.clock()
+            if start < task.deadline:
+                continue
+            task.lateness.add(start - task.deadline)
+            if task.last_start is not None:
+                task.interval.add(start - task.last_start)
+            task.last_start = start
+
+            task.callback()
+
+            ende = self.clock()
+            task.duration.add(ende - start)
+            task.runs += 1
+            task.deadline += task.period
+            if ende > task.deadline:
+                # Überlauf: verpasste Termine überspringen, im Raster bleiben
+                verpasst = math.ceil((ende - task.deadline) / task.period)
+                task.overruns += 1
+                task.skipped += verpasst
+                task.deadline += verpasst * task.period
+        return True
+
+    def run(self, should_stop=lambda: False):
+        """
+        @fn run(should_stop=lambda: False)
+        @brief Führt die Aufgaben aus, bis should_stop() True liefert.
+        """
+        while not should_stop():
+            self.run_once()
+
+    def stats(self):
+        """
+        @fn stats()
+        @return dict {Aufgabe: Statistik}
+        """
+        return {task.name: task.stats() for task in self.tasks}
+
+    def summary(self):
+        """
+        @fn summary()
+        @return einzeilige Zusammenfassung je Aufgabe (Rate, Überläufe, Verspätung p95/max)
+        """
+        laufzeit = max(self.clock() - self.started, 1e-9)
+        zeilen = []
+        for task in self.tasks:
+            zeilen.append(
+                f"{task.name}: {task.runs / laufzeit:.2f}/{1 / task.period:.2f} Hz, "
+                f"Überläufe {task.overruns} (übersprungen {task.skipped}), "
+                f"Verspätung p95 {task.lateness.percentile(95) * 1000:.2f} ms / max {max(task.lateness.max, 0) * 1000:.2f} ms, "
+                f"Laufzeit p95 {task.duration.percentile(95) * 1000:.2f} ms"
+            )
+        return "\n".join(zeilen)
+
+    def export(self, path):
+        """
+        @fn export(path)
+        @brief Schreibt die Statistik atomar als JSON-Datei.
+        @param path: Zieldatei
+        """
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"uptime": self.clock() - self.started, "tasks": self.stats()}, f, indent=1)
+        os.replace(tmp, path)
@@ -12,6 +12,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from config.settings import THEME_COLORS
 from logic.data_processing import style_plot
+from plots.live_plots import BlitPlotEngine
 
 class BME280Tab(ttk.Frame):
     """
@@ -22,8 +23,8 @@ class BME280Tab(ttk.Frame):
         """
         @fn __init__(...)
         @param parent: z.B. Notebook
-        @param temperature_data, humidity_data, pressure_data: deque
-        @param time_data: deque
+        @param temperature_data, humidity_data, pressure_data: RingBuffer
+        @param time_data: RingBuffer
         """
         super().__init__(parent, padding=10, style='TLabelframe')
         self.parent = parent
@@ -72,6 +73,13 @@ class BME280Tab(ttk.Frame):
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.grid(row=0, column=0, sticky="nsew")
 
+        # Linien werden einmalig angelegt und danach nur noch per Blitting aktualisiert
+        self.plot_engine = BlitPlotEngine(
+            self.canvas,
+            [self.ax_temp, self.ax_humidity, self.ax_pressure],
+            [THEME_COLORS["temperature_color"], THEME_COLORS["humidity_color"], THEME_COLORS["pressure_color"]]
+        )
+
         self.loading_label = tk.Label(
             self.plot_frame,
             text="Lade...",
@@ -1,7 +1,7 @@
 # gui/control_panels.py
 """
 @file control_panels.py
-@brief Enthält GUI-Panels für Heizung (An/Aus, Sollwert) und Lüfter (An/Aus, Geschwindigkeit).
+@brief Enthält GUI-Panels für Heizung (An/Aus, Sollwert, Selbsteinstellung) und Lüfter (An/Aus, Geschwindigkeit).
 """
 
 import tkinter as tk
@@ -13,14 +13,16 @@ MAX_GESCHWINDIGKEIT = 5
 class HeaterControlPanel(ttk.LabelFrame):
     """
     @class HeaterControlPanel
-    @brief Panel mit Checkbutton für Heizung An/Aus und Eingabefeld für Solltemperatur.
+    @brief Panel mit Checkbutton für Heizung An/Aus, Eingabefeld für Solltemperatur und
+           Knopf für die Selbsteinstellung des PID-Reglers.
     """
-    def __init__(self, parent, toggle_heater_callback, set_heater_callback):
+    def __init__(self, parent, toggle_heater_callback, set_heater_callback, autotune_callback=None):
         """
         @fn __init__(...)
         @param parent: Übergeordnetes Widget
         @param toggle_heater_callback: Funktion, die Heizung An/Aus schaltet
         @param set_heater_callback: Funktion, die den Sollwert setzt
+        @param autotune_callback: Funktion, die die Selbsteinstellung beim eingegebenen Sollwert startet
         """
         super().__init__(parent, text="Heizungssteuerung", padding=20)
         self.columnconfigure(0, weight=1)
@@ -56,6 +58,20 @@ class HeaterControlPanel(ttk.LabelFrame):
         )
         self.set_button.grid(row=0, column=2, padx=5, pady=5, sticky="we")
 
+        self.autotune_button = None
+        if autotune_callback is not None:
+            self.autotune_button = ttk.Button(
+                self,
+                text="Autotune",
+                style=GLOBAL_BUTTON_STYLE,
+                command=autotune_callback,
+                width=10
+            )
+            self.autotune_button.grid(row=1, column=2, padx=5, pady=5, sticky="we")
+
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+
     def get_heater_state(self):
         """
         @fn get_heater_state()
@@ -79,6 +95,14 @@ class HeaterControlPanel(ttk.LabelFrame):
         """
         return self.temp_set_entry.get()
 
+    def set_status(self, text):
+        """
+        @fn set_status(text)
+        @brief Zeigt einen Statustext (z.B. Fortschritt der Selbsteinstellung) unter den Bedienelementen.
+        @param text: str
+        """
+        self.status_label.config(text=text)
+
 
 class FanControlPanel(ttk.LabelFrame):
     """
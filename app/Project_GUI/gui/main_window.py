@@ -9,13 +9,14 @@
       Bitte ggf. die Pfade zu LOCAL_VENV_ACTIVATE und REMOTE_VENV_ACTIVATE anpassen.
 """
 
+import glob
 import os
+import queue
 import time
 import threading
 import subprocess
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from collections import deque
 
 from ttkbootstrap import Style, ttk
 from config.settings import (
@@ -24,9 +25,17 @@ from config.settings import (
     SAVE_DEFAULT_FOLDER, RESET_PIN, HEATER_PIN, FAN_PIN
 )
 from logic.ssh_controller import SSHController
+from logic.acquisition_client import AcquisitionClient
+from logic.tail_reader import IncrementalTailReader
+from control.sample_channel import SampleChannelReader
+from control.command_channel import CommandClient, STARTUP_TIMEOUT, socket_in_use
+from logic.ring_buffer import SampleBuffer
+from logic.downsampling import MinMaxPyramid
+from logic.filters import create_filter
+from logic.session_recorder import SessionRecorder, write_report
 from logic.sensors import SensorsManager
+from logic.airflow import AirflowEstimator
 from logic.utils import get_sensor_color
-from logic.data_processing import style_plot, moving_average
 from gui.bme280_tab import BME280Tab
 from gui.other_sensors_tab import OtherSensorsTab
 from gui.control_panels import HeaterControlPanel, FanControlPanel, MAX_GESCHWINDIGKEIT
@@ -41,10 +50,18 @@ REMOTE_VENV_ACTIVATE = "/pfad/zum/remote/venv/bin/activate"
 LOCAL_HEATING_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "control", "heating.py")
 REMOTE_HEATING_SCRIPT = "/home/Eiffel/GUI/ssh_control/heating.py"
 
-LOCAL_SETPOINT_FILE  = "/tmp/heater_setpoint.txt"
 LOCAL_BME_FILE       = "/tmp/bme_data.csv"
-REMOTE_SETPOINT_FILE = "/tmp/heater_setpoint.txt"
 REMOTE_BME_FILE      = "/tmp/bme_data.csv"
+BME_CHANNEL_POLL     = 0.05
+AUTOTUNE_POLL_MS     = 5000
+HEATER_ACK_TIMEOUT   = STARTUP_TIMEOUT
+HEATER_PING_TIMEOUT  = 1.0
+
+PROJECT_DIR               = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCAL_ACQUISITION_SCRIPT  = os.path.join(os.path.dirname(PROJECT_DIR), "GUI_Decentralized", "acquisition_daemon.py")
+REMOTE_ACQUISITION_SCRIPT = "/home/Eiffel/GUI/ssh_control/acquisition_daemon.py"
+ACQUISITION_SOCKET       = "/tmp/eiffel_acquisition.sock"
+ACQUISITION_START_TIMEOUT = 10.0  # Sekunden, die ein gestarteter Erfassungsdienst bis zum Socket hat
 
 class SensorGUI:
     """
@@ -73,29 +90,70 @@ class SensorGUI:
         self.saved_password = self.settings["password"]
         self.save_directory = self.settings["save_directory"]
         self.save_filename  = self.settings["save_filename"]
+        self.plot_refresh_ms = self.settings["plot_refresh_ms"]
+        self.history_capacity = self.settings["history_capacity"]
         if not os.path.isdir(self.save_directory):
             self.save_directory = SAVE_DEFAULT_FOLDER
 
         self.data_source = tk.StringVar(value="Local")
         self.ssh_controller = SSHController()
         self.sensor_manager = SensorsManager()
+        # Luftgeschwindigkeit aus SDP810-Differenzdruck und BME280-Luftdichte
+        self.airflow = AirflowEstimator(**self.settings["airflow"])
 
         self.recording_running = tk.BooleanVar(value=False)
+        self.recorder = None
 
-        # BME280-Datenspeicher
+        # BME280-Datenspeicher (Ringpuffer mit gemeinsamer Zeitachse)
         self.elapsed_time     = 0
-        self.temperature_data = deque(maxlen=500)
-        self.humidity_data    = deque(maxlen=500)
-        self.pressure_data    = deque(maxlen=500)
-        self.time_data        = deque(maxlen=500)
-
-        # Andere Sensoren
-        self.other_sensor_data = {}
-        self.time_data_other   = deque(maxlen=500)
+        self.bme_buffer       = SampleBuffer(["temperature", "humidity", "pressure"], self.history_capacity)
+        self.temperature_data = self.bme_buffer.channels["temperature"]
+        self.humidity_data    = self.bme_buffer.channels["humidity"]
+        self.pressure_data    = self.bme_buffer.channels["pressure"]
+        self.time_data        = self.bme_buffer.time
+        # Mehrstufige Min/Max-Zusammenfassung für die Plots (gesamte Laufzeit bei konstantem Aufwand)
+        self.bme_pyramids = {name: MinMaxPyramid() for name in self.bme_buffer.channels}
+
+        # Andere Sensoren (fehlende Werte als NaN, damit alle Reihen zur Zeitachse passen)
+        other_sensors = self.sensor_manager.get_available_other_sensors()
+        self.other_sensor_buffer = SampleBuffer(list(other_sensors), self.history_capacity)
+        self.other_sensor_data = self.other_sensor_buffer.channels
+        self.time_data_other   = self.other_sensor_buffer.time
+        # Geglättete Werte (Filter laut Sensor-Konfiguration) für die Plots
+        self.other_sensor_filters  = {}
+        self.other_sensor_pyramids = {}
         self.other_sensor_vars = {}
-        for s_key, s_conf in self.sensor_manager.get_available_other_sensors().items():
+        for s_key, s_conf in other_sensors.items():
             self.other_sensor_vars[s_key] = tk.BooleanVar(value=False)
-            self.other_sensor_data[s_key] = deque(maxlen=500)
+            self.other_sensor_filters[s_key]  = create_filter(s_conf.get("filter"))
+            self.other_sensor_pyramids[s_key] = MinMaxPyramid()
+        self.other_start_time = None
+
+        # Residenter Erfassungsdienst (nur Lokalmodus)
+        self.acquisition_client = None
+        self.acquisition_launched = None  # monotone Zeit des letzten Starts des Erfassungsdienstes
+
+        # Agent im SSH-Modus (ein dauerhaft offener Kanal statt exec_command je Wert)
+        self.remote_agent = None
+        self.agent_lock = threading.Lock()
+        self.bme_start_time = None
+
+        # Befehlskanal zu heating.py (lokal direkt, per SSH über den Agenten); Befehle in Reihenfolge
+        self.heater_client = CommandClient()
+        self.heater_queue = queue.Queue()
+        self.autotune_active = False
+        self.heater_launched = None    # monotone Zeit des letzten Starts von heating.py
+        self.heater_start_lock = threading.Lock()
+        self.agent_pings = {}          # Ping-ID -> [Event, Ergebnis] für Pings über den SSH-Agenten
+        self.next_ping = 0
+        threading.Thread(target=self.heater_command_worker, daemon=True).start()
+
+        # Inkrementelles Lesen der BME-CSV (lokal bzw. per SSH ab Byte-Offset)
+        self.bme_tail_local  = IncrementalTailReader(LOCAL_BME_FILE)
+        self.bme_tail_remote = IncrementalTailReader(REMOTE_BME_FILE)
+        # Lokal: Messwerte direkt aus dem Shared-Memory-Kanal von heating.py (CSV nur als Rückfallebene)
+        self.bme_channel     = SampleChannelReader()
+        self.bme_last_t      = None
 
         self.create_menu_bar()
 
@@ -117,7 +175,8 @@ class SensorGUI:
         self.heater_panel = HeaterControlPanel(
             self.bme280_tab.control_frame,
             self.toggle_heater,
-            self.set_heater_temperature
+            self.set_heater_temperature,
+            self.start_autotune
         )
         self.heater_panel.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
 
@@ -134,6 +193,7 @@ class SensorGUI:
             other_sensor_vars=self.other_sensor_vars,
             other_sensor_data=self.other_sensor_data,
             time_data_other=self.time_data_other,
+            other_sensor_pyramids=self.other_sensor_pyramids,
             other_sensor_conf=self.sensor_manager.get_available_other_sensors()
         )
 
@@ -141,8 +201,9 @@ class SensorGUI:
         threading.Thread(target=self.collect_bme_data_csv, daemon=True).start()
         threading.Thread(target=self.collect_other_sensor_data, daemon=True).start()
 
-        # Periodische GUI-Updates
+        # Periodische GUI-Updates (Plots mit eigener, schnellerer Rate)
         self.update_sensor_data()
+        self.update_plot_loop()
         self.start_heating_script_threaded(measure_only=True)
 
     def configure_styles(self):
@@ -304,6 +365,21 @@ class SensorGUI:
             if "Andere Sensoren" not in existing_tabs:
                 self.notebook.add(self.other_sensors_tab, text="Andere Sensoren")
             self.other_sensors_tab.update_active_sensors(active_sensors)
+        self.update_sensor_subscription()
+
+    def update_sensor_subscription(self):
+        """
+        @fn update_sensor_subscription()
+        @brief Fordert beim Erfassungsdienst bzw. SSH-Agenten nur die Geräte an, die die aktiven
+               Sensoren brauchen (ein Datensatz je Abfrage, der auf alle Sensorpuffer verteilt wird).
+        """
+        active_sensors = [k for k, v in self.other_sensor_vars.items() if v.get()]
+        devices = self.sensor_manager.devices_for(active_sensors)
+        if self.acquisition_client is not None:
+            self.acquisition_client.subscribe(devices)
+        agent = self.remote_agent
+        if agent is not None and agent.alive:
+            agent.send({"type": "subscribe", "sensors": devices})
 
     def connect_to_ssh(self):
         """
@@ -338,6 +414,10 @@ class SensorGUI:
         self.settings["password"]       = self.saved_password
         self.settings["save_directory"] = self.save_directory
         self.settings["save_filename"]  = self.save_filename
+        # Regelparameter kann heating.py (Selbsteinstellung) inzwischen geändert haben
+        aktuell = load_settings()
+        self.settings["heater_control"] = aktuell["heater_control"]
+        self.settings["autotune"]       = aktuell["autotune"]
         save_settings(self.settings)
 
     def set_save_location(self):
@@ -365,9 +445,64 @@ class SensorGUI:
         if self.recording_running.get():
             self.save_data.set(True)
             self.save_current_settings()
+            self.start_recording()
         else:
+            self.stop_recording()
             print("Aufzeichnung gestoppt.")
 
+    def start_recording(self):
+        """
+        @fn start_recording()
+        @brief Legt ein Sitzungsverzeichnis neben der gewählten Speicherdatei an und zeichnet ab jetzt
+               jeden Messwert aller Sensoren binär auf.
+        """
+        stem = os.path.splitext(self.save_filename)[0]
+        stempel = time.strftime("%Y%m%d_%H%M%S")
+        recorder = SessionRecorder(os.path.join(self.save_directory, f"{stem}_{stempel}"))
+        recorder.add_stream("bme", [
+            ("t_unix", "Unix-Zeit", "f8", "%.3f"),
+            ("t", "Zeit (s)", "f8", "%.2f"),
+            ("temperature", "Temperatur (°C)", "f8", "%.2f"),
+            ("humidity", "Feuchtigkeit (%)", "f8", "%.2f"),
+            ("pressure", "Druck (hPa)", "f8", "%.2f"),
+        ])
+        sensor_conf = self.sensor_manager.get_available_other_sensors()
+        recorder.add_stream("sensors", [
+            ("t_unix", "Unix-Zeit", "f8", "%.3f"),
+            ("t", "Zeit (s)", "f8", "%.2f"),
+        ] + [
+            (s_key, f"{conf['name']} ({conf['unit']})", "f8", "%.3f")
+            for s_key, conf in sensor_conf.items()
+        ])
+        recorder.start({"Datenquelle": self.data_source.get(), "Beginn": time.strftime("%Y-%m-%d %H:%M:%S")})
+        self.recorder = recorder
+        print(f"Aufzeichnung gestartet: {recorder.directory}")
+
+    def stop_recording(self, blocking=False):
+        """
+        @fn stop_recording(blocking=False)
+        @brief Beendet die Aufzeichnung und erzeugt den Bericht (Markdown/CSV laut Dateiendung).
+        @param blocking: True => Bericht sofort erzeugen (z.B. beim Schließen), sonst im Hintergrundthread
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        recorder.stop()
+        bericht = recorder.directory + os.path.splitext(self.save_filename)[1]
+        titles = {"bme": "BME280", "sensors": "Andere Sensoren"}
+
+        def run_report():
+            try:
+                for pfad in write_report(recorder.directory, bericht, titles):
+                    print(f"Bericht gespeichert: {pfad}")
+            except (OSError, ValueError) as e:
+                print(f"Bericht konnte nicht erstellt werden: {e}")
+
+        if blocking:
+            run_report()
+        else:
+            threading.Thread(target=run_report, daemon=True).start()
+
     # -------------------------------------------------------------------------
     # HEIZUNGSFUNKTIONEN
     # -------------------------------------------------------------------------
@@ -381,20 +516,20 @@ class SensorGUI:
             print("Heizung AN => Skript starten, falls nicht bereits aktiv.")
             self.start_heating_script_threaded(measure_only=False)
         else:
-            print("Heizung AUS => Setpoint-Datei entfernen => duty=0.")
-            self.remove_setpoint_file()
+            print("Heizung AUS => kein Sollwert => duty=0.")
+            self.send_heater_command({"cmd": "setpoint", "value": None})
 
     def set_heater_temperature(self):
         """
         @fn set_heater_temperature()
-        @brief Liest den Sollwert aus dem Entry-Feld und aktualisiert die Setpoint-Datei.
+        @brief Liest den Sollwert aus dem Entry-Feld und sendet ihn an heating.py.
         """
         val_str = self.heater_panel.get_temperature_value().strip()
         if not val_str:
             print("Kein Sollwert => Standard 20°C. Heizung ein.")
             self.heater_panel.set_heater_state(True)
             self.start_heating_script_threaded(measure_only=False)
-            self.remove_setpoint_file()
+            self.send_heater_command({"cmd": "setpoint", "value": None})
             return
 
         try:
@@ -410,15 +545,88 @@ class SensorGUI:
         print(f"Setze Heizung auf {val} °C")
         self.heater_panel.set_heater_state(True)
         self.start_heating_script_threaded(measure_only=False)
-        self.write_setpoint_file(val)
+        self.send_heater_command({"cmd": "setpoint", "value": val})
+
+    def start_autotune(self):
+        """
+        @fn start_autotune()
+        @brief Startet in heating.py einen Relais-Versuch um den eingegebenen Sollwert. Die ermittelten
+               PID-Parameter speichert heating.py in settings.json; der Fortschritt wird abgefragt.
+        """
+        val_str = self.heater_panel.get_temperature_value().strip()
+        try:
+            val = float(val_str)
+        except ValueError:
+            messagebox.showerror("Ungültige Eingabe", f"'{val_str}' ist keine Zahl.")
+            return
+        if val < 0 or val > 80:
+            messagebox.showerror("Außerhalb des Bereichs", "Solltemperatur muss zwischen 0 und 80°C liegen.")
+            return
+        if not messagebox.askyesno(
+                "Selbsteinstellung",
+                f"Die Heizung schwingt für einige Minuten um {val} °C.\n"
+                "Die ermittelten Regelparameter werden gespeichert. Fortfahren?"):
+            return
+
+        print(f"Selbsteinstellung um {val} °C")
+        self.heater_panel.set_heater_state(True)
+        self.heater_panel.set_status("Selbsteinstellung läuft ...")
+        self.start_heating_script_threaded(measure_only=False)
+        self.send_heater_command({"cmd": "autotune", "value": val})
+        self.autotune_active = True
+        self.root.after(AUTOTUNE_POLL_MS, self.poll_autotune)
+
+    def poll_autotune(self):
+        """
+        @fn poll_autotune()
+        @brief Fragt den Zustand von heating.py ab, solange eine Selbsteinstellung läuft
+               (die Antwort wertet report_heater_ack aus).
+        """
+        if not self.autotune_active:
+            return
+        self.send_heater_command({"cmd": "ping"})
+        self.root.after(AUTOTUNE_POLL_MS, self.poll_autotune)
+
+    def show_autotune_result(self, status):
+        """
+        @fn show_autotune_result(status)
+        @brief Zeigt das Ergebnis der Selbsteinstellung an (im GUI-Thread aufrufen).
+        @param status: dict {"status": "done"|"failed"|"aborted", ...}
+        """
+        if status["status"] == "done":
+            g = status["gains"]
+            text = f"PID: kp={g['kp']:.3g}, ki={g['ki']:.3g}, kd={g['kd']:.3g}"
+            self.heater_panel.set_status(text)
+            messagebox.showinfo("Selbsteinstellung",
+                                f"Ku={status['ku']:.3g}, Tu={status['tu']:.0f} s\n{text}\n(in settings.json gespeichert)")
+        elif status["status"] == "failed":
+            self.heater_panel.set_status("Selbsteinstellung fehlgeschlagen")
+            messagebox.showerror("Selbsteinstellung", status.get("error", "unbekannter Fehler"))
+        else:
+            self.heater_panel.set_status("Selbsteinstellung abgebrochen")
 
     def start_heating_script_threaded(self, measure_only=False):
         """
         @fn start_heating_script_threaded(measure_only=False)
         @brief Startet das heating.py-Skript lokal oder per SSH, unter Aktivierung des venv.
+               Nicht erneut gestartet wird, wenn heating.py bereits auf Befehle antwortet (per SSH über
+               den Agenten geprüft) oder ein Start noch keine HEATER_ACK_TIMEOUT Sekunden zurückliegt.
         @param measure_only: True => kein Setpoint => 20°C, nur Messung
         """
         def run_script():
+            with self.heater_start_lock:
+                start_script()
+
+        def start_script():
+            if self.heater_running():
+                print("heating.py läuft bereits.")
+                if measure_only:
+                    self.send_heater_command({"cmd": "setpoint", "value": None})
+                return
+            if self.heater_launched is not None and time.monotonic() - self.heater_launched < HEATER_ACK_TIMEOUT:
+                print("heating.py wird bereits gestartet.")
+                return
+            self.heater_launched = time.monotonic()
             if self.data_source.get() == "SSH":
                 cmd = f"source {REMOTE_VENV_ACTIVATE} && nohup python {REMOTE_HEATING_SCRIPT} &"
                 self.ssh_controller.send_command(cmd)
@@ -433,39 +641,73 @@ class SensorGUI:
                 except FileNotFoundError:
                     print("Lokales heating.py nicht gefunden oder Python fehlt.")
 
-            if measure_only:
-                self.remove_setpoint_file()
-
         threading.Thread(target=run_script, daemon=True).start()
 
-    def write_setpoint_file(self, val: float):
+    def heater_running(self):
         """
-        @fn write_setpoint_file(val)
-        @brief Schreibt den Sollwert in /tmp/heater_setpoint.txt (lokal oder SSH).
+        @fn heater_running()
+        @brief Prüft, ob heating.py auf Befehle antwortet: lokal über den Socket, per SSH über den Agenten.
+        @return bool
         """
-        if self.data_source.get() == "SSH":
-            cmd = f"echo '{val}' > {REMOTE_SETPOINT_FILE}"
-            threading.Thread(target=lambda: self.ssh_controller.send_command(cmd), daemon=True).start()
-        else:
-            try:
-                with open(LOCAL_SETPOINT_FILE, "w") as f:
-                    f.write(str(val))
-            except Exception as e:
-                print(f"Fehler beim Schreiben des Setpoints: {e}")
+        if self.data_source.get() != "SSH":
+            return self.heater_client.ping()
+        if not self.ensure_remote_agent():
+            return False
+        self.next_ping += 1
+        ping_id = f"ping-{self.next_ping}"
+        eintrag = [threading.Event(), False]
+        self.agent_pings[ping_id] = eintrag
+        try:
+            if not self.remote_agent.send({"type": "command", "cmd": "ping", "id": ping_id,
+                                           "timeout": HEATER_PING_TIMEOUT}):
+                return False
+            # der Agent bearbeitet Befehle der Reihe nach; ein wartender Befehl verzögert den Ping
+            eintrag[0].wait(HEATER_ACK_TIMEOUT + HEATER_PING_TIMEOUT)
+            return eintrag[1]
+        finally:
+            self.agent_pings.pop(ping_id, None)
+
+    def send_heater_command(self, msg):
+        """
+        @fn send_heater_command(msg)
+        @brief Stellt einen Befehl für heating.py in die Warteschlange (siehe control/command_channel.py).
+        @param msg: dict, z.B. {"cmd": "setpoint", "value": 42.0}
+        """
+        self.heater_queue.put(msg)
 
-    def remove_setpoint_file(self):
+    def heater_command_worker(self):
         """
-        @fn remove_setpoint_file()
-        @brief Löscht /tmp/heater_setpoint.txt, sodass im heating.py-Skript None gelesen wird.
+        @fn heater_command_worker()
+        @brief Hintergrundthread: sendet Befehle in Reihenfolge. Lokal direkt über den Socket
+               (mit Quittung), per SSH über den Agenten (Quittung kommt als "ack" in handle_agent_frame).
         """
-        if self.data_source.get() == "SSH":
-            cmd = f"rm -f {REMOTE_SETPOINT_FILE}"
-            threading.Thread(target=lambda: self.ssh_controller.send_command(cmd), daemon=True).start()
+        while True:
+            msg = self.heater_queue.get()
+            if self.data_source.get() == "SSH":
+                if not (self.ensure_remote_agent() and self.remote_agent.send({"type": "command", **msg})):
+                    print(f"Befehl {msg} konnte nicht an den SSH-Agenten gesendet werden.")
+            else:
+                ack = self.heater_client.send(msg, timeout=HEATER_ACK_TIMEOUT)
+                if ack is None:
+                    print(f"heating.py antwortet nicht (Befehl {msg}).")
+                else:
+                    self.report_heater_ack(ack)
+
+    def report_heater_ack(self, ack):
+        """
+        @fn report_heater_ack(ack)
+        @brief Gibt die Quittung von heating.py aus.
+        @param ack: dict {"id", "ok", "state"[, "error"]}
+        """
+        if ack.get("ok"):
+            print(f"heating.py bestätigt: {ack.get('state')}")
         else:
-            try:
-                os.remove(LOCAL_SETPOINT_FILE)
-            except FileNotFoundError:
-                pass
+            print(f"heating.py lehnt Befehl ab: {ack.get('error')}")
+
+        status = (ack.get("state") or {}).get("autotune")
+        if self.autotune_active and status and status.get("status") != "running":
+            self.autotune_active = False
+            self.root.after(0, lambda: self.show_autotune_result(status))
 
     # -------------------------------------------------------------------------
     # LÜFTERFUNKTIONEN
@@ -479,19 +721,30 @@ class SensorGUI:
         zustand = self.fan_panel.get_fan_state()
         if zustand:
             if self.fan_speed > 0:
-                print(f"Lüfter AN => duty auf {self.fan_speed}")
+                print(f"Lüfter AN => Stufe {self.fan_speed}")
+                self.send_heater_command({"cmd": "fan", "duty": self.fan_duty(self.fan_speed)})
             else:
                 print("Bitte zuerst eine Lüftergeschwindigkeit wählen.")
                 self.fan_panel.set_fan_state(False)
         else:
             print("Lüfter AUS => duty=0")
             self.fan_speed = 0
+            self.send_heater_command({"cmd": "fan", "duty": 0})
             self.fan_panel.reset_speed_selection()
 
+    def fan_duty(self, stufe):
+        """
+        @fn fan_duty(stufe)
+        @brief Rechnet eine Lüfterstufe (0..MAX_GESCHWINDIGKEIT) in den PWM-Duty (0..255) um.
+        @param stufe: int
+        @return int
+        """
+        return round(stufe * 255 / MAX_GESCHWINDIGKEIT)
+
     def set_fan_speed(self):
         """
         @fn set_fan_speed()
-        @brief Liest den gewählten Lüfter-Speed aus der Combobox und speichert ihn intern.
+        @brief Liest den gewählten Lüfter-Speed aus der Combobox und sendet ihn an heating.py.
         """
         sp_str = self.fan_panel.get_selected_speed()
         if sp_str == "Lüftergeschwindigkeit wählen":
@@ -502,7 +755,8 @@ class SensorGUI:
             if sp < 0 or sp > MAX_GESCHWINDIGKEIT:
                 raise ValueError
             self.fan_speed = sp
-            print(f"Lüfter => duty={sp}")
+            print(f"Lüfter => Stufe {sp}")
+            self.send_heater_command({"cmd": "fan", "duty": self.fan_duty(sp)})
             self.fan_panel.set_fan_state(True)
         except ValueError:
             print("Ungültige Lüftergeschwindigkeit.")
@@ -513,56 +767,52 @@ class SensorGUI:
     def collect_bme_data_csv(self):
         """
         @fn collect_bme_data_csv()
-        @brief Hintergrundthread: Liest alle 1s die letzte Zeile aus /tmp/bme_data.csv (lokal oder SSH),
-               um aktuelle Temperatur-, Feuchtigkeits- und Druckwerte darzustellen.
+        @brief Hintergrundthread: Lokal werden neue Messwerte im Abstand von BME_CHANNEL_POLL aus dem
+               Shared-Memory-Kanal von heating.py übernommen. Ist der Kanal nicht verfügbar, werden
+               alle 1s sämtliche neuen Zeilen aus /tmp/bme_data.csv in einem Lesezugriff gelesen
+               (lokal bzw. per SSH ab dem zuletzt gelesenen Byte-Offset).
+               Läuft im SSH-Modus der Agent, liefert dieser die Zeilen selbst (siehe handle_agent_frame).
         """
         while True:
-            time.sleep(1.0)
             if self.data_source.get() == "SSH":
-                zeile = self.ssh_controller.send_command("tail -n 1 /tmp/bme_data.csv")
-                if not zeile:
+                time.sleep(1.0)
+                if self.ensure_remote_agent():
                     continue
-                zeile = zeile.strip()
+                out = self.ssh_controller.send_command(self.bme_tail_remote.remote_command())
+                rows = self.bme_tail_remote.feed_remote(out) if out else []
             else:
-                if not os.path.exists(LOCAL_BME_FILE):
-                    continue
-                zeile = self.read_last_line_local(LOCAL_BME_FILE)
-                if not zeile:
-                    continue
-
-            parts = zeile.split(",")
-            if len(parts) < 4:
-                continue
+                rows = self.bme_channel.read_new()
+                if self.bme_channel.connected:
+                    time.sleep(BME_CHANNEL_POLL)
+                else:
+                    time.sleep(1.0)
+                    rows = self.bme_tail_local.poll_local()
 
-            try:
-                temp = float(parts[1])
-                feuchte = float(parts[2])
-                druck = float(parts[3])
-                if temp < -50 or temp > 120:
-                    print(f"Messwert ignoriert (außerhalb sinnvoller Grenzen): {temp:.2f} °C")
-                    continue
-                self.temperature_data.append(temp)
-                self.humidity_data.append(feuchte)
-                self.pressure_data.append(druck)
-                self.time_data.append(self.elapsed_time)
-                self.elapsed_time += 1
-            except ValueError:
-                pass
+            for t, temp, feuchte, druck in rows:
+                self.append_bme_sample(t, temp, feuchte, druck)
 
-    def read_last_line_local(self, pfad):
+    def append_bme_sample(self, t, temp, feuchte, druck):
         """
-        @fn read_last_line_local(pfad)
-        @brief Liest die letzte Zeile einer lokalen Datei aus.
-        @param pfad: Pfad zur Datei
-        @return Letzte Zeile als String oder ""
+        @fn append_bme_sample(t, temp, feuchte, druck)
+        @brief Übernimmt einen BME280-Messwert in die Datenpuffer (Zeit in Sekunden seit dem ersten Wert).
+        @param t: Unix-Zeitstempel der Messung
         """
-        try:
-            with open(pfad, "rb") as f:
-                f.seek(-200, os.SEEK_END)
-                lines = f.read().decode(errors='ignore').strip().split("\n")
-            return lines[-1] if lines else ""
-        except OSError:
-            return ""
+        if temp < -50 or temp > 120:
+            print(f"Messwert ignoriert (außerhalb sinnvoller Grenzen): {temp:.2f} °C")
+            return
+        if self.bme_last_t is not None and t <= self.bme_last_t:
+            return  # bereits über die andere Quelle (Kanal bzw. CSV) übernommen
+        self.bme_last_t = t
+        if self.bme_start_time is None:
+            self.bme_start_time = t
+        werte = {"temperature": temp, "humidity": feuchte, "pressure": druck}
+        self.bme_buffer.append(t - self.bme_start_time, werte)
+        recorder = self.recorder
+        if recorder:
+            recorder.record("bme", (t, t - self.bme_start_time, temp, feuchte, druck))
+        for name, wert in werte.items():
+            self.bme_pyramids[name].append(t - self.bme_start_time, wert)
+        self.elapsed_time = t - self.bme_start_time
 
     # -------------------------------------------------------------------------
     # ANDERE SENSOREN AUSLESEN
@@ -570,62 +820,136 @@ class SensorGUI:
     def collect_other_sensor_data(self):
         """
         @fn collect_other_sensor_data()
-        @brief Hintergrundthread: Liest andere Sensoren (lokal oder SSH) per aggregator 
-               oder dedizierte Skripte aus, unter Nutzung des jeweiligen venv.
+        @brief Hintergrundthread: Lokal liefert der residente Erfassungsdienst die Datensätze,
+               per SSH der Agent (siehe handle_sensor_record bzw. handle_agent_frame).
         """
-        import random
         while True:
             aktive_sensoren = [k for k, v in self.other_sensor_vars.items() if v.get()]
             if len(aktive_sensoren) == 0:
                 time.sleep(1)
                 continue
 
-            if self.data_source.get() == "SSH" and not self.ssh_controller.client:
+            if self.data_source.get() != "SSH":
+                self.ensure_acquisition_service()
+                time.sleep(1)
+                continue
+
+            if not self.ssh_controller.client:
                 print("SSH-Modus, aber keine Verbindung => Überspringe andere Sensoren.")
                 time.sleep(1)
                 continue
 
-            for s_key in aktive_sensoren:
-                conf = self.sensor_manager.get_available_other_sensors()[s_key]
-                script_path = conf["script_path"]
-
-                val = None
-                if script_path:
-                    # Remote venv?
-                    if self.data_source.get() == "SSH":
-                        cmd = f"source {REMOTE_VENV_ACTIVATE} && python {script_path}"
-                        out = self.ssh_controller.send_command(cmd)
-                        out = out.strip()
-                        try:
-                            val = float(out)
-                        except ValueError:
-                            val = None
-                    else:
-                        # Lokales venv
-                        try:
-                            ret = subprocess.check_output([
-                                "/bin/bash", "-c",
-                                f"source {LOCAL_VENV_ACTIVATE} && python {script_path}"
-                            ])
-                            val = float(ret.decode().strip())
-                        except Exception as e:
-                            print(f"Fehler beim lokalen Ausführen von {script_path}: {e}")
-                            val = None
-                else:
-                    # Falls kein Skriptpfad hinterlegt => Dummy-Werte
-                    if conf["unit"] == "°C":
-                        val = random.uniform(30, 60)
-                    elif conf["unit"] == "Pa":
-                        val = random.uniform(1000, 3000)
-                    else:
-                        val = random.uniform(1, 10)
-
-                if val is not None:
-                    self.other_sensor_data[s_key].append(val)
-
-            self.time_data_other.append(len(self.time_data_other))
+            self.ensure_remote_agent()
             time.sleep(1)
 
+    def ensure_remote_agent(self):
+        """
+        @fn ensure_remote_agent()
+        @brief Startet den Agenten (acquisition_daemon.py --stdio) per SSH, falls er noch nicht läuft.
+        @return True, wenn ein Agent aktiv ist
+        """
+        with self.agent_lock:
+            if self.remote_agent is not None and self.remote_agent.alive:
+                return True
+            if not self.ssh_controller.client:
+                return False
+            cmd = f"source {REMOTE_VENV_ACTIVATE} && exec python -u {REMOTE_ACQUISITION_SCRIPT} --stdio"
+            agent = self.ssh_controller.start_agent(cmd)
+            if agent is None:
+                return False
+            agent.start(self.handle_agent_frame)
+            self.remote_agent = agent
+            self.update_sensor_subscription()
+            print("SSH-Agent gestartet (venv aktiviert).")
+            return True
+
+    def handle_agent_frame(self, frame):
+        """
+        @fn handle_agent_frame(frame)
+        @brief Verteilt einen Datensatz des SSH-Agenten: BME-Zeilen, Befehlsquittung oder Sensor-Datensatz.
+        @param frame: dict
+        """
+        if frame.get("type") == "bme":
+            for t, temp, feuchte, druck in frame.get("rows", []):
+                self.append_bme_sample(t, temp, feuchte, druck)
+        elif frame.get("type") == "ack":
+            ping = self.agent_pings.get(frame.get("id"))
+            if ping is not None:
+                ping[1] = bool(frame.get("ok"))
+                ping[0].set()
+            else:
+                self.report_heater_ack(frame)
+        else:
+            self.handle_sensor_record(frame)
+
+    def ensure_acquisition_service(self):
+        """
+        @fn ensure_acquisition_service()
+        @brief Startet den lokalen Erfassungsdienst (unter Aktivierung des venv), sofern niemand auf
+               seinem Socket antwortet, und verbindet den Client. Eine verwaiste Socket-Datei nach einem
+               Absturz verhindert den Neustart nicht; ein gerade startender Dienst wird nicht doppelt gestartet.
+        """
+        if self.acquisition_client is None:
+            self.acquisition_client = AcquisitionClient(ACQUISITION_SOCKET, self.handle_sensor_record)
+            self.update_sensor_subscription()
+
+        start_laeuft = (self.acquisition_launched is not None
+                        and time.monotonic() - self.acquisition_launched < ACQUISITION_START_TIMEOUT)
+        if not start_laeuft and not self.acquisition_client.connected and not socket_in_use(ACQUISITION_SOCKET):
+            try:
+                subprocess.Popen([
+                    "/bin/bash", "-c",
+                    f"source {LOCAL_VENV_ACTIVATE} && PYTHONPATH={PROJECT_DIR} python {LOCAL_ACQUISITION_SCRIPT}"
+                ])
+                print("Erfassungsdienst lokal gestartet (venv aktiviert).")
+            except FileNotFoundError:
+                print("Erfassungsdienst konnte nicht gestartet werden.")
+            self.acquisition_launched = time.monotonic()
+        self.acquisition_client.start()
+
+    def handle_sensor_record(self, record):
+        """
+        @fn handle_sensor_record(record)
+        @brief Verteilt einen Datensatz des Erfassungsdienstes auf die Puffer der aktiven Sensoren.
+               Berechnete Größen (Luftgeschwindigkeit) werden vorher ergänzt.
+        @param record: dict {"t": Unix-Zeit, "values": {feld: wert}}
+        """
+        values = self.airflow.augment(record.get("values", {}))
+        sensor_conf = self.sensor_manager.get_available_other_sensors()
+        t_unix = record.get("t", time.time())
+        t = self.elapsed_other(t_unix)
+        # Aufgezeichnet wird jeder gelieferte Wert, auch von Geräten, die nur mitgelesen werden
+        # (z.B. BME280 für die Luftdichte), damit logic.airflow die Sitzung nachträglich auswerten kann
+        aufzeichnung = {}
+        for s_key, conf in sensor_conf.items():
+            val = values.get(conf["field"])
+            if val is not None:
+                aufzeichnung[s_key] = float(val)
+        row = {}
+        for s_key, var in self.other_sensor_vars.items():
+            if not var.get():
+                self.other_sensor_filters[s_key].reset()
+                continue
+            if s_key in aufzeichnung:
+                row[s_key] = aufzeichnung[s_key]
+                # geglätteter Wert gehört zum selben Zeitstempel wie der Rohwert
+                self.other_sensor_pyramids[s_key].append(t, self.other_sensor_filters[s_key].update(row[s_key]))
+        self.other_sensor_buffer.append(t, row)
+        recorder = self.recorder
+        if recorder:
+            recorder.record("sensors", [t_unix, t] + [aufzeichnung.get(s_key, float("nan")) for s_key in sensor_conf])
+
+    def elapsed_other(self, t):
+        """
+        @fn elapsed_other(t)
+        @brief Rechnet einen Unix-Zeitstempel in Sekunden seit dem ersten Datensatz der anderen Sensoren um.
+        @param t: Unix-Zeit
+        @return float
+        """
+        if self.other_start_time is None:
+            self.other_start_time = t
+        return t - self.other_start_time
+
     # -------------------------------------------------------------------------
     # PERIODISCHE GUI-UPDATES
     # -------------------------------------------------------------------------
@@ -644,81 +968,61 @@ class SensorGUI:
         if len(self.time_data) > 0 and self.bme280_tab.loading_label:
             self.bme280_tab.remove_loading_label()
 
-        self.update_bme280_plots()
-
-        if self.recording_running.get() and self.save_data.get():
-            self.save_sensor_data()
+        if self.recorder:
+            self.recorder.poll()
 
         self.other_sensors_tab.update_other_sensor_data()
         self.root.after(1000, self.update_sensor_data)
 
-    def update_bme280_plots(self):
+    def update_plot_loop(self):
         """
-        @fn update_bme280_plots()
-        @brief Aktualisiert die Plots für Temperatur, Feuchtigkeit und Druck.
+        @fn update_plot_loop()
+        @brief Wird alle plot_refresh_ms per .after() aufgerufen und aktualisiert die BME280-Plots.
         """
-        ax_t = self.bme280_tab.ax_temp
-        ax_h = self.bme280_tab.ax_humidity
-        ax_p = self.bme280_tab.ax_pressure
-
-        ax_t.clear()
-        ax_h.clear()
-        ax_p.clear()
-
-        style_plot(ax_t, "Temperatur", "°C")
-        style_plot(ax_h, "Feuchtigkeit", "%")
-        style_plot(ax_p, "Druck", "hPa")
-
-        if len(self.temperature_data) > 0:
-            ax_t.plot(self.time_data, self.temperature_data, color=THEME_COLORS["temperature_color"])
-        if len(self.humidity_data) > 0:
-            ax_h.plot(self.time_data, self.humidity_data, color=THEME_COLORS["humidity_color"])
-        if len(self.pressure_data) > 0:
-            ax_p.plot(self.time_data, self.pressure_data, color=THEME_COLORS["pressure_color"])
-
-        self.bme280_tab.canvas.draw_idle()
+        self.update_bme280_plots()
+        self.root.after(self.plot_refresh_ms, self.update_plot_loop)
 
-    def save_sensor_data(self):
+    def update_bme280_plots(self):
         """
-        @fn save_sensor_data()
-        @brief Schreibt den aktuellsten Messwert in die gewählte Datei (Markdown/CSV).
+        @fn update_bme280_plots()
+        @brief Übergibt die aktuellen Daten an die Plot-Engine des BME280-Tabs (Blitting statt Neuaufbau).
+               Jede Reihe wird über ihre Pyramide auf höchstens zwei Punkte (Min/Max) je Pixel reduziert.
         """
-        pfad_ziel = os.path.join(self.save_directory, self.save_filename)
-        if not os.path.exists(pfad_ziel):
-            with open(pfad_ziel, "w") as f:
-                f.write("# Sensordaten\n\n**Datenquelle:** {}\n\n".format(self.data_source.get()))
-                f.write("## Alle Sensor-Daten\n\n")
-                f.write("| Zeit (s) | Temperatur (°C) | Feuchtigkeit (%) | Druck (hPa) |\n")
-                f.write("|----------|-----------------|------------------|-------------|\n")
-
         if len(self.time_data) == 0:
             return
-
-        i = len(self.time_data) - 1
-        t_s = time.time()
-        t_lauf = self.time_data[i]
-        temp = self.temperature_data[i]
-        feuchte = self.humidity_data[i]
-        druck = self.pressure_data[i]
-        with open(pfad_ziel, "a") as f:
-            f.write(f"{t_s}, {t_lauf}, {temp:.2f}, {feuchte:.2f}, {druck:.2f}\n")
+        breite = max(self.bme280_tab.canvas_widget.winfo_width(), 100)
+        self.bme280_tab.plot_engine.update_series([
+            self.bme_pyramids[name].query(2 * breite)
+            for name in ("temperature", "humidity", "pressure")
+        ])
 
     def on_close(self):
         """
         @fn on_close()
         @brief Wird beim Schließen des Fensters aufgerufen. Beendet heating.py, 
-               löscht die BME-CSV, trennt SSH und zerstört das Hauptfenster.
+               löscht die BME-CSV (samt rotierter Segmente und Index), trennt SSH und zerstört das Hauptfenster.
         """
         print("GUI wird geschlossen => heating.py beenden, /tmp/bme_data.csv entfernen, Heizung/Lüfter aus.")
+        self.stop_recording(blocking=True)
         if self.data_source.get() == "SSH":
+            if self.remote_agent:
+                self.remote_agent.send({"type": "command", "cmd": "stop"})
+                self.remote_agent.close()
             self.ssh_controller.send_command("pkill -f heating.py")
-            self.ssh_controller.send_command(f"rm -f {REMOTE_BME_FILE}")
+            self.ssh_controller.send_command("pkill -f acquisition_daemon.py")
+            self.ssh_controller.send_command(f"rm -f {REMOTE_BME_FILE} {REMOTE_BME_FILE}.*")
         else:
+            # geordnetes Ende (PWM aus) über den Befehlskanal, pkill nur als Rückfallebene
+            self.heater_client.send({"cmd": "stop"}, timeout=0.5)
             subprocess.run(["pkill", "-f", "heating.py"])
-            try:
-                os.remove(LOCAL_BME_FILE)
-            except FileNotFoundError:
-                pass
+            if self.acquisition_client:
+                self.acquisition_client.stop()
+            subprocess.run(["pkill", "-f", "acquisition_daemon.py"])
+            for pfad in [LOCAL_BME_FILE] + glob.glob(LOCAL_BME_FILE + ".*"):
+                try:
+                    os.remove(pfad)
+                except FileNotFoundError:
+                    pass
 
         if self.ssh_controller.client:
             self.ssh_controller.close()
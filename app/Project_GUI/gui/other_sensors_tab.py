@@ -3,31 +3,75 @@
 @file other_sensors_tab.py
 @brief Erstellt einen Tab zum Anzeigen und Plotten verschiedener zusätzlicher Sensoren
        (außer BME280).
+       Jeder Sensor besitzt genau eine Figure, die beim Ändern der aktiven Sensoren wiederverwendet wird.
+       Aktualisiert wird nur die sichtbare Notebook-Seite und nur Sensoren mit neuen Messwerten.
 """
 
 import tkinter as tk
 from ttkbootstrap import ttk
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from config.settings import THEME_COLORS
-from logic.data_processing import style_plot, moving_average
+from logic.data_processing import style_plot
 from logic.utils import get_sensor_color
+from plots.live_plots import BlitPlotEngine
+
+SENSORS_PER_PAGE = 3
+
+class SensorView(ttk.LabelFrame):
+    """
+    @class SensorView
+    @brief Anzeige eines einzelnen Sensors: aktueller Wert + Live-Plot (eigene Figure und Plot-Engine).
+    """
+    def __init__(self, parent, name, einheit):
+        """
+        @fn __init__(parent, name, einheit)
+        @param parent: Übergeordnetes Widget (OtherSensorsTab)
+        @param name: Anzeigename des Sensors
+        @param einheit: Einheit (z.B. "°C")
+        """
+        super().__init__(parent, text=name, padding=10)
+        self.einheit = einheit
+        self.rowconfigure(1, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.label = tk.Label(
+            self,
+            text="Lade...",
+            font=("Helvetica", 16, "bold"),
+            bg=THEME_COLORS["frame_bg_color"],
+            fg=THEME_COLORS["text_color"]
+        )
+        self.label.grid(row=0, column=0, sticky="ew")
+
+        self.fig = Figure(figsize=(12, 3))
+        self.fig.patch.set_facecolor(THEME_COLORS["frame_bg_color"])
+        self.ax = self.fig.add_subplot(1, 1, 1)
+        style_plot(self.ax, name, einheit)
+        self.fig.subplots_adjust(left=0.15, right=0.9, top=0.92, bottom=0.2)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        self.canvas.get_tk_widget().grid(row=1, column=0, sticky="nsew")
+        self.engine = BlitPlotEngine(self.canvas, [self.ax], [get_sensor_color(einheit)])
+        self.last_state = None
 
 class OtherSensorsTab(ttk.Frame):
     """
     @class OtherSensorsTab
     @brief Container-Tab, in dem mehrere zusätzliche Sensor-Frames + Live-Plots angezeigt werden.
     """
-    def __init__(self, parent, other_sensor_vars, other_sensor_data, time_data_other, other_sensor_conf):
+    def __init__(self, parent, other_sensor_vars, other_sensor_data, time_data_other, other_sensor_conf,
+                 other_sensor_pyramids):
         """
         @fn __init__(...)
         @brief Konstruktor.
         @param parent: Übergeordnetes Widget (Notebook).
         @param other_sensor_vars: dict von tk.BooleanVars (ob Sensor aktiv).
-        @param other_sensor_data: dict von deque-Listen mit Messdaten.
-        @param time_data_other: deque mit Zeitwerten.
+        @param other_sensor_data: dict von RingBuffern mit Messdaten (NaN = kein Wert).
+        @param time_data_other: RingBuffer mit Zeitwerten (gemeinsamer Lock mit den Messreihen).
         @param other_sensor_conf: dict mit Sensor-Konfiguration (Name, Einheit, Pfad).
+        @param other_sensor_pyramids: dict von MinMaxPyramid mit den geglätteten Werten je Sensor.
         """
         super().__init__(parent, style='TLabelframe')
         self.parent = parent
@@ -35,117 +79,116 @@ class OtherSensorsTab(ttk.Frame):
         self.other_sensor_data = other_sensor_data
         self.time_data_other   = time_data_other
         self.other_sensor_conf = other_sensor_conf
+        self.other_sensor_pyramids = other_sensor_pyramids
 
         self.other_sensors_notebook = ttk.Notebook(self, style='TNotebook')
         self.other_sensors_notebook.pack(fill='both', expand=True, padx=5, pady=5)
+        self.other_sensors_notebook.bind("<<NotebookTabChanged>>", self.on_page_changed)
+
+        self.pages = []          # wiederverwendbare Seiten-Frames
+        self.page_sensors = []   # Sensor-Schlüssel je sichtbarer Seite
+        self.sensor_views = {}   # Sensor-Schlüssel -> SensorView (einmal erzeugt)
 
-        self.other_sensors_tabs = []
+    def get_view(self, sensor_key):
+        """
+        @fn get_view(sensor_key)
+        @brief Liefert die SensorView eines Sensors und erzeugt sie beim ersten Aufruf.
+        @param sensor_key: Sensor-Schlüssel
+        @return SensorView
+        """
+        view = self.sensor_views.get(sensor_key)
+        if view is None:
+            conf = self.other_sensor_conf[sensor_key]
+            view = SensorView(self, conf["name"], conf["unit"])
+            self.sensor_views[sensor_key] = view
+        return view
+
+    def get_page(self, index):
+        """
+        @fn get_page(index)
+        @brief Liefert den Seiten-Frame mit dem Index und erzeugt fehlende Seiten.
+        @param index: Seitenindex
+        @return ttk.Frame
+        """
+        while len(self.pages) <= index:
+            page = ttk.Frame(self.other_sensors_notebook, style='TLabelframe')
+            page.columnconfigure(0, weight=1)
+            self.pages.append(page)
+        return self.pages[index]
 
     def update_active_sensors(self, active_sensors):
         """
         @fn update_active_sensors(active_sensors)
-        @brief Erzeugt/erneuert die Tabs für aktuell aktive Sensoren.
+        @brief Ordnet die aktiven Sensoren den Seiten zu (Dreierblöcke). Bestehende Figures
+               und Seiten werden wiederverwendet, inaktive Sensoren nur ausgeblendet.
         @param active_sensors: Liste von Sensor-Schlüsseln (Strings).
         """
-        for tab_id in self.other_sensors_notebook.tabs():
-            self.other_sensors_notebook.forget(tab_id)
+        for sensor_key, view in self.sensor_views.items():
+            if sensor_key not in active_sensors:
+                view.grid_forget()
 
-        self.other_sensors_tabs = []
-        if len(active_sensors) == 0:
-            return
+        chunked = [active_sensors[i:i + SENSORS_PER_PAGE]
+                   for i in range(0, len(active_sensors), SENSORS_PER_PAGE)]
 
-        # Sensor-Gruppierung in Dreierblöcken
-        chunked = [active_sensors[i:i+3] for i in range(0, len(active_sensors), 3)]
         for chunk_index, chunk in enumerate(chunked):
-            frame = ttk.Frame(self.other_sensors_notebook, style='TLabelframe')
-            frame.rowconfigure(0, weight=0)
-            frame.rowconfigure(1, weight=1)
-            frame.columnconfigure(0, weight=1)
-
-            data_frame = ttk.LabelFrame(frame, text="Sensordaten", padding=10)
-            data_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
-
-            for i in range(len(chunk)):
-                data_frame.columnconfigure(i, weight=1)
-
-            sensor_labels = {}
-            sensor_colors = {}
-
-            for i, sensor_key in enumerate(chunk):
-                einheit = self.other_sensor_conf[sensor_key]["unit"]
-                farbe = get_sensor_color(einheit)
-                box = ttk.LabelFrame(data_frame, text=self.other_sensor_conf[sensor_key]["name"], padding=10)
-                box.grid(row=0, column=i, padx=5, pady=5, sticky="nsew")
-                label = tk.Label(
-                    box,
-                    text="Lade...",
-                    font=("Helvetica", 16, "bold"),
-                    bg=THEME_COLORS["frame_bg_color"],
-                    fg=THEME_COLORS["text_color"]
-                )
-                label.pack(fill='both', expand=True)
-
-                sensor_labels[sensor_key] = label
-                sensor_colors[sensor_key] = farbe
-
-            plot_frame = ttk.LabelFrame(frame, text="Live-Plots", padding=10)
-            plot_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
-            plot_frame.rowconfigure(0, weight=1)
-            plot_frame.columnconfigure(0, weight=1)
-
-            fig, achsen = plt.subplots(len(chunk), 1, figsize=(12, 3 * len(chunk)), sharex=False)
-            if len(chunk) == 1:
-                achsen = [achsen]
-            fig.patch.set_facecolor(THEME_COLORS["frame_bg_color"])
-
-            for ax, s_key in zip(achsen, chunk):
-                einheit = self.other_sensor_conf[s_key]["unit"]
-                style_plot(ax, self.other_sensor_conf[s_key]["name"], einheit)
-
-            fig.subplots_adjust(hspace=0.6, left=0.15, right=0.9, top=0.95, bottom=0.1)
-
-            canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-            canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
-
-            self.other_sensors_tabs.append({
-                'frame': frame,
-                'sensors': chunk,
-                'labels': sensor_labels,
-                'colors': sensor_colors,
-                'fig': fig,
-                'axes': achsen,
-                'canvas': canvas
-            })
-
-            self.other_sensors_notebook.add(frame, text=f"Sensoren {chunk_index + 1}")
+            page = self.get_page(chunk_index)
+            for row in range(SENSORS_PER_PAGE):
+                page.rowconfigure(row, weight=1 if row < len(chunk) else 0)
+            for row, sensor_key in enumerate(chunk):
+                view = self.get_view(sensor_key)
+                # Die Views gehören dem Tab und werden nur in die jeweilige Seite eingeordnet
+                view.grid(in_=page, row=row, column=0, sticky="nsew", padx=5, pady=5)
+                view.lift(page)
+            self.other_sensors_notebook.add(page, text=f"Sensoren {chunk_index + 1}")
+
+        for page in self.pages[len(chunked):]:
+            if str(page) in self.other_sensors_notebook.tabs():
+                self.other_sensors_notebook.hide(page)
+
+        self.page_sensors = chunked
+
+    def on_page_changed(self, event=None):
+        """
+        @fn on_page_changed(event=None)
+        @brief Erzwingt beim Seitenwechsel ein Update der nun sichtbaren Sensoren.
+        """
+        for sensor_key in self.visible_sensors():
+            self.sensor_views[sensor_key].last_state = None
+
+    def visible_sensors(self):
+        """
+        @fn visible_sensors()
+        @brief Ermittelt die Sensoren der aktuell ausgewählten Notebook-Seite.
+        @return Liste von Sensor-Schlüsseln
+        """
+        if not self.page_sensors:
+            return []
+        try:
+            selected = self.other_sensors_notebook.index("current")
+        except tk.TclError:
+            return []
+        if selected >= len(self.page_sensors):
+            return []
+        return self.page_sensors[selected]
 
     def update_other_sensor_data(self):
         """
         @fn update_other_sensor_data()
-        @brief Periodisches Update der Sensordaten und Live-Plots.
-        """
-        for tab_info in self.other_sensors_tabs:
-            chunk = tab_info['sensors']
-            labels = tab_info['labels']
-            colors = tab_info['colors']
-            fig = tab_info['fig']
-            achsen = tab_info['axes']
-            canvas = tab_info['canvas']
-
-            for ax, sensor_key in zip(achsen, chunk):
-                ax.clear()
-                einheit = self.other_sensor_conf[sensor_key]["unit"]
-                style_plot(ax, self.other_sensor_conf[sensor_key]["name"], einheit)
-
-                daten_array = self.other_sensor_data[sensor_key]
-                if len(daten_array) > 0:
-                    aktueller_wert = daten_array[-1]
-                    labels[sensor_key].config(text=f"{aktueller_wert:.2f} {einheit}")
-                    geglaettet = moving_average(daten_array)
-                    n = len(geglaettet)
-                    xs = list(self.time_data_other)[-n:]
-                    c = colors[sensor_key]
-                    ax.plot(xs, geglaettet, color=c)
-
-            fig.subplots_adjust(hspace=0.6, left=0.15, right=0.9, top=0.95, bottom=0.1)
-            canvas.draw_idle()
+        @brief Periodisches Update der sichtbaren Seite: Label mit dem Rohwert, Plot mit den geglätteten
+               Werten aus der Pyramide. Sensoren ohne neue Messwerte werden übersprungen.
+        """
+        if not self.winfo_ismapped():
+            return
+
+        for sensor_key in self.visible_sensors():
+            view = self.sensor_views[sensor_key]
+            pyramide = self.other_sensor_pyramids[sensor_key]
+            if pyramide.raw_t.total == view.last_state or len(pyramide.raw_t) == 0:
+                continue
+            view.last_state = pyramide.raw_t.total
+
+            roh = self.other_sensor_data[sensor_key]
+            if len(roh) and roh[-1] == roh[-1]:
+                view.label.config(text=f"{roh[-1]:.2f} {view.einheit}")
+            breite = max(view.canvas.get_tk_widget().winfo_width(), 100)
+            view.engine.update_series([pyramide.query(2 * breite)])
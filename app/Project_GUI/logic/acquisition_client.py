@@ -0,0 +1,222 @@
+# logic/acquisition_client.py
+"""
+@file acquisition_client.py
+@brief Client für den residenten Erfassungsdienst (acquisition_daemon.py).
+       Liest JSON-Zeilen vom Unix-Domain-Socket und übergibt jeden Datensatz an einen Callback.
+       Mit subscribe() fordert der Client nur die benötigten Sensoren an (auch nach einem Neuverbinden).
+       AgentStream liest dieselben Zeilen aus einem beliebigen Datenstrom, z.B. dem stdout-Kanal
+       eines per SSH gestarteten Agenten oder eines lokalen Ersatzprozesses (LocalAgentProcess).
+"""
+
+import json
+import socket
+import subprocess
+import threading
+import time
+
+def iter_frames(stream):
+    """
+    @fn iter_frames(stream)
+    @brief Liest JSON-Zeilen aus einem Datenstrom und liefert die dekodierten Datensätze.
+           Ungültige Zeilen werden übersprungen.
+    @param stream: iterierbarer Datenstrom (Text oder Bytes, zeilenweise)
+    @return Generator von dicts
+    """
+    for line in stream:
+        if isinstance(line, bytes):
+            line = line.decode(errors="ignore")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+class AcquisitionClient:
+    """
+    @class AcquisitionClient
+    @brief Hintergrundthread, der sich mit dem Dienst verbindet und bei Verbindungsabbruch neu verbindet.
+    """
+    def __init__(self, socket_path, on_record, retry_interval=1.0):
+        """
+        @fn __init__(socket_path, on_record, retry_interval=1.0)
+        @param socket_path: Pfad des Unix-Domain-Sockets
+        @param on_record: Funktion(record), wird für jeden empfangenen Datensatz aufgerufen
+        @param retry_interval: Wartezeit zwischen Verbindungsversuchen in Sekunden
+        """
+        self.socket_path = socket_path
+        self.on_record = on_record
+        self.retry_interval = retry_interval
+        self.running = False
+        self.connected = False
+        self.thread = None
+        self.sock = None
+        self.subscription = None
+
+    def subscribe(self, sensors):
+        """
+        @fn subscribe(sensors)
+        @brief Legt fest, welche Sensoren der Dienst für diesen Client lesen soll.
+        @param sensors: Liste von Sensornamen (aggregator.SENSOR_READERS) oder None (alle)
+        """
+        self.subscription = sensors
+        if self.connected:
+            self.send_subscription()
+
+    def send_subscription(self):
+        """
+        @fn send_subscription()
+        @brief Sendet die aktuelle Anforderung an den Dienst.
+        """
+        sock = self.sock
+        if sock is None:
+            return
+        try:
+            sock.sendall((json.dumps({"type": "subscribe", "sensors": self.subscription}) + "\n").encode())
+        except OSError:
+            pass
+
+    def start(self):
+        """
+        @fn start()
+        @brief Startet den Empfangsthread (falls noch nicht aktiv).
+        """
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        @fn run()
+        @brief Empfangsschleife: verbinden, Zeilen lesen, Datensätze weiterreichen.
+        """
+        while self.running:
+            try:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(self.socket_path)
+                self.connected = True
+                self.send_subscription()
+                with self.sock.makefile("r") as stream:
+                    for record in iter_frames(stream):
+                        if not self.running:
+                            break
+                        self.on_record(record)
+            except OSError:
+                pass
+            finally:
+                self.connected = False
+                if self.sock:
+                    self.sock.close()
+                    self.sock = None
+            if self.running:
+                time.sleep(self.retry_interval)
+
+    def stop(self):
+        """
+        @fn stop()
+        @brief Beendet den Empfangsthread und schließt die Verbindung.
+        """
+        self.running = False
+        if self.sock:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+class AgentStream:
+    """
+    @class AgentStream
+    @brief Hält den Ausgabekanal eines Agentenprozesses offen und reicht jeden Datensatz an einen Callback.
+           Über send() können JSON-Befehle an den Agenten geschickt werden.
+    """
+    def __init__(self, reader, writer=None, closer=None):
+        """
+        @fn __init__(reader, writer=None, closer=None)
+        @param reader: zeilenweise lesbarer Datenstrom (stdout des Agenten)
+        @param writer: beschreibbarer Datenstrom (stdin des Agenten) oder None
+        @param closer: Funktion, die den Agenten/Kanal beendet
+        """
+        self.reader = reader
+        self.writer = writer
+        self.closer = closer
+        self.alive = False
+        self.thread = None
+
+    def start(self, on_frame):
+        """
+        @fn start(on_frame)
+        @brief Startet den Lesethread.
+        @param on_frame: Funktion(frame)
+        """
+        self.alive = True
+
+        def run():
+            try:
+                for frame in iter_frames(self.reader):
+                    on_frame(frame)
+            except (OSError, EOFError):
+                pass
+            finally:
+                self.alive = False
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def send(self, obj):
+        """
+        @fn send(obj)
+        @brief Sendet ein Objekt als JSON-Zeile an den Agenten.
+        @param obj: JSON-serialisierbares Objekt
+        @return True bei Erfolg
+        """
+        if self.writer is None or not self.alive:
+            return False
+        try:
+            self.writer.write(json.dumps(obj) + "\n")
+            self.writer.flush()
+            return True
+        except (OSError, ValueError, EOFError):
+            return False
+
+    def close(self):
+        """
+        @fn close()
+        @brief Beendet den Agenten bzw. schließt den Kanal.
+        """
+        self.alive = False
+        if self.closer:
+            try:
+                self.closer()
+            except OSError:
+                pass
+
+class LocalAgentProcess(AgentStream):
+    """
+    @class LocalAgentProcess
+    @brief Startet den Agenten als lokalen Unterprozess; Ersatz für den entfernten Rechner (z.B. für Tests).
+    """
+    def __init__(self, command):
+        """
+        @fn __init__(command)
+        @param command: Argumentliste für subprocess.Popen, z.B. ["python", "acquisition_daemon.py", "--stdio"]
+        """
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        super().__init__(self.process.stdout, self.process.stdin, self.terminate)
+
+    def terminate(self):
+        """
+        @fn terminate()
+        @brief Beendet den Unterprozess.
+        """
+        if self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(timeout=5)
@@ -0,0 +1,181 @@
+# logic/airflow.py
+"""
+@file airflow.py
+@brief Strömungsgeschwindigkeit aus dem Differenzdruck einer Pitot-/Prandtl-Sonde (SDP810).
+       v = k * sqrt(2 * Δp / ρ) mit der Dichte feuchter Luft aus BME280-Temperatur, -Druck und -Feuchte
+       (ρ = p_d / (R_d * T) + p_v / (R_v * T), Sättigungsdampfdruck nach Magnus).
+       Alle Funktionen arbeiten mit Skalaren und ganzen NumPy-Arrays (Live-Fenster, aufgezeichnete
+       Sitzungen aus logic.session_recorder.load_session()). AirflowEstimator ergänzt im Live-Betrieb
+       jeden Datensatz mit SDP810-Wert um das Feld "air_velocity" (m/s).
+       "python -m logic.airflow SITZUNG" berechnet die Geschwindigkeit einer aufgezeichneten Sitzung neu
+       (z.B. mit einem anderen Sondenbeiwert) und schreibt sie als CSV-Datei.
+"""
+
+import argparse
+
+import numpy as np
+
+from config.settings import load_settings
+from logic.session_recorder import load_session
+
+R_DRY     = 287.058   # spezifische Gaskonstante trockener Luft in J/(kg·K)
+R_VAPOR   = 461.495   # spezifische Gaskonstante von Wasserdampf in J/(kg·K)
+ZERO_C    = 273.15
+STANDARD_DENSITY = 1.2041  # trockene Luft bei 20 °C und 1013.25 hPa in kg/m³
+
+def saturation_vapor_pressure(temp_c):
+    """
+    @fn saturation_vapor_pressure(temp_c)
+    @brief Sättigungsdampfdruck über Wasser (Magnus-Formel, Koeffizienten nach Alduchov/Eskridge).
+    @param temp_c: Temperatur in °C (Skalar oder Array)
+    @return Pa
+    """
+    temp_c = np.asarray(temp_c, dtype=float)
+    return 610.94 * np.exp(17.625 * temp_c / (temp_c + 243.04))
+
+def air_density(temp_c, pressure_hpa, humidity=0.0):
+    """
+    @fn air_density(temp_c, pressure_hpa, humidity=0.0)
+    @brief Dichte feuchter Luft.
+    @param temp_c: Temperatur in °C
+    @param pressure_hpa: Absolutdruck in hPa
+    @param humidity: relative Feuchte in % (0..100)
+    @return kg/m³ (Skalar oder Array, je nach Eingabe)
+    """
+    temp_k = np.asarray(temp_c, dtype=float) + ZERO_C
+    p_v = np.clip(np.asarray(humidity, dtype=float), 0.0, 100.0) / 100.0 * saturation_vapor_pressure(temp_c)
+    p_d = np.asarray(pressure_hpa, dtype=float) * 100.0 - p_v
+    rho = p_d / (R_DRY * temp_k) + p_v / (R_VAPOR * temp_k)
+    return rho if rho.ndim else float(rho)
+
+def pitot_velocity(dp_pa, density=STANDARD_DENSITY, probe_factor=1.0, deadband=0.0):
+    """
+    @fn pitot_velocity(dp_pa, density=STANDARD_DENSITY, probe_factor=1.0, deadband=0.0)
+    @brief Strömungsgeschwindigkeit aus dem Differenzdruck (Staudruck). Differenzdrücke unterhalb
+           von deadband (Nullpunktrauschen) und negative Werte ergeben 0.
+    @param dp_pa: Differenzdruck in Pa
+    @param density: Luftdichte in kg/m³ (Skalar oder Array gleicher Länge)
+    @param probe_factor: Sondenbeiwert k (Prandtl-Rohr ≈ 1.0)
+    @param deadband: Totband in Pa
+    @return m/s (Skalar oder Array; NaN bleibt NaN)
+    """
+    dp = np.asarray(dp_pa, dtype=float)
+    with np.errstate(invalid="ignore"):
+        dp = np.where(dp > deadband, dp, np.where(np.isnan(dp), np.nan, 0.0))
+        v = probe_factor * np.sqrt(2.0 * dp / np.asarray(density, dtype=float))
+    return v if v.ndim else float(v)
+
+def velocity_series(t_dp, dp_pa, t_air, temp_c, pressure_hpa, humidity, probe_factor=1.0, deadband=0.0):
+    """
+    @fn velocity_series(t_dp, dp_pa, t_air, temp_c, pressure_hpa, humidity, probe_factor=1.0, deadband=0.0)
+    @brief Geschwindigkeit einer ganzen Messreihe: die Luftdichte wird aus den (meist selteneren)
+           BME280-Werten berechnet und linear auf die Zeitstempel des Differenzdrucks interpoliert.
+           Ohne gültige BME280-Werte wird STANDARD_DENSITY verwendet.
+    @param t_dp: Zeitstempel der Differenzdrücke
+    @param dp_pa: Differenzdrücke in Pa
+    @param t_air: Zeitstempel der BME280-Werte
+    @param temp_c: Temperaturen in °C
+    @param pressure_hpa: Drücke in hPa
+    @param humidity: relative Feuchten in %
+    @return np.ndarray in m/s (Länge von dp_pa)
+    """
+    t_air = np.asarray(t_air, dtype=float)
+    rho = air_density(temp_c, pressure_hpa, humidity) * np.ones_like(t_air)
+    gueltig = ~np.isnan(rho) & ~np.isnan(t_air)
+    if gueltig.any():
+        density = np.interp(np.asarray(t_dp, dtype=float), t_air[gueltig], rho[gueltig])
+    else:
+        density = STANDARD_DENSITY
+    return np.atleast_1d(pitot_velocity(dp_pa, density, probe_factor, deadband))
+
+def session_velocity(sensors, probe_factor=1.0, deadband=0.0, dp_key="SDP_Pressure",
+                     temp_key="BME_Temperature", pressure_key="BME_Pressure", humidity_key="BME_Humidity"):
+    """
+    @fn session_velocity(sensors, probe_factor=1.0, deadband=0.0, dp_key=..., temp_key=..., pressure_key=..., humidity_key=...)
+    @brief Berechnet die Geschwindigkeit nachträglich für den Strom "sensors" einer aufgezeichneten Sitzung.
+           Zeilen ohne Differenzdruck bleiben NaN; fehlt die Feuchte, wird trockene Luft angenommen.
+    @param sensors: dict {Spalte: np.ndarray} aus load_session()[1]["sensors"]
+    @return np.ndarray in m/s (eine Zeile je Datensatz)
+    """
+    t = sensors["t"]
+    dp = sensors[dp_key]
+    temp = sensors.get(temp_key, np.full_like(t, np.nan))
+    pres = sensors.get(pressure_key, np.full_like(t, np.nan))
+    hum = sensors.get(humidity_key, np.zeros_like(t))
+    hum = np.where(np.isnan(hum), 0.0, hum)
+    return velocity_series(t, dp, t, temp, pres, hum, probe_factor, deadband)
+
+class AirflowEstimator:
+    """
+    @class AirflowEstimator
+    @brief Live-Berechnung: merkt sich die zuletzt gemessene Luftdichte und ergänzt Datensätze mit
+           Differenzdruck ("sdp_pressure") um "air_velocity".
+    """
+    def __init__(self, probe_factor=1.0, deadband=0.0):
+        """
+        @fn __init__(probe_factor=1.0, deadband=0.0)
+        @param probe_factor: Sondenbeiwert k
+        @param deadband: Totband in Pa
+        """
+        self.probe_factor = float(probe_factor)
+        self.deadband = float(deadband)
+        self.density = STANDARD_DENSITY
+
+    def update_air(self, temp_c, pressure_hpa, humidity=None):
+        """
+        @fn update_air(temp_c, pressure_hpa, humidity=None)
+        @brief Übernimmt neue BME280-Werte (ohne Feuchte: trockene Luft).
+        """
+        rho = air_density(temp_c, pressure_hpa, 0.0 if humidity is None else humidity)
+        if np.isfinite(rho):
+            self.density = rho
+
+    def velocity(self, dp_pa):
+        """
+        @fn velocity(dp_pa)
+        @brief Geschwindigkeit zu einem oder mehreren Differenzdrücken mit der aktuellen Dichte.
+        @return m/s (Skalar oder Array)
+        """
+        return pitot_velocity(dp_pa, self.density, self.probe_factor, self.deadband)
+
+    def augment(self, values):
+        """
+        @fn augment(values)
+        @brief Aktualisiert die Dichte aus "bme_temp"/"bme_pres"/"bme_hum" und ergänzt "air_velocity".
+        @param values: dict {feld: wert} eines Datensatzes
+        @return dict (Kopie, nur verändert, wenn etwas ergänzt wurde)
+        """
+        if values.get("bme_temp") is not None and values.get("bme_pres") is not None:
+            self.update_air(values["bme_temp"], values["bme_pres"], values.get("bme_hum"))
+        if values.get("sdp_pressure") is None:
+            return values
+        return dict(values, air_velocity=self.velocity(values["sdp_pressure"]))
+
+def main():
+    """
+    @fn main()
+    @brief Berechnet die Luftgeschwindigkeit einer aufgezeichneten Sitzung neu und schreibt sie als CSV.
+           Sondenbeiwert und Totband kommen aus settings["airflow"], sofern nicht angegeben.
+    """
+    parser = argparse.ArgumentParser(description="Luftgeschwindigkeit einer aufgezeichneten Sitzung berechnen")
+    parser.add_argument("session", help="Sitzungsverzeichnis (siehe logic/session_recorder.py)")
+    parser.add_argument("--probe-factor", type=float, default=None, help="Sondenbeiwert k")
+    parser.add_argument("--deadband", type=float, default=None, help="Totband in Pa")
+    parser.add_argument("--output", default=None, help="Zieldatei (Standard: <Sitzung>_airflow.csv)")
+    args = parser.parse_args()
+
+    conf = load_settings()["airflow"]
+    probe_factor = conf["probe_factor"] if args.probe_factor is None else args.probe_factor
+    deadband = conf["deadband"] if args.deadband is None else args.deadband
+    _, data = load_session(args.session)
+    sensors = data["sensors"]
+    v = session_velocity(sensors, probe_factor, deadband)
+
+    ziel = args.output or args.session.rstrip("/") + "_airflow.csv"
+    np.savetxt(ziel, np.column_stack([sensors["t_unix"], sensors["t"], sensors["SDP_Pressure"], v]),
+               fmt=["%.3f", "%.2f", "%.3f", "%.3f"], delimiter=",", comments="",
+               header="Unix-Zeit,Zeit (s),SDP810 Druck (Pa),Luftgeschwindigkeit (m/s)")
+    print(f"{np.count_nonzero(~np.isnan(v))} Werte nach {ziel} geschrieben.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# logic/autotune.py
+"""
+@file autotune.py
+@brief Selbsteinstellung des PID-Reglers per Relais-Versuch nach Åström–Hägglund.
+       Statt des PID-Reglers schaltet ein Relais mit Hysterese die Heizung um den Sollwert
+       zwischen bias+amplitude und bias-amplitude. Die Temperatur schwingt dann mit der
+       kritischen Periode Tu; aus der Schwingungsamplitude a folgt die kritische Verstärkung
+       Ku = 4*d / (π*sqrt(a² - ε²)). Daraus werden mit einer Einstellregel die PID-Parameter
+       (kp, ki, kd in der Parallelform von PIDLaw) berechnet.
+       RelayAutotuneLaw ist ein ControlLaw und wird von AutotuneSession für die Dauer des Versuchs
+       im TemperatureController anstelle des PID-Reglers eingesetzt; die ermittelten Parameter
+       werden mit save_tuned_gains() in settings.json übernommen.
+"""
+
+import math
+
+from config.settings import load_settings, save_settings
+from logic.temperature_controller import ControlLaw, PIDLaw
+
+# Einstellregeln: kp = a*Ku, Ti = b*Tu, Td = c*Tu
+TUNING_RULES = {
+    "ziegler_nichols": (0.6, 0.5, 0.125),
+    "tyreus_luyben":   (1 / 2.2, 2.2, 1 / 6.3),
+    "some_overshoot":  (0.33, 0.5, 1 / 3),
+    "no_overshoot":    (0.2, 0.5, 1 / 3),
+}
+
+def pid_gains(ku, tu, rule="ziegler_nichols"):
+    """
+    @fn pid_gains(ku, tu, rule="ziegler_nichols")
+    @brief Berechnet PID-Parameter aus kritischer Verstärkung und Periode.
+    @param ku: kritische Verstärkung (1/°C)
+    @param tu: kritische Periode in Sekunden
+    @param rule: Name der Einstellregel (siehe TUNING_RULES)
+    @return dict {"kp", "ki", "kd"}
+    """
+    if rule not in TUNING_RULES:
+        raise ValueError(f"Unbekannte Einstellregel: {rule}")
+    a, b, c = TUNING_RULES[rule]
+    kp = a * ku
+    return {"kp": kp, "ki": kp / (b * tu), "kd": kp * c * tu}
+
+class RelayAutotuneLaw(ControlLaw):
+    """
+    @class RelayAutotuneLaw
+    @brief Relais-Versuch als Regelgesetz. Nach Abschluss ist done gesetzt und result enthält
+           Ku, Tu, Amplitude und die berechneten Parameter (bzw. error bei einem Fehlschlag).
+    """
+    def __init__(self, amplitude=0.5, bias=0.5, hysteresis=0.2, cycles=3, max_duration=3600.0,
+                 rule="ziegler_nichols"):
+        """
+        @fn __init__(amplitude, bias, hysteresis, cycles, max_duration, rule)
+        @param amplitude: Relaisamplitude d (Anteil der Heizleistung)
+        @param bias: Mittelwert der Stellgröße
+        @param hysteresis: Hysterese ε des Relais in °C (größer als das Messrauschen wählen)
+        @param cycles: Anzahl ausgewerteter Schwingungen (die erste wird als Einschwingen verworfen)
+        @param max_duration: Abbruch nach dieser Zeit in Sekunden
+        @param rule: Einstellregel (siehe TUNING_RULES)
+        """
+        if rule not in TUNING_RULES:
+            raise ValueError(f"Unbekannte Einstellregel: {rule}")
+        if int(cycles) < 1:
+            raise ValueError(f"Mindestens eine ausgewertete Schwingung nötig (cycles={cycles})")
+        self.amplitude = float(amplitude)
+        self.bias = float(bias)
+        self.hysteresis = float(hysteresis)
+        self.cycles = int(cycles)
+        self.max_duration = float(max_duration)
+        self.rule = rule
+        self.reset()
+
+    def reset(self):
+        self.elapsed = 0.0
+        self.high = True
+        self.switch_times = []   # Zeitpunkte der Umschaltung auf "hoch"
+        self.peaks = []          # (Maximum, Minimum) je vollständiger Schwingung
+        self.cycle_max = -math.inf
+        self.cycle_min = math.inf
+        self.done = False
+        self.result = None
+
+    @property
+    def progress(self):
+        """
+        @property progress
+        @return Anzahl abgeschlossener Schwingungen (einschließlich der verworfenen ersten)
+        """
+        return len(self.peaks)
+
+    def update(self, setpoint, measurement, dt):
+        if self.done:
+            return 0.0
+        self.elapsed += dt
+        if self.elapsed > self.max_duration:
+            self.finish(error=f"keine stabile Schwingung nach {self.max_duration:.0f} s")
+            return 0.0
+
+        self.cycle_max = max(self.cycle_max, measurement)
+        self.cycle_min = min(self.cycle_min, measurement)
+
+        if self.high and measurement > setpoint + self.hysteresis:
+            self.high = False
+        elif not self.high and measurement < setpoint - self.hysteresis:
+            self.high = True
+            if self.switch_times:
+                self.peaks.append((self.cycle_max, self.cycle_min))
+            self.switch_times.append(self.elapsed)
+            self.cycle_max = -math.inf
+            self.cycle_min = math.inf
+            if len(self.peaks) > self.cycles:
+                self.finish()
+                return 0.0
+
+        return self.bias + self.amplitude if self.high else self.bias - self.amplitude
+
+    def finish(self, error=None):
+        """
+        @fn finish(error=None)
+        @brief Beendet den Versuch und wertet die Schwingungen aus.
+        @param error: Fehlermeldung bei Abbruch
+        """
+        self.done = True
+        if error is not None:
+            self.result = {"error": error}
+            return
+
+        perioden = [b - a for a, b in zip(self.switch_times[1:-1], self.switch_times[2:])]
+        amplituden = [(hi - lo) / 2 for hi, lo in self.peaks[1:]]
+        tu = sum(perioden) / len(perioden)
+        a = sum(amplituden) / len(amplituden)
+        if a <= self.hysteresis:
+            self.result = {"error": "Schwingungsamplitude kleiner als die Relais-Hysterese"}
+            return
+        ku = 4 * self.amplitude / (math.pi * math.sqrt(a * a - self.hysteresis ** 2))
+        self.result = {"ku": ku, "tu": tu, "amplitude": a, "rule": self.rule,
+                       "gains": pid_gains(ku, tu, self.rule)}
+
+class AutotuneSession:
+    """
+    @class AutotuneSession
+    @brief Führt einen Relais-Versuch mit einem bestehenden TemperatureController durch und setzt
+           danach einen PID-Regler mit den ermittelten Parametern ein (bei Fehlschlag oder Abbruch
+           wieder das vorherige Regelgesetz).
+    """
+    def __init__(self, controller, setpoint, conf=None):
+        """
+        @fn __init__(controller, setpoint, conf=None)
+        @param controller: TemperatureController
+        @param setpoint: Solltemperatur des Versuchs in °C
+        @param conf: Parameter von RelayAutotuneLaw (z.B. settings["autotune"])
+        """
+        self.controller = controller
+        self.previous_law = controller.law
+        self.tuner = RelayAutotuneLaw(**(conf or {}))
+        controller.set_target_temperature(None)
+        controller.law = self.tuner
+        controller.set_target_temperature(setpoint)
+
+    def poll(self):
+        """
+        @fn poll()
+        @brief Nach jedem Regelzyklus aufrufen.
+        @return None, solange der Versuch läuft, sonst das Ergebnis (dict mit "gains" oder "error")
+        """
+        if not self.tuner.done:
+            return None
+        result = self.tuner.result
+        if "gains" in result:
+            params = {}
+            if isinstance(self.previous_law, PIDLaw):
+                params = {"d_filter": self.previous_law.d_filter,
+                          "setpoint_weight": self.previous_law.setpoint_weight}
+            self.controller.law = PIDLaw(**params, **result["gains"])
+        else:
+            self.controller.law = self.previous_law
+        self.controller.law.reset()
+        return result
+
+    def abort(self):
+        """
+        @fn abort()
+        @brief Bricht den Versuch ab und stellt das vorherige Regelgesetz wieder her.
+        """
+        self.controller.law = self.previous_law
+        self.controller.set_target_temperature(None)
+
+def save_tuned_gains(gains):
+    """
+    @fn save_tuned_gains(gains)
+    @brief Übernimmt die ermittelten Parameter in settings.json (frisch geladen, damit zwischenzeitlich
+           gespeicherte Einstellungen erhalten bleiben) und wählt das PID-Regelgesetz.
+    @param gains: dict {"kp", "ki", "kd"}
+    @return aktualisierte Einstellungen
+    """
+    settings = load_settings()
+    regelung = settings["heater_control"]
+    regelung["law"] = "pid"
+    regelung.setdefault("pid", {}).update({k: round(v, 6) for k, v in gains.items()})
+    save_settings(settings)
+    return settings
@@ -1,24 +1,12 @@
 # logic/data_processing.py
 """
 @file data_processing.py
-@brief Enthält Hilfsfunktionen zur Datenverarbeitung und zum Plot-Layout (Styling).
+@brief Enthält Hilfsfunktionen zum Plot-Layout (Styling).
+       Die Glättung der Messreihen erfolgt fortlaufend in logic/filters.py.
 """
 
-import numpy as np
 from config.settings import THEME_COLORS
 
-def moving_average(daten, fenster=5):
-    """
-    @fn moving_average(daten, fenster)
-    @brief Berechnet den gleitenden Mittelwert über das angegebene Fenster.
-    @param daten: Array oder Liste von Werten
-    @param fenster: Größe des Mittelwertfensters
-    @return Liste mit gemittelten Werten
-    """
-    if len(daten) < fenster:
-        return list(daten)
-    return np.convolve(daten, np.ones(fenster)/fenster, mode='valid')
-
 def style_plot(ax, y_label, einheit):
     """
     @fn style_plot(ax, y_label, einheit)
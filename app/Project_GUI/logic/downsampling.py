@@ -0,0 +1,157 @@
+# logic/downsampling.py
+"""
+@file downsampling.py
+@brief Reduziert lange Messreihen vor dem Plotten auf etwa die Pixelbreite der Zeichenfläche.
+       MinMaxPyramid hält mehrere Auflösungsstufen (Min/Max je Block) und wird mit jedem Messwert
+       inkrementell fortgeschrieben; eine Abfrage kostet damit unabhängig von der Laufzeit etwa
+       gleich viel.
+"""
+
+import threading
+
+import numpy as np
+
+from logic.ring_buffer import RingBuffer
+
+class MinMaxPyramid:
+    """
+    @class MinMaxPyramid
+    @brief Mehrstufige Min/Max-Zusammenfassung einer Messreihe.
+           Stufe 0 enthält Rohwerte, Stufe k Blöcke aus factor**k Rohwerten (je Min und Max mit Zeitpunkt).
+           Jede Stufe ist ein Ringpuffer fester Länge; grobe Stufen decken daher sehr lange Zeiträume ab.
+    """
+    def __init__(self, factor=4, levels=8, level_capacity=4096):
+        """
+        @fn __init__(factor=4, levels=8, level_capacity=4096)
+        @param factor: Anzahl Blöcke einer Stufe, die einen Block der nächsten Stufe bilden
+        @param levels: Anzahl Stufen (inklusive Rohwerten)
+        @param level_capacity: Anzahl Einträge je Stufe
+        """
+        self.factor = factor
+        self.lock = threading.RLock()
+        self.raw_t = RingBuffer(level_capacity, self.lock)
+        self.raw_y = RingBuffer(level_capacity, self.lock)
+        # Stufen 1..levels-1: Ringpuffer für (t_lo, lo, t_hi, hi)
+        self.levels = [
+            [RingBuffer(level_capacity, self.lock) for _ in range(4)]
+            for _ in range(levels - 1)
+        ]
+        # Noch nicht abgeschlossener Block je Stufe: [Anzahl, t_lo, lo, t_hi, hi]
+        self.pending = [[0, 0.0, np.inf, 0.0, -np.inf] for _ in range(levels - 1)]
+
+    def clear(self):
+        """
+        @fn clear()
+        @brief Verwirft alle Stufen.
+        """
+        with self.lock:
+            self.raw_t.clear()
+            self.raw_y.clear()
+            for level in self.levels:
+                for buf in level:
+                    buf.clear()
+            self.pending = [[0, 0.0, np.inf, 0.0, -np.inf] for _ in self.pending]
+
+    def append(self, t, y):
+        """
+        @fn append(t, y)
+        @brief Schreibt einen Messwert fort (NaN wird ignoriert). Amortisiert O(1).
+        @param t: Zeitwert
+        @param y: Messwert
+        """
+        if y != y:
+            return
+        with self.lock:
+            self.raw_t.append(t)
+            self.raw_y.append(y)
+            self._push(0, t, y, t, y)
+
+    def extend(self, t, y):
+        """
+        @fn extend(t, y)
+        @brief Schreibt mehrere Messwerte fort.
+        """
+        with self.lock:
+            for ti, yi in zip(np.asarray(t, dtype=float), np.asarray(y, dtype=float)):
+                self.append(ti, yi)
+
+    def _push(self, k, t_lo, lo, t_hi, hi):
+        """
+        @fn _push(k, t_lo, lo, t_hi, hi)
+        @brief Nimmt einen Block der Stufe k in den offenen Block der Stufe k+1 auf.
+        """
+        if k >= len(self.pending):
+            return
+        p = self.pending[k]
+        if lo < p[2]:
+            p[1], p[2] = t_lo, lo
+        if hi > p[4]:
+            p[3], p[4] = t_hi, hi
+        p[0] += 1
+        if p[0] < self.factor:
+            return
+
+        for buf, val in zip(self.levels[k], p[1:]):
+            buf.append(val)
+        self.pending[k] = [0, 0.0, np.inf, 0.0, -np.inf]
+        self._push(k + 1, *p[1:])
+
+    def _level_data(self, k):
+        """
+        @fn _level_data(k)
+        @brief Zeit- und Wertepunkte der Stufe k (Min/Max zeitlich geordnet, offene Blöcke angehängt).
+        @return Tupel (x, y)
+        """
+        if k == 0 or len(self.raw_t) == 0:
+            return self.raw_t.snapshot(), self.raw_y.snapshot()
+
+        t_lo, lo, t_hi, hi = (buf.snapshot() for buf in self.levels[k - 1])
+        # offene Blöcke dieser und feinerer Stufen enthalten die jüngsten Werte
+        tail = [p for p in reversed(self.pending[:k]) if p[0] > 0]
+        if tail:
+            t_lo = np.concatenate([t_lo, [p[1] for p in tail]])
+            lo   = np.concatenate([lo,   [p[2] for p in tail]])
+            t_hi = np.concatenate([t_hi, [p[3] for p in tail]])
+            hi   = np.concatenate([hi,   [p[4] for p in tail]])
+
+        first_lo = t_lo <= t_hi
+        x = np.empty(2 * len(lo) + 1)
+        y = np.empty(2 * len(lo) + 1)
+        x[0:-1:2] = np.where(first_lo, t_lo, t_hi)
+        y[0:-1:2] = np.where(first_lo, lo, hi)
+        x[1:-1:2] = np.where(first_lo, t_hi, t_lo)
+        y[1:-1:2] = np.where(first_lo, hi, lo)
+        # der jüngste Rohwert schließt die Kurve am rechten Rand ab
+        x[-1], y[-1] = self.raw_t[-1], self.raw_y[-1]
+        return x, y
+
+    def _covers(self, k, t_start):
+        """
+        @fn _covers(k, t_start)
+        @brief Prüft, ob Stufe k noch alle Werte ab t_start enthält (keine überschriebenen Einträge).
+        """
+        buf = self.raw_t if k == 0 else self.levels[k - 1][0]
+        if buf.total <= buf.capacity:
+            return True
+        return t_start is not None and len(buf) > 0 and buf[0] <= t_start
+
+    def query(self, max_points, t_start=None):
+        """
+        @fn query(max_points, t_start=None)
+        @brief Liefert die feinste Stufe, die den Zeitraum ab t_start (None => gesamte Historie)
+               vollständig abdeckt und dabei höchstens max_points Punkte umfasst.
+        @param max_points: Punktbudget, typischerweise die Pixelbreite der Achse
+        @param t_start: Beginn des Zeitfensters oder None
+        @return Tupel (x, y) als np.ndarray
+        """
+        with self.lock:
+            for k in range(len(self.levels) + 1):
+                if not self._covers(k, t_start):
+                    continue
+                x, y = self._level_data(k)
+                if t_start is not None:
+                    keep = x >= t_start
+                    x, y = x[keep], y[keep]
+                if len(x) <= max_points or k == len(self.levels):
+                    return x, y
+            return self._level_data(len(self.levels))
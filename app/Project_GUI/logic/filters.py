@@ -0,0 +1,174 @@
+# logic/filters.py
+"""
+@file filters.py
+@brief Zustandsbehaftete Glättungsfilter für einzelne Messwerte (Streaming).
+       Jeder Filter liefert pro Eingangswert genau einen Ausgangswert, die Ausgabe passt also
+       ohne Kürzen zu den Zeitstempeln der Eingabe (kausal: nur aktuelle und frühere Werte).
+       NaN-Eingaben werden durchgereicht, ohne den Filterzustand zu verändern.
+       Konfiguration je Sensor über create_filter(), z.B. {"type": "median", "window": 5}.
+"""
+
+import bisect
+import math
+from collections import deque
+
+import numpy as np
+
+class StreamFilter:
+    """
+    @class StreamFilter
+    @brief Basisklasse: ohne Glättung (Durchreichen).
+    """
+    def update(self, value):
+        """
+        @fn update(value)
+        @brief Verarbeitet einen neuen Messwert.
+        @param value: float (NaN => kein Messwert)
+        @return geglätteter Wert
+        """
+        return value
+
+    def process(self, values):
+        """
+        @fn process(values)
+        @brief Verarbeitet mehrere Messwerte nacheinander.
+        @param values: Array-ähnliche Werte
+        @return np.ndarray gleicher Länge
+        """
+        return np.array([self.update(float(v)) for v in values], dtype=float)
+
+    def reset(self):
+        """
+        @fn reset()
+        @brief Verwirft den Filterzustand.
+        """
+
+class MovingAverageFilter(StreamFilter):
+    """
+    @class MovingAverageFilter
+    @brief Gleitender Mittelwert über die letzten window Werte mit laufender Summe (O(1) je Wert).
+           Bis das Fenster gefüllt ist, wird über die vorhandenen Werte gemittelt.
+    """
+    def __init__(self, window=5):
+        self.window = int(window)
+        self.values = deque()
+        self.total = 0.0
+
+    def update(self, value):
+        if math.isnan(value):
+            return value
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+        return self.total / len(self.values)
+
+    def reset(self):
+        self.values.clear()
+        self.total = 0.0
+
+class EMAFilter(StreamFilter):
+    """
+    @class EMAFilter
+    @brief Exponentiell gleitender Mittelwert (O(1) je Wert): y += alpha * (x - y).
+    """
+    def __init__(self, alpha=0.3):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha muss in (0, 1] liegen.")
+        self.alpha = float(alpha)
+        self.state = None
+
+    def update(self, value):
+        if math.isnan(value):
+            return value
+        if self.state is None:
+            self.state = value
+        else:
+            self.state += self.alpha * (value - self.state)
+        return self.state
+
+    def reset(self):
+        self.state = None
+
+class MedianFilter(StreamFilter):
+    """
+    @class MedianFilter
+    @brief Gleitender Median über die letzten window Werte. Eine sortierte Liste wird per
+           Einfügen/Entfernen fortgeschrieben (O(window) je Wert). Unterdrückt einzelne Ausreißer.
+    """
+    def __init__(self, window=5):
+        self.window = int(window)
+        self.values = deque()
+        self.sorted = []
+
+    def update(self, value):
+        if math.isnan(value):
+            return value
+        self.values.append(value)
+        bisect.insort(self.sorted, value)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            del self.sorted[bisect.bisect_left(self.sorted, old)]
+        n = len(self.sorted)
+        mid = n // 2
+        if n % 2:
+            return self.sorted[mid]
+        return 0.5 * (self.sorted[mid - 1] + self.sorted[mid])
+
+    def reset(self):
+        self.values.clear()
+        self.sorted = []
+
+class SavitzkyGolayFilter(StreamFilter):
+    """
+    @class SavitzkyGolayFilter
+    @brief Kausaler Savitzky-Golay-Filter: Polynom vom Grad order über die letzten window Werte,
+           ausgewertet am jüngsten Punkt. Die Gewichte werden einmalig berechnet (O(window) je Wert).
+           Erhält Anstiege und Spitzen besser als der gleitende Mittelwert.
+    """
+    def __init__(self, window=7, order=2):
+        if order >= window:
+            raise ValueError("order muss kleiner als window sein.")
+        self.window = int(window)
+        self.order = int(order)
+        self.values = deque(maxlen=self.window)
+        z = np.arange(-self.window + 1, 1, dtype=float)
+        vander = np.vander(z, self.order + 1, increasing=True)
+        self.coeffs = np.linalg.pinv(vander)[0]
+        self.warmup = MovingAverageFilter(self.window)
+
+    def update(self, value):
+        if math.isnan(value):
+            return value
+        self.values.append(value)
+        warm = self.warmup.update(value)
+        if len(self.values) < self.window:
+            return warm
+        return float(np.dot(self.coeffs, self.values))
+
+    def reset(self):
+        self.values.clear()
+        self.warmup.reset()
+
+FILTER_TYPES = {
+    "none": StreamFilter,
+    "moving_average": MovingAverageFilter,
+    "ema": EMAFilter,
+    "median": MedianFilter,
+    "savgol": SavitzkyGolayFilter,
+}
+
+def create_filter(conf):
+    """
+    @fn create_filter(conf)
+    @brief Erzeugt einen Filter aus einer Sensor-Konfiguration.
+    @param conf: dict {"type": ..., weitere Parameter} oder None (=> keine Glättung)
+    @return StreamFilter
+    """
+    if not conf:
+        return StreamFilter()
+    params = dict(conf)
+    typ = params.pop("type", "none")
+    if typ not in FILTER_TYPES:
+        raise ValueError(f"Unbekannter Filtertyp: {typ}")
+    return FILTER_TYPES[typ](**params)
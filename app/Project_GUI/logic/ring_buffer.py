@@ -0,0 +1,187 @@
+# logic/ring_buffer.py
+"""
+@file ring_buffer.py
+@brief Ringpuffer fester Kapazität auf Basis vorallokierter NumPy-Arrays (float64).
+       Jeder Wert wird doppelt abgelegt (Position i und i + Kapazität), dadurch ist der
+       Pufferinhalt immer ein zusammenhängender Ausschnitt und view() kostet O(1) ohne Kopie.
+       Die Schnittstelle entspricht dem in der GUI genutzten Teil von collections.deque
+       (append, len, [-1], Iteration), sodass die Puffer die bisherigen deques ersetzen.
+"""
+
+import threading
+
+import numpy as np
+
+class RingBuffer:
+    """
+    @class RingBuffer
+    @brief Eine Messreihe mit fester Kapazität; ältere Werte werden überschrieben.
+    """
+    def __init__(self, capacity, lock=None):
+        """
+        @fn __init__(capacity, lock=None)
+        @param capacity: maximale Anzahl gespeicherter Werte
+        @param lock: gemeinsamer (reentranter) Lock, z.B. von SampleBuffer; None => eigener Lock
+        """
+        if capacity <= 0:
+            raise ValueError("Kapazität muss positiv sein.")
+        self.capacity = int(capacity)
+        self.lock = lock if lock is not None else threading.RLock()
+        self._data = np.full(2 * self.capacity, np.nan)
+        self._start = 0
+        self._len = 0
+        self.total = 0  # Anzahl aller jemals angehängten Werte (zur Erkennung neuer Daten)
+
+    def append(self, value):
+        """
+        @fn append(value)
+        @brief Hängt einen Wert an (überschreibt bei voller Kapazität den ältesten).
+        @param value: Zahlenwert
+        """
+        with self.lock:
+            end = (self._start + self._len) % self.capacity
+            self._data[end] = value
+            self._data[end + self.capacity] = value
+            if self._len < self.capacity:
+                self._len += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+            self.total += 1
+
+    def extend(self, values):
+        """
+        @fn extend(values)
+        @brief Hängt mehrere Werte in einem Schritt an.
+        @param values: Array-ähnliche Werte
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        with self.lock:
+            self.total += values.size
+            if values.size >= self.capacity:
+                values = values[-self.capacity:]
+                self._data[:self.capacity] = values
+                self._data[self.capacity:] = values
+                self._start, self._len = 0, self.capacity
+                return
+
+            n = values.size
+            end = (self._start + self._len) % self.capacity
+            first = min(n, self.capacity - end)
+            self._data[end:end + first] = values[:first]
+            self._data[end + self.capacity:end + self.capacity + first] = values[:first]
+            rest = n - first
+            if rest:
+                self._data[:rest] = values[first:]
+                self._data[self.capacity:self.capacity + rest] = values[first:]
+
+            overflow = max(self._len + n - self.capacity, 0)
+            self._len = min(self._len + n, self.capacity)
+            self._start = (self._start + overflow) % self.capacity
+
+    def clear(self):
+        """
+        @fn clear()
+        @brief Entfernt alle Werte.
+        """
+        with self.lock:
+            self._start = 0
+            self._len = 0
+
+    def view(self):
+        """
+        @fn view()
+        @brief Schreibgeschützter, zusammenhängender Ausschnitt über den aktuellen Inhalt (ohne Kopie).
+               Gleichzeitiges Anhängen kann den Ausschnitt verändern; für Schnappschüsse snapshot() nutzen.
+        @return np.ndarray
+        """
+        v = self._data[self._start:self._start + self._len]
+        v.flags.writeable = False
+        return v
+
+    def snapshot(self):
+        """
+        @fn snapshot()
+        @brief Konsistente Kopie des aktuellen Inhalts.
+        @return np.ndarray
+        """
+        with self.lock:
+            return self.view().copy()
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view()[index]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("RingBuffer-Index außerhalb des Bereichs")
+        return float(self._data[self._start + index])
+
+    def __iter__(self):
+        return iter(self.snapshot().tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.snapshot()
+        return arr if dtype is None else arr.astype(dtype)
+
+class SampleBuffer:
+    """
+    @class SampleBuffer
+    @brief Mehrere Kanäle mit gemeinsamer Zeitachse. Alle Kanäle werden bei jedem Datensatz
+           fortgeschrieben (fehlende Werte als NaN), damit Zeit und Werte gleich lang bleiben.
+    """
+    def __init__(self, channels, capacity):
+        """
+        @fn __init__(channels, capacity)
+        @param channels: Liste der Kanalnamen
+        @param capacity: Kapazität je Kanal
+        """
+        self.lock = threading.RLock()
+        self.capacity = int(capacity)
+        self.time = RingBuffer(capacity, self.lock)
+        self.channels = {name: RingBuffer(capacity, self.lock) for name in channels}
+
+    def append(self, t, values):
+        """
+        @fn append(t, values)
+        @brief Hängt einen Datensatz an.
+        @param t: Zeitwert
+        @param values: dict {Kanal: Wert}; fehlende Kanäle werden mit NaN aufgefüllt
+        """
+        with self.lock:
+            self.time.append(t)
+            for name, buf in self.channels.items():
+                val = values.get(name)
+                buf.append(np.nan if val is None else val)
+
+    def extend(self, t, values):
+        """
+        @fn extend(t, values)
+        @brief Hängt mehrere Datensätze an.
+        @param t: Array der Zeitwerte
+        @param values: dict {Kanal: Array gleicher Länge}; fehlende Kanäle => NaN
+        """
+        t = np.asarray(t, dtype=float)
+        with self.lock:
+            self.time.extend(t)
+            for name, buf in self.channels.items():
+                vals = values.get(name)
+                buf.extend(np.full(t.size, np.nan) if vals is None else vals)
+
+    def snapshot(self, names=None):
+        """
+        @fn snapshot(names=None)
+        @brief Konsistente, gleich lange Kopien von Zeitachse und Kanälen.
+        @param names: Kanäle (None => alle)
+        @return Tupel (t, {Kanal: Array})
+        """
+        with self.lock:
+            names = self.channels.keys() if names is None else names
+            return self.time.snapshot(), {n: self.channels[n].snapshot() for n in names}
+
+    def __len__(self):
+        return len(self.time)
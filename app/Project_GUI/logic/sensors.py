@@ -2,6 +2,12 @@
 """
 @file sensors.py
 @brief Verwaltung verschiedener Sensoren (Konfiguration, Pfade, Einheiten).
+       "device" ist der Sensorname in aggregator.SENSOR_READERS; alle Messgrößen eines Geräts kommen aus
+       demselben Lesezugriff. "field" ist der Schlüssel des Messwerts in den Datensätzen von aggregator.py
+       bzw. des Erfassungsdienstes.
+       "requires" nennt weitere Geräte, die für berechnete Größen mitgelesen werden müssen
+       (z.B. BME280 für die Luftdichte der Strömungsgeschwindigkeit, siehe logic.airflow).
+       "filter" legt die Glättung für die Plots fest (siehe logic.filters.create_filter).
 """
 
 class SensorsManager:
@@ -15,27 +21,45 @@ class SensorsManager:
             "BME_Temperature": {
                 "name": "BME280 Temperatur",
                 "unit": "°C",
-                "script_path": "/home/Eiffel/GUI/ssh_control/aggregator.py"
+                "device": "BME280",
+                "field": "bme_temp",
+                "filter": {"type": "moving_average", "window": 5}
             },
             "BME_Humidity": {
                 "name": "BME280 Feuchtigkeit",
                 "unit": "%",
-                "script_path": "/home/Eiffel/GUI/ssh_control/aggregator.py"
+                "device": "BME280",
+                "field": "bme_hum",
+                "filter": {"type": "moving_average", "window": 5}
             },
             "BME_Pressure": {
                 "name": "BME280 Druck",
                 "unit": "hPa",
-                "script_path": "/home/Eiffel/GUI/ssh_control/aggregator.py"
+                "device": "BME280",
+                "field": "bme_pres",
+                "filter": {"type": "moving_average", "window": 5}
             },
             "MCP_Temp": {
                 "name": "MCP9600 Temperatur",
                 "unit": "°C",
-                "script_path": "/home/Eiffel/GUI/ssh_control/aggregator.py"
+                "device": "MCP9600_AIRFLOW",
+                "field": "mcp_temp",
+                "filter": {"type": "ema", "alpha": 0.3}
             },
             "SDP_Pressure": {
                 "name": "SDP810 Druck",
                 "unit": "Pa",
-                "script_path": "/home/Eiffel/GUI/ssh_control/aggregator.py"
+                "device": "SDP810",
+                "field": "sdp_pressure",
+                "filter": {"type": "median", "window": 5}
+            },
+            "Air_Velocity": {
+                "name": "Luftgeschwindigkeit",
+                "unit": "m/s",
+                "device": "SDP810",
+                "requires": ["BME280"],
+                "field": "air_velocity",
+                "filter": {"type": "median", "window": 5}
             }
         }
 
@@ -46,3 +70,17 @@ class SensorsManager:
         @return dict
         """
         return self.andere_sensoren
+
+    def devices_for(self, sensor_keys):
+        """
+        @fn devices_for(sensor_keys)
+        @brief Ermittelt die Geräte, die für die angegebenen Sensoren gelesen werden müssen.
+        @param sensor_keys: iterierbar mit Schlüsseln aus get_available_other_sensors()
+        @return sortierte Liste der Gerätenamen (für {"type": "subscribe", "sensors": [...]})
+        """
+        geraete = set()
+        for key in sensor_keys:
+            sensor = self.andere_sensoren[key]
+            geraete.add(sensor["device"])
+            geraete.update(sensor.get("requires", []))
+        return sorted(geraete)
@@ -0,0 +1,224 @@
+# logic/session_recorder.py
+"""
+@file session_recorder.py
+@brief Aufzeichnung aller Messwerte einer Sitzung in ein spaltenorientiertes Binärformat.
+       Jeder Datenstrom (z.B. "bme", "sensors") besitzt typisierte Spalten (float64/int64), die in
+       vorallokierten NumPy-Puffern gesammelt werden. Ist ein Puffer voll oder das Flush-Intervall
+       abgelaufen, wird er als Chunk (komprimierte .npz, je Spalte ein .npy) in das Sitzungsverzeichnis
+       geschrieben.
+       Der lesbare Bericht (Markdown oder CSV) wird erst beim Beenden der Aufzeichnung in einem
+       Durchgang erzeugt.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS     = 4096
+DEFAULT_FLUSH_INTERVAL = 10.0
+
+class ColumnStream:
+    """
+    @class ColumnStream
+    @brief Puffer eines Datenstroms mit festen Spalten; schreibt volle Puffer als Chunk.
+    """
+    def __init__(self, name, columns, chunk_rows):
+        """
+        @fn __init__(name, columns, chunk_rows)
+        @param name: Name des Datenstroms (Präfix der Chunk-Dateien)
+        @param columns: Liste von (Spaltenname, Beschriftung, dtype, Format im Bericht)
+        @param chunk_rows: Zeilen je Chunk
+        """
+        self.name = name
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self.buffers = [np.empty(chunk_rows, dtype=dtype) for _, _, dtype, _ in columns]
+        self.rows = 0
+        self.chunks = 0
+
+    def append(self, values):
+        """
+        @fn append(values)
+        @brief Übernimmt eine Zeile (Werte in Spaltenreihenfolge).
+        @return True, wenn der Puffer voll ist
+        """
+        i = self.rows
+        for buf, val in zip(self.buffers, values):
+            buf[i] = val
+        self.rows += 1
+        return self.rows >= self.chunk_rows
+
+    def flush(self, directory):
+        """
+        @fn flush(directory)
+        @brief Schreibt die gepufferten Zeilen als Chunk-Datei (zuerst temporär, dann umbenannt).
+        @param directory: Sitzungsverzeichnis
+        """
+        if self.rows == 0:
+            return
+        pfad = os.path.join(directory, f"{self.name}_{self.chunks:05d}.npz")
+        tmp = pfad + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **{col[0]: buf[:self.rows] for col, buf in zip(self.columns, self.buffers)})
+        os.replace(tmp, pfad)
+        self.chunks += 1
+        self.rows = 0
+
+class SessionRecorder:
+    """
+    @class SessionRecorder
+    @brief Verwaltet die Datenströme einer Aufzeichnung und deren Flush-Schwellen.
+    """
+    def __init__(self, directory, chunk_rows=DEFAULT_CHUNK_ROWS, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """
+        @fn __init__(directory, chunk_rows=DEFAULT_CHUNK_ROWS, flush_interval=DEFAULT_FLUSH_INTERVAL)
+        @param directory: Sitzungsverzeichnis (wird bei start() angelegt)
+        @param chunk_rows: Zeilen je Chunk (Größenschwelle)
+        @param flush_interval: maximale Zeit in Sekunden, die Werte nur im Speicher liegen
+        """
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.streams = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.running = False
+
+    def add_stream(self, name, columns):
+        """
+        @fn add_stream(name, columns)
+        @brief Legt einen Datenstrom an.
+        @param columns: Liste von (Spaltenname, Beschriftung[, dtype[, Format]]);
+                        Standard ist float64 mit Format "%.6g"
+        """
+        columns = [
+            (c[0], c[1], np.dtype(c[2] if len(c) > 2 else np.float64), c[3] if len(c) > 3 else "%.6g")
+            for c in columns
+        ]
+        self.streams[name] = ColumnStream(name, columns, self.chunk_rows)
+
+    def start(self, meta=None):
+        """
+        @fn start(meta=None)
+        @brief Legt das Sitzungsverzeichnis an und speichert die Beschreibung der Datenströme.
+        @param meta: zusätzliche Angaben (z.B. Datenquelle) für den Bericht
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        info = {
+            "meta": meta or {},
+            "started": time.time(),
+            "streams": {
+                name: [[col, label, dtype.str, fmt] for col, label, dtype, fmt in stream.columns]
+                for name, stream in self.streams.items()
+            }
+        }
+        with open(os.path.join(self.directory, "session.json"), "w") as f:
+            json.dump(info, f, indent=2)
+        self.last_flush = time.monotonic()
+        self.running = True
+
+    def record(self, stream, values):
+        """
+        @fn record(stream, values)
+        @brief Hängt eine Zeile an einen Datenstrom an; schreibt nur, wenn eine Schwelle erreicht ist.
+        @param stream: Name des Datenstroms
+        @param values: Werte in Spaltenreihenfolge
+        """
+        with self.lock:
+            if not self.running:
+                return
+            if self.streams[stream].append(values):
+                self.streams[stream].flush(self.directory)
+
+    def poll(self):
+        """
+        @fn poll()
+        @brief Schreibt alle Puffer, wenn das Flush-Intervall abgelaufen ist (periodisch aufrufen).
+        """
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        @fn flush()
+        @brief Schreibt alle gepufferten Zeilen aller Datenströme.
+        """
+        with self.lock:
+            for stream in self.streams.values():
+                stream.flush(self.directory)
+            self.last_flush = time.monotonic()
+
+    def stop(self):
+        """
+        @fn stop()
+        @brief Schreibt verbliebene Zeilen und beendet die Aufzeichnung.
+        """
+        self.flush()
+        with self.lock:
+            self.running = False
+
+def load_session(directory):
+    """
+    @fn load_session(directory)
+    @brief Lädt alle Chunks einer Sitzung.
+    @param directory: Sitzungsverzeichnis
+    @return Tupel (info aus session.json, {Strom: {Spalte: np.ndarray}})
+    """
+    with open(os.path.join(directory, "session.json")) as f:
+        info = json.load(f)
+
+    data = {}
+    for name, columns in info["streams"].items():
+        teile = {col[0]: [] for col in columns}
+        for pfad in sorted(glob.glob(os.path.join(directory, f"{name}_*.npz"))):
+            with np.load(pfad) as chunk:
+                for col in teile:
+                    teile[col].append(chunk[col])
+        data[name] = {
+            col: np.concatenate(arrs) if arrs else np.empty(0, dtype=np.dtype(dtype))
+            for (col, _, dtype, _), arrs in zip(columns, teile.values())
+        }
+    return info, data
+
+def write_report(directory, path, titles=None):
+    """
+    @fn write_report(directory, path, titles=None)
+    @brief Erzeugt aus einer Sitzung einen Bericht. Bei Endung .csv entsteht je Datenstrom eine
+           CSV-Datei (<name>_<strom>.csv), sonst eine Markdown-Datei mit einer Tabelle je Datenstrom.
+    @param directory: Sitzungsverzeichnis
+    @param path: Zieldatei des Berichts
+    @param titles: optionale Überschriften je Datenstrom
+    @return Liste der geschriebenen Dateien
+    """
+    info, data = load_session(directory)
+    titles = titles or {}
+    stem, ext = os.path.splitext(path)
+    written = []
+
+    if ext.lower() == ".csv":
+        for name, columns in info["streams"].items():
+            pfad = f"{stem}_{name}.csv"
+            werte = np.column_stack([data[name][col[0]] for col in columns])
+            np.savetxt(pfad, werte, fmt=[col[3] for col in columns], delimiter=",", comments="",
+                       header=",".join(col[1] for col in columns))
+            written.append(pfad)
+        return written
+
+    with open(path, "w") as f:
+        f.write("# Sensordaten\n\n")
+        for key, val in info["meta"].items():
+            f.write(f"**{key}:** {val}\n\n")
+        for name, columns in info["streams"].items():
+            werte = np.column_stack([data[name][col[0]] for col in columns])
+            f.write(f"## {titles.get(name, name)}\n\n")
+            f.write("| " + " | ".join(col[1] for col in columns) + " |\n")
+            f.write("|" + "|".join("---" for _ in columns) + "|\n")
+            if len(werte):
+                np.savetxt(f, werte, fmt="| " + " | ".join(col[3] for col in columns) + " |")
+            f.write("\n")
+    written.append(path)
+    return written
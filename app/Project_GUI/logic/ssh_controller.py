@@ -4,8 +4,11 @@
 @brief Stellt eine SSH-Verbindung her und ermöglicht das Senden von Kommandos.
 """
 
+import threading
+
 import paramiko
 from tkinter import messagebox
+from logic.acquisition_client import AgentStream
 
 class SSHController:
     """
@@ -57,6 +60,40 @@ class SSHController:
             print(f"Fehler beim Ausführen des SSH-Kommandos: {e}")
             return ""
 
+    def start_agent(self, cmd):
+        """
+        @fn start_agent(cmd)
+        @brief Startet einen langlebigen Agentenprozess und hält dessen stdout-Kanal offen.
+               stderr wird von einem eigenen Thread gelesen und auf der Konsole ausgegeben; sonst füllt sich
+               das Kanalfenster und der Agent blockiert bei der nächsten Fehlermeldung.
+        @param cmd: Shell-Kommando des Agenten
+        @return AgentStream oder None, falls nicht verbunden
+        """
+        if not self.client:
+            print("SSH-Client ist nicht verbunden.")
+            return None
+        try:
+            stdin, stdout, stderr = self.client.exec_command(cmd)
+            threading.Thread(target=self.drain_stderr, args=(stderr,), daemon=True).start()
+            return AgentStream(stdout, stdin, stdout.channel.close)
+        except Exception as e:
+            print(f"Fehler beim Starten des SSH-Agenten: {e}")
+            return None
+
+    def drain_stderr(self, stderr):
+        """
+        @fn drain_stderr(stderr)
+        @brief Liest die Fehlerausgabe des Agenten bis zum Kanalende und gibt sie zeilenweise aus.
+        @param stderr: stderr-Datei von exec_command
+        """
+        try:
+            for zeile in stderr:
+                zeile = zeile.rstrip()
+                if zeile:
+                    print(f"Agent: {zeile}")
+        except (OSError, EOFError):
+            pass
+
     def close(self):
         """
         @fn close()
@@ -0,0 +1,177 @@
+# logic/tail_reader.py
+"""
+@file tail_reader.py
+@brief Verlustfreies, inkrementelles Lesen einer wachsenden CSV-Datei (z.B. /tmp/bme_data.csv).
+       Der Leser merkt sich den Byte-Offset und liefert bei jedem Abruf alle neuen, vollständigen Zeilen.
+       Kürzen, Neuanlegen und Rotation der Datei werden erkannt. Bei einer Rotation (control/bme_logger.py
+       benennt die Datei in ein Segment um) wird das alte Segment erst bis zum Ende gelesen, bevor der
+       Leser zur neuen Datei wechselt, sodass keine Zeile verloren geht: lokal über den offen gehaltenen
+       Dateideskriptor, per SSH über die Inode-Nummer des Segments. Vorausgesetzt ist höchstens eine Rotation
+       zwischen zwei Abrufen (Segmente umfassen Megabytes bzw. eine Stunde, abgerufen wird im Sekundentakt).
+       Für den SSH-Modus erzeugt er ein Kommando, das nur die Bytes ab dem Offset überträgt.
+"""
+
+import os
+
+class IncrementalTailReader:
+    """
+    @class IncrementalTailReader
+    @brief Liest neue Zeilen ab dem letzten Offset, lokal (poll_local) oder über ein entferntes Kommando.
+    """
+    def __init__(self, path, columns=4, max_bytes=1 << 20):
+        """
+        @fn __init__(path, columns=4, max_bytes=1 << 20)
+        @param path: Pfad der CSV-Datei (lokal oder auf dem entfernten Rechner)
+        @param columns: Anzahl numerischer Spalten je Zeile
+        @param max_bytes: maximale Datenmenge pro Abruf (Rest folgt beim nächsten Abruf)
+        """
+        self.path = path
+        self.columns = columns
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.inode = None
+        self.partial = b""
+        self.file = None
+
+    def reset(self):
+        """
+        @fn reset()
+        @brief Beginnt wieder am Dateianfang (nach Kürzen, Löschen oder Rotation).
+        """
+        self.offset = 0
+        self.partial = b""
+
+    def check_file(self, size, inode):
+        """
+        @fn check_file(size, inode)
+        @brief Vergleicht Größe und Inode mit dem Lesestand und setzt ihn bei Bedarf zurück.
+        @param size: aktuelle Dateigröße in Bytes
+        @param inode: aktuelle Inode-Nummer
+        """
+        if (self.inode is not None and inode != self.inode) or size < self.offset:
+            self.reset()
+        self.inode = inode
+
+    def feed(self, data):
+        """
+        @fn feed(data)
+        @brief Verarbeitet neu gelesene Bytes ab dem aktuellen Offset.
+        @param data: Bytes
+        @return Liste von Zeilen als Listen von floats; Kopf- und beschädigte Zeilen werden übersprungen
+        """
+        if not data:
+            return []
+        self.offset += len(data)
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+
+        rows = []
+        for line in lines:
+            parts = line.split(b",")
+            if len(parts) < self.columns:
+                continue
+            try:
+                rows.append([float(v) for v in parts[:self.columns]])
+            except ValueError:
+                continue
+        return rows
+
+    def poll_local(self):
+        """
+        @fn poll_local()
+        @brief Liest alle seit dem letzten Aufruf hinzugekommenen Zeilen der lokalen Datei in einem Zugriff.
+               Die Datei bleibt geöffnet; zeigt der Pfad auf eine neue Datei, wird die alte bis zum Ende
+               gelesen und erst danach gewechselt.
+        @return Liste von Zeilen (leer, wenn die Datei fehlt oder nichts Neues vorliegt)
+        """
+        if self.file is None:
+            try:
+                self.file = open(self.path, "rb")
+            except OSError:
+                self.inode = None
+                self.reset()
+                return []
+        try:
+            st = os.fstat(self.file.fileno())
+            self.check_file(st.st_size, st.st_ino)
+            data = b""
+            if st.st_size > self.offset:
+                self.file.seek(self.offset)
+                data = self.file.read(min(st.st_size - self.offset, self.max_bytes))
+            rows = self.feed(data)
+
+            try:
+                aktuell = os.stat(self.path).st_ino
+            except OSError:
+                aktuell = None
+            # Erst nach dem Pfad-Vergleich die Größe prüfen: der Logger schließt das Segment vor dem Umbenennen
+            if aktuell != st.st_ino and self.offset >= os.fstat(self.file.fileno()).st_size:
+                self.close()
+                self.inode = None
+                self.reset()
+                if aktuell is not None:
+                    rows += self.poll_local()
+        except OSError:
+            self.close()
+            self.inode = None
+            self.reset()
+            return []
+        return rows
+
+    def close(self):
+        """
+        @fn close()
+        @brief Schließt die lokal offen gehaltene Datei.
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remote_command(self):
+        """
+        @fn remote_command()
+        @brief Shell-Kommando, das Größe und Inode der gelesenen Datei, die Inode des aktuellen Pfads sowie
+               alle Bytes ab dem Offset ausgibt. Gelesen wird die Datei mit der bisherigen Inode im selben
+               Verzeichnis, nach einer Rotation also das Segment (falls nicht mehr vorhanden: der Pfad).
+        @return str
+        """
+        verzeichnis = os.path.dirname(self.path) or "."
+        if self.inode is None:
+            quelle = f"f={self.path}; "
+        else:
+            quelle = (f"f=$(find {verzeichnis} -maxdepth 1 -inum {self.inode} -print -quit); "
+                      f"[ -n \"$f\" ] || f={self.path}; ")
+        return (quelle +
+                f"echo \"$(stat -c '%s %i' \"$f\") $(stat -c %i {self.path} 2>/dev/null || echo 0)\" && "
+                f"tail -c +{self.offset + 1} \"$f\" | head -c {self.max_bytes}")
+
+    def feed_remote(self, output):
+        """
+        @fn feed_remote(output)
+        @brief Verarbeitet die Ausgabe von remote_command(). Ist das alte Segment vollständig gelesen,
+               beginnt der nächste Abruf am Anfang der neuen Datei.
+        @param output: Ausgabe als str oder Bytes
+        @return Liste von Zeilen
+        """
+        if isinstance(output, str):
+            output = output.encode()
+        header, sep, data = output.partition(b"\n")
+        if not sep:
+            return []
+        try:
+            size, inode, aktuell = (int(v) for v in header.split())
+        except ValueError:
+            return []
+
+        offset_before = self.offset
+        self.check_file(size, inode)
+        if self.offset != offset_before:
+            # Datei wurde neu angelegt und das alte Segment ist nicht mehr auffindbar:
+            # die übertragenen Bytes stammen von einem veralteten Offset
+            return []
+        rows = self.feed(data)
+        if aktuell != inode and self.offset >= size:
+            # rotiertes Segment vollständig gelesen => weiter mit der neuen Datei
+            self.inode = None
+            self.reset()
+        return rows
@@ -1,55 +1,268 @@
 # logic/temperature_controller.py
 """
 @file temperature_controller.py
-@brief Einfache Klasse zur Steuerung der Heizung anhand eines Sollwerts (PWM).
-       Es wird ein Hystereseverhalten angewendet, um die Heizung ein- oder auszuschalten.
+@brief Regelung der Heizung anhand eines Sollwerts (PWM).
+       Das Regelgesetz ist austauschbar: Hysterese (Zweipunktregler, ±band) oder PID mit
+       Anti-Windup und gefiltertem D-Anteil. Die Stellgröße (0..1) wird entweder direkt als
+       PWM-Duty (0..255) ausgegeben oder zeitproportional in einem festen Fenster ein-/ausgeschaltet
+       (für Relais bzw. SSR, die keine schnelle PWM vertragen).
+       Konfiguration über create_controller(), z.B. aus settings["heater_control"].
 """
 
+import time
+
+MAX_DUTY = 255
+
+class ControlLaw:
+    """
+    @class ControlLaw
+    @brief Basisklasse eines Regelgesetzes: liefert aus Soll- und Istwert eine Stellgröße 0..1.
+    """
+    def update(self, setpoint, measurement, dt):
+        """
+        @fn update(setpoint, measurement, dt)
+        @brief Berechnet die Stellgröße für einen Regelzyklus.
+        @param setpoint: Solltemperatur in °C
+        @param measurement: Isttemperatur in °C
+        @param dt: Sekunden seit dem letzten Aufruf (0 beim ersten Aufruf)
+        @return float 0..1
+        """
+        return 0.0
+
+    def reset(self):
+        """
+        @fn reset()
+        @brief Verwirft den inneren Zustand (z.B. nach dem Ausschalten).
+        """
+
+class HysteresisLaw(ControlLaw):
+    """
+    @class HysteresisLaw
+    @brief Zweipunktregler: Heizung an unterhalb setpoint-band, aus oberhalb setpoint+band.
+    """
+    def __init__(self, band=1.0):
+        self.band = float(band)
+        self.on = False
+
+    def update(self, setpoint, measurement, dt):
+        if self.on and measurement >= setpoint + self.band:
+            self.on = False
+        elif not self.on and measurement <= setpoint - self.band:
+            self.on = True
+        return 1.0 if self.on else 0.0
+
+    def reset(self):
+        self.on = False
+
+class PIDLaw(ControlLaw):
+    """
+    @class PIDLaw
+    @brief PID-Regler in Parallelform, u = kp*(b*w - y) + I + kd*D.
+           Der D-Anteil wirkt nur auf den Istwert (kein Sprung bei Sollwertänderung) und wird mit
+           einem Tiefpass erster Ordnung (Zeitkonstante d_filter) gegen Sensorrauschen geglättet.
+           Anti-Windup: Der I-Anteil wird nicht weiter aufintegriert, solange die Stellgröße in der
+           Begrenzung liegt und der Regelfehler weiter in diese Richtung zeigt, und bleibt auf den
+           Stellbereich begrenzt.
+    """
+    def __init__(self, kp=0.25, ki=0.002, kd=3.0, d_filter=5.0, setpoint_weight=1.0,
+                 out_min=0.0, out_max=1.0):
+        """
+        @fn __init__(kp, ki, kd, d_filter, setpoint_weight, out_min, out_max)
+        @param kp: Proportionalverstärkung (1/°C)
+        @param ki: Integralverstärkung (1/(°C·s))
+        @param kd: Differentialverstärkung (s/°C)
+        @param d_filter: Zeitkonstante des D-Filters in Sekunden
+        @param setpoint_weight: Gewichtung b des Sollwerts im P-Anteil (< 1 => weniger Überschwingen)
+        @param out_min: untere Grenze der Stellgröße
+        @param out_max: obere Grenze der Stellgröße
+        """
+        self.kp = float(kp)
+        self.ki = float(ki)
+        self.kd = float(kd)
+        self.d_filter = float(d_filter)
+        self.setpoint_weight = float(setpoint_weight)
+        self.out_min = float(out_min)
+        self.out_max = float(out_max)
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.derivative = 0.0
+        self.last_measurement = None
+        self.output = 0.0
+
+    def update(self, setpoint, measurement, dt):
+        fehler = setpoint - measurement
+        p = self.kp * (self.setpoint_weight * setpoint - measurement)
+
+        if self.last_measurement is not None and dt > 0:
+            roh = -(measurement - self.last_measurement) / dt
+            alpha = dt / (self.d_filter + dt)
+            self.derivative += alpha * (roh - self.derivative)
+        self.last_measurement = measurement
+        d = self.kd * self.derivative
+
+        # Anti-Windup (bedingte Integration)
+        u = p + self.integral + d
+        if not ((u >= self.out_max and fehler > 0) or (u <= self.out_min and fehler < 0)):
+            self.integral += self.ki * fehler * dt
+            self.integral = min(max(self.integral, self.out_min), self.out_max)
+
+        self.output = min(max(p + self.integral + d, self.out_min), self.out_max)
+        return self.output
+
+CONTROL_LAWS = {
+    "hysteresis": HysteresisLaw,
+    "pid": PIDLaw,
+}
+
+class PwmOutput:
+    """
+    @class PwmOutput
+    @brief Gibt die Stellgröße direkt als PWM-Duty aus (0..1 => 0..255).
+    """
+    def duty(self, output, now):
+        """
+        @fn duty(output, now)
+        @param output: Stellgröße 0..1
+        @param now: Zeitpunkt (time.monotonic)
+        @return Duty 0..255
+        """
+        return int(round(output * MAX_DUTY))
+
+    def reset(self):
+        pass
+
+class TimeProportionalOutput:
+    """
+    @class TimeProportionalOutput
+    @brief Zeitproportionale Ausgabe: Innerhalb eines Fensters von window Sekunden ist die Heizung
+           output*window Sekunden voll an und sonst aus. Ein- bzw. Ausschaltzeiten unter min_switch
+           werden unterdrückt, damit das Stellglied nicht unnötig oft schaltet.
+    """
+    def __init__(self, window=5.0, min_switch=0.5):
+        self.window = float(window)
+        self.min_switch = float(min_switch)
+        self.reset()
+
+    def reset(self):
+        self.window_start = None
+        self.on_time = 0.0
+
+    def duty(self, output, now):
+        if self.window_start is None or now - self.window_start >= self.window:
+            self.window_start = now
+            self.on_time = output * self.window
+            if self.on_time < self.min_switch:
+                self.on_time = 0.0
+            elif self.window - self.on_time < self.min_switch:
+                self.on_time = self.window
+        return MAX_DUTY if now - self.window_start < self.on_time else 0
+
+OUTPUT_TYPES = {
+    "pwm": PwmOutput,
+    "time_proportional": TimeProportionalOutput,
+}
+
 class TemperatureController:
     """
     @class TemperatureController
-    @brief Führt eine Hysterese-Steuerung durch. Schaltet die Heizung an/aus,
-           abhängig von current_temp und target_temp.
+    @brief Verbindet Regelgesetz und Ausgabe: berechnet je Zyklus die Stellgröße und setzt die PWM
+           der Heizung (nur bei Änderung).
     """
-    def __init__(self, set_pwm_callback, heater_gpio):
+    def __init__(self, set_pwm_callback, heater_gpio, law=None, output=None, invert=False):
         """
-        @fn __init__(set_pwm_callback, heater_gpio)
+        @fn __init__(set_pwm_callback, heater_gpio, law=None, output=None, invert=False)
         @brief Konstruktor.
         @param set_pwm_callback: Funktion(gpio_pin, dutycycle), um PWM zu setzen.
         @param heater_gpio: GPIO-Pin für die Heizung.
+        @param law: ControlLaw (Standard: Hysterese ±1°C)
+        @param output: PwmOutput oder TimeProportionalOutput (Standard: PwmOutput)
+        @param invert: PWM invertieren (Duty 255 - x), siehe INVERT_PWM
         """
         self.set_pwm_callback = set_pwm_callback
         self.heater_gpio = heater_gpio
+        self.law = law if law is not None else HysteresisLaw()
+        self.output = output if output is not None else PwmOutput()
+        self.invert = invert
         self.target_temp = None
-        self.heater_on = False
+        self.last_time = None
+        self.duty = None
+        self.stellgroesse = 0.0
+
+    @property
+    def heater_on(self):
+        return bool(self.duty)
+
+    def write_duty(self, duty):
+        """
+        @fn write_duty(duty)
+        @brief Setzt die PWM der Heizung, falls sich der Duty geändert hat.
+        @param duty: 0..255
+        """
+        if duty != self.duty:
+            self.duty = duty
+            self.set_pwm_callback(self.heater_gpio, MAX_DUTY - duty if self.invert else duty)
 
     def set_target_temperature(self, temp):
         """
         @fn set_target_temperature(temp)
-        @brief Setzt die Solltemperatur. Wenn None, wird die Heizung ausgeschaltet.
+        @brief Setzt die Solltemperatur. Wenn None, wird die Heizung ausgeschaltet und der Regler zurückgesetzt.
         @param temp: float oder None
         """
-        self.target_temp = temp
         if temp is None:
-            self.set_pwm_callback(self.heater_gpio, 0)
-            self.heater_on = False
+            self.law.reset()
+            self.output.reset()
+            self.last_time = None
+            self.stellgroesse = 0.0
+            self.write_duty(0)
+        self.target_temp = temp
 
-    def update_control(self, current_temp):
+    def update_control(self, current_temp, now=None):
         """
-        @fn update_control(current_temp)
-        @brief Zyklische Methode. Wenn current_temp < (target-1), schaltet die Heizung an.
-               Wenn current_temp > (target+1), schaltet sie aus.
+        @fn update_control(current_temp, now=None)
+        @brief Zyklische Methode: berechnet die Stellgröße aus dem neuen Istwert und setzt die PWM.
         @param current_temp: float
+        @param now: Zeitpunkt in Sekunden (Standard: time.monotonic())
+        @return Stellgröße 0..1
         """
         if self.target_temp is None:
-            return
+            return 0.0
+        now = time.monotonic() if now is None else now
+        dt = 0.0 if self.last_time is None else now - self.last_time
+        self.last_time = now
+        self.stellgroesse = self.law.update(self.target_temp, current_temp, dt)
+        self.write_duty(self.output.duty(self.stellgroesse, now))
+        return self.stellgroesse
+
+    def off(self):
+        """
+        @fn off()
+        @brief Schaltet die Heizung aus (ohne den Sollwert zu verwerfen), auch wenn der zuletzt
+               gesetzte Duty bereits 0 war.
+        """
+        self.duty = None
+        self.write_duty(0)
 
-        obere_schwelle = self.target_temp + 1
-        untere_schwelle = self.target_temp - 1
+def create_controller(set_pwm_callback, heater_gpio, conf=None, invert=False):
+    """
+    @fn create_controller(set_pwm_callback, heater_gpio, conf=None, invert=False)
+    @brief Erzeugt einen TemperatureController aus einer Konfiguration.
+    @param conf: dict {"law": "pid"|"hysteresis", "output": "pwm"|"time_proportional",
+                 "window": s, "min_switch": s, "<law>": {Parameter}, ...} oder None (=> Hysterese)
+    @return TemperatureController
+    """
+    conf = conf or {}
+    law_name = conf.get("law", "hysteresis")
+    if law_name not in CONTROL_LAWS:
+        raise ValueError(f"Unbekanntes Regelgesetz: {law_name}")
+    out_name = conf.get("output", "pwm")
+    if out_name not in OUTPUT_TYPES:
+        raise ValueError(f"Unbekannte Ausgabe: {out_name}")
 
-        if self.heater_on and current_temp > obere_schwelle:
-            self.heater_on = False
-            self.set_pwm_callback(self.heater_gpio, 0)
-        elif (not self.heater_on) and current_temp < untere_schwelle:
-            self.heater_on = True
-            self.set_pwm_callback(self.heater_gpio, 255)
+    law = CONTROL_LAWS[law_name](**conf.get(law_name, {}))
+    if out_name == "time_proportional":
+        output = TimeProportionalOutput(conf.get("window", 5.0), conf.get("min_switch", 0.5))
+    else:
+        output = PwmOutput()
+    return TemperatureController(set_pwm_callback, heater_gpio, law, output, invert)
@@ -0,0 +1,143 @@
+# logic/thermal_plant.py
+"""
+@file thermal_plant.py
+@brief Simulierte Regelstrecke (Heizung + Luftvolumen + BME280) zum Testen und Vergleichen der
+       Regelgesetze aus temperature_controller.py ohne Hardware.
+       Modell: Heizelement und Luft als zwei Wärmekapazitäten, Wärmeverlust an die Umgebung,
+       Totzeit zwischen Heizleistung und Heizelement sowie ein träger Temperatursensor.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+class ThermalPlant:
+    """
+    @class ThermalPlant
+    @brief Thermisches Modell zweiter Ordnung mit Totzeit und Sensorverzögerung.
+    """
+    def __init__(self, ambient=20.0, heater_power=40.0, heater_capacity=60.0, air_capacity=400.0,
+                 coupling=2.0, loss=0.8, dead_time=2.0, sensor_tau=4.0, noise=0.0, seed=None):
+        """
+        @fn __init__(...)
+        @param ambient: Umgebungstemperatur in °C
+        @param heater_power: Heizleistung bei Duty 1.0 in W
+        @param heater_capacity: Wärmekapazität des Heizelements in J/K
+        @param air_capacity: Wärmekapazität von Luft und Gehäuse in J/K
+        @param coupling: Wärmeübergang Heizelement -> Luft in W/K
+        @param loss: Wärmeverlust Luft -> Umgebung in W/K
+        @param dead_time: Totzeit der Heizleistung in Sekunden
+        @param sensor_tau: Zeitkonstante des Sensors in Sekunden
+        @param noise: Standardabweichung des Messrauschens in °C
+        @param seed: Startwert des Zufallsgenerators (Rauschen)
+        """
+        self.ambient = ambient
+        self.heater_power = heater_power
+        self.heater_capacity = heater_capacity
+        self.air_capacity = air_capacity
+        self.coupling = coupling
+        self.loss = loss
+        self.dead_time = dead_time
+        self.sensor_tau = sensor_tau
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        """
+        @fn reset()
+        @brief Setzt alle Temperaturen auf die Umgebungstemperatur.
+        """
+        self.t = 0.0
+        self.heater_temp = self.ambient
+        self.air_temp = self.ambient
+        self.sensor_temp = self.ambient
+        self.delay = deque()
+        self.power = 0.0
+
+    def step(self, duty, dt):
+        """
+        @fn step(duty, dt)
+        @brief Simuliert dt Sekunden mit konstanter Stellgröße.
+        @param duty: Stellgröße 0..1
+        @param dt: Schrittweite in Sekunden
+        @return Messwert des Sensors in °C
+        """
+        self.delay.append((self.t + self.dead_time, min(max(duty, 0.0), 1.0)))
+        while self.delay and self.delay[0][0] <= self.t:
+            self.power = self.delay.popleft()[1] * self.heater_power
+        leistung = self.power
+
+        # Unterteilung, damit das explizite Euler-Verfahren auch bei großen dt stabil bleibt
+        n = max(1, math.ceil(dt / 0.05))
+        h = dt / n
+        for _ in range(n):
+            q_kopplung = self.coupling * (self.heater_temp - self.air_temp)
+            q_verlust = self.loss * (self.air_temp - self.ambient)
+            self.heater_temp += h * (leistung - q_kopplung) / self.heater_capacity
+            self.air_temp += h * (q_kopplung - q_verlust) / self.air_capacity
+            self.sensor_temp += h * (self.air_temp - self.sensor_temp) / self.sensor_tau
+        self.t += dt
+        return self.measure()
+
+    def measure(self):
+        """
+        @fn measure()
+        @return aktueller Messwert (mit Rauschen) in °C
+        """
+        if self.noise:
+            return self.sensor_temp + self.rng.normal(0.0, self.noise)
+        return self.sensor_temp
+
+def simulate(controller, plant, setpoint, duration, dt=0.2):
+    """
+    @fn simulate(controller, plant, setpoint, duration, dt=0.2)
+    @brief Betreibt einen TemperatureController (dessen PWM-Callback wird ersetzt) an der Strecke.
+    @param controller: TemperatureController
+    @param plant: ThermalPlant
+    @param setpoint: Solltemperatur in °C
+    @param duration: Dauer in Sekunden
+    @param dt: Regelzyklus in Sekunden
+    @return dict mit np.ndarrays "t", "temperature", "duty" (0..1)
+    """
+    stell = {"duty": 0.0}
+
+    def set_pwm(_pin, duty):
+        stell["duty"] = (255 - duty if controller.invert else duty) / 255.0
+
+    controller.set_pwm_callback = set_pwm
+    controller.set_target_temperature(setpoint)
+    n = int(round(duration / dt))
+    zeit = np.empty(n)
+    temp = np.empty(n)
+    duty = np.empty(n)
+    messwert = plant.measure()
+    for i in range(n):
+        controller.update_control(messwert, now=plant.t)
+        zeit[i] = plant.t
+        temp[i] = messwert
+        duty[i] = stell["duty"]
+        messwert = plant.step(stell["duty"], dt)
+    return {"t": zeit, "temperature": temp, "duty": duty}
+
+def step_metrics(t, y, setpoint, tolerance=0.5):
+    """
+    @fn step_metrics(t, y, setpoint, tolerance=0.5)
+    @brief Kennwerte einer Sprungantwort.
+    @param tolerance: Band um den Sollwert in °C für die Ausregelzeit
+    @return dict {"overshoot": °C, "rise_time": s bis zum ersten Erreichen des Sollwerts,
+                  "settling_time": s bis zum endgültigen Verbleib im Band, "peak_to_peak": °C im letzten Viertel}
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    erreicht = np.nonzero(y >= setpoint)[0]
+    ausserhalb = np.nonzero(np.abs(y - setpoint) > tolerance)[0]
+    ende = y[3 * len(y) // 4:]
+    return {
+        "overshoot": max(float(y.max()) - setpoint, 0.0),
+        "rise_time": float(t[erreicht[0]] - t[0]) if len(erreicht) else math.inf,
+        "settling_time": (float(t[ausserhalb[-1] + 1] - t[0]) if len(ausserhalb) and ausserhalb[-1] + 1 < len(t)
+                          else (0.0 if not len(ausserhalb) else math.inf)),
+        "peak_to_peak": float(ende.max() - ende.min()) if len(ende) else 0.0,
+    }
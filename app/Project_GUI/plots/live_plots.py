@@ -2,9 +2,11 @@
 """
 @file live_plots.py
 @brief Ein Beispielmodul für Live-Plots von Temperatur, Feuchtigkeit und Druck mit matplotlib in Tkinter.
+       BlitPlotEngine aktualisiert bestehende Linien per set_data und zeichnet nur die Linien neu (Blitting).
 """
 
 import tkinter as tk
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 from logic.utils import get_sensor_color
@@ -63,3 +65,110 @@ class LivePlot:
         self.ax_druck.set_xlim(left=0)
 
         self.canvas.draw_idle()
+
+
+class BlitPlotEngine:
+    """
+    @class BlitPlotEngine
+    @brief Erzeugt je Achse einmalig ein Line2D-Objekt und aktualisiert es per set_data.
+           Der gestylte Hintergrund (Achsen, Gitter, Beschriftung) wird zwischengespeichert; pro Tick
+           werden nur die Linien gezeichnet und die Achsenbereiche geblittet. Ein vollständiges
+           Neuzeichnen erfolgt nur, wenn die Daten die aktuellen Achsengrenzen verlassen.
+    """
+    def __init__(self, canvas, axes, colors, x_headroom=0.2, y_margin=0.1):
+        """
+        @fn __init__(canvas, axes, colors, x_headroom=0.2, y_margin=0.1)
+        @param canvas: FigureCanvasTkAgg
+        @param axes: Liste bereits gestylter Achsen
+        @param colors: Liste der Linienfarben (je Achse)
+        @param x_headroom: Anteil der Zeitspanne, der rechts als Reserve freigelassen wird
+        @param y_margin: relativer Rand oberhalb/unterhalb der Werte beim Neuskalieren
+        """
+        self.canvas = canvas
+        self.axes = list(axes)
+        self.x_headroom = x_headroom
+        self.y_margin = y_margin
+        self.lines = [ax.plot([], [], color=c, animated=True)[0] for ax, c in zip(self.axes, colors)]
+        self.background = None
+        self.full_redraws = 0
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        """
+        @fn on_draw(event)
+        @brief Nach jedem vollständigen Zeichnen: Hintergrund sichern und Linien darüber zeichnen.
+        """
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        """
+        @fn draw_lines()
+        @brief Zeichnet nur die (animierten) Linien auf ihre Achsen.
+        """
+        for ax, line in zip(self.axes, self.lines):
+            ax.draw_artist(line)
+
+    def rescale_if_needed(self, ax, x, y):
+        """
+        @fn rescale_if_needed(ax, x, y)
+        @brief Passt die Achsengrenzen an, wenn Daten außerhalb liegen (oder die Zeitachse
+               überwiegend leer ist, weil alte Werte aus dem Puffer gefallen sind).
+        @return True, wenn Grenzen geändert wurden
+        """
+        changed = False
+        x_min, x_max = float(x[0]), float(x[-1])
+        left, right = ax.get_xlim()
+        span = max(x_max - x_min, 1.0)
+        if x_min < left or x_max > right or (x_max - x_min) < 0.5 * (right - left):
+            ax.set_xlim(x_min, x_max + self.x_headroom * span)
+            changed = True
+
+        finite = y[np.isfinite(y)]
+        if finite.size:
+            y_min, y_max = float(finite.min()), float(finite.max())
+            bottom, top = ax.get_ylim()
+            if y_min < bottom or y_max > top:
+                pad = max((y_max - y_min) * self.y_margin, 0.05 * max(abs(y_max), 1e-3))
+                ax.set_ylim(y_min - pad, y_max + pad)
+                changed = True
+        return changed
+
+    def update(self, x, ys):
+        """
+        @fn update(x, ys)
+        @brief Übernimmt neue Daten und zeichnet per Blitting (oder vollständig bei Grenzänderung).
+        @param x: Zeitwerte (Array-ähnlich)
+        @param ys: Liste von Wertereihen, eine je Achse (gleiche Länge wie x)
+        """
+        self.update_series([(x, y) for y in ys])
+
+    def update_series(self, series):
+        """
+        @fn update_series(series)
+        @brief Wie update(), aber mit eigener Zeitachse je Reihe (z.B. nach dem Downsampling).
+        @param series: Liste von (x, y)-Paaren, eines je Achse
+        """
+        needs_full = self.background is None
+        drawn = False
+        for ax, line, (x, y) in zip(self.axes, self.lines, series):
+            x = np.asarray(x, dtype=float)
+            if x.size == 0:
+                continue
+            y = np.asarray(y, dtype=float)
+            line.set_data(x, y)
+            needs_full |= self.rescale_if_needed(ax, x, y)
+            drawn = True
+        if not drawn:
+            return
+
+        if needs_full:
+            self.full_redraws += 1
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.draw_lines()
+        for ax in self.axes:
+            self.canvas.blit(ax.bbox)
+        self.canvas.flush_events()
@@ -27,17 +27,13 @@ source $VENV_DIR/bin/activate
 echo "Installing Python modules from PyPI..."
 pip install --upgrade pip
 pip install \
-    adafruit-blinka \
-    adafruit-circuitpython-busdevice \
-    adafruit-circuitpython-bme280 \
+    smbus2 \
     ttkbootstrap
 
 # Step 6: Force reinstall specific packages (if needed)
 echo "Force reinstalling specific packages..."
 pip install --upgrade --force-reinstall \
-    adafruit-circuitpython-bme280 \
-    adafruit-circuitpython-busdevice \
-    adafruit-blinka
+    smbus2
 
 # Step 7: Deactivate the virtual environment
 echo "Deactivating virtual environment..."